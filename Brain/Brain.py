@@ -2,13 +2,20 @@ import os
 import sys
 import json
 import time
-import PyPDF2
-import requests  # ✅ For Webhook
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import Future
 from pydantic import BaseModel, Field
-from google import genai
-from google.genai import types
-from google.genai import errors
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+# Cheap at import time: PDF parsing, HTTP and Gemini libraries are only
+# imported once something actually needs them (see init() / get_client()).
+from resume import ResumeIngestor, extract_pdf_text
+from webhook import WebhookDispatcher  # ✅ For Webhook
+from llmcache import ResponseCache, cache_key
 
 # --- 🔧 FIX IMPORT PATH ---
 # 1. Get the current folder where this script is
@@ -17,32 +24,106 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 # 3. Define path to the 'Voice_Confidence' folder
 voice_folder_path = os.path.join(parent_dir, 'Voice_Confidence')
+# 4. Shared metrics / tracing (telemetry/instrument.py)
+import instrument   # telemetry/, on sys.path via the package __init__
+
+# --- 1. CONFIGURATION ---
+# Filled in by init() from the environment / .env
+key_1 = key_2 = key_3 = None
+WEBHOOK_URL = None
+WEBHOOK = None          # One background sender for every interview in this process
+LLM_BASE_URL = None     # Optional: point the Gemini clients somewhere else (e.g. fake_llm.FakeModelServer)
+SAVE_URL = None         # Optional: the website's /api/interviews/save, to upload the session summary (sessionlog.py)
+USER_ID = None
+SESSION_LOG_PATH = None # Optional: also append the session's time series to this file
+DEFAULT_WEBHOOK_URL = "https://vgamai.app.n8n.cloud/webhook-test/b1bd00ca-d5a8-4cb9-af5c-e9e11fee4410"
 
-# 4. Add that FOLDER to the system path so Python can find voice.py
-sys.path.append(voice_folder_path)
+# Async client layer: grading and both possible next questions run concurrently
+USE_ASYNC_LLM = True
+PREFETCH_QUESTIONS = True
 
-# 🔥 NOW IMPORT THE VOICE FILE
-import voice
+# Response cache (llmcache.py): identical grading prompts are answered from disk.
+# Questions are only cached when asked for (drills / replays), otherwise every interview would repeat them.
+USE_RESPONSE_CACHE = True
+CACHE_QUESTIONS = False
 
-# Load environment variables
-load_dotenv()
+_init_lock = threading.Lock()
+_initialized = False
+_clients = {}
+_response_cache = None
+_voice_bot = None
+_voice_lock = threading.Lock()
 
-# --- 1. CONFIGURATION ---
-key_1 = os.getenv("GEMINI_KEY_TOPICS")
-key_2 = os.getenv("GEMINI_KEY_ASKER")
-key_3 = os.getenv("GEMINI_KEY_GRADER")
+def init():
+    """
+    Loads .env and the keys / URLs. Safe to call from any thread, any number
+    of times; AdaptiveInterviewer calls it itself. Raises RuntimeError when a
+    Gemini key is missing.
+    """
+    global _initialized, key_1, key_2, key_3, WEBHOOK_URL, WEBHOOK, LLM_BASE_URL, SAVE_URL, USER_ID, SESSION_LOG_PATH
+    with _init_lock:
+        if _initialized:
+            return
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        key_1 = os.getenv("GEMINI_KEY_TOPICS")
+        key_2 = os.getenv("GEMINI_KEY_ASKER")
+        key_3 = os.getenv("GEMINI_KEY_GRADER")
+        if not key_1 or not key_2 or not key_3:
+            raise RuntimeError("Please ensure you have 3 keys in your .env file")
+
+        # ✅ Webhook Configuration (its sender thread starts on the first question)
+        WEBHOOK_URL = os.getenv("WEBHOOK_URL", DEFAULT_WEBHOOK_URL)
+        WEBHOOK = WebhookDispatcher(WEBHOOK_URL) if WEBHOOK_URL else None
+        LLM_BASE_URL = os.getenv("GEMINI_BASE_URL")
+        SAVE_URL = os.getenv("INTERVIEW_SAVE_URL")
+        USER_ID = os.getenv("INTERVIEW_USER_ID", "local")
+        SESSION_LOG_PATH = os.getenv("SESSION_LOG_PATH")
+        _initialized = True
 
-# ✅ Webhook Configuration
-WEBHOOK_URL = "https://vgamai.app.n8n.cloud/webhook-test/b1bd00ca-d5a8-4cb9-af5c-e9e11fee4410" 
+def role_keys():
+    init()
+    return {"topics": key_1, "asker": key_2, "grader": key_3}
 
-if not key_1 or not key_2 or not key_3:
-    print("❌ ERROR: Please ensure you have 3 keys in your .env file")
-    exit()
+def get_client(role):
+    """
+    The blocking genai.Client for a role ("topics", "asker", "grader"), built on first use.
+    """
+    client = _clients.get(role)
+    if client is None:
+        keys = role_keys()
+        with _init_lock:
+            if role not in _clients:
+                from google import genai
+                from google.genai import types
+                http_options = types.HttpOptions(base_url=LLM_BASE_URL) if LLM_BASE_URL else None
+                _clients[role] = genai.Client(api_key=keys[role], http_options=http_options)
+            client = _clients[role]
+    return client
 
-# Initialize Clients
-client_topics = genai.Client(api_key=key_1)
-client_asker  = genai.Client(api_key=key_2)
-client_grader = genai.Client(api_key=key_3)
+def default_response_cache():
+    # Opened on first use so importing Brain doesn't touch the disk
+    global _response_cache
+    with _init_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+def default_voice_bot():
+    """
+    The process-wide voice system (model loaded once, on first use).
+    """
+    global _voice_bot
+    with _voice_lock:
+        if _voice_bot is None:
+            # 5. Add the Voice_Confidence FOLDER to the system path so Python can find voice.py
+            if voice_folder_path not in sys.path:
+                sys.path.append(voice_folder_path)
+            import voice
+            print(f"\n 🎤 Initializing Voice System...")
+            _voice_bot = voice.VoiceAnalyzer()
+        return _voice_bot
 
 TARGET_JOB_DESCRIPTION = """
 File clerk
@@ -56,27 +137,59 @@ class AnswerGrade(BaseModel):
 class TopicGenerator(BaseModel):
     topics: list[str] = Field(description="List of 1 technical topic.")
 
+DEFAULT_TOPICS = ["General Skills"]
+
+# Printed by the terminal sink (instrument.TERMINAL); other exporters get the same events
+@instrument.on_terminal("interview.grade")
+def _print_grade(correct, points):
+    print(f"   ✅ Correct! (+{points} pts)" if correct else f"   ❌ Wrong. (+0 pts)")
+
+@instrument.on_terminal("interview.topic_score")
+def _print_topic_score(topic, score):
+    print(f"   📝 Section Score Locked: {score}")
+
 # --- 3. THE BRAIN CLASS ---
 class AdaptiveInterviewer:
-    def __init__(self, resume_text, job_description):
+    def __init__(self, resume_text, job_description, resume_path=None, ingestor=None, llm=None, voice_bot=None,
+                 webhook=None, cache=None, cache_questions=CACHE_QUESTIONS, session_log=None):
+        """
+        Pass resume_path to read the PDF through the cached ingestion path
+        (resume_text is then ignored and filled in from the PDF).
+        Pass an llm.LLMClient to use the async client layer instead of the blocking clients.
+        Pass voice_bot to share one already-loaded voice system between interviews.
+        Pass webhook (a webhook.WebhookDispatcher) to send questions somewhere other than WEBHOOK_URL.
+        Pass cache (an llmcache.ResponseCache) to use a cache other than the default one.
+        Pass session_log (a sessionlog.SessionLog) to record when each question was asked and how it was graded.
+        """
+        init()
         self.job_description = job_description
+        self.llm = llm
+        self.webhook = webhook or WEBHOOK
+        if cache is None and USE_RESPONSE_CACHE:
+            cache = default_response_cache()
+        self.cache = cache
+        self.cache_questions = cache_questions
+        self._prefetched = {}   # (topic index, difficulty, questions asked) -> Future of a question
+        self.session_log = session_log
+        self.questions_generated = 0
         
-        # 🔥 Initialize Voice System
-        # Assuming your voice.py has a class named VoiceAnalyzer based on your snippet
-        # If it is named VoiceSystem, change this to voice.VoiceSystem()
-        try:
-            print(f"\n 🎤 Initializing Voice System...")
-            self.voice_bot = voice.VoiceSystem() 
-        except AttributeError:
-            # Fallback if the class is named differently
-            self.voice_bot = voice.VoiceAnalyzer()
+        # 🔥 Voice System: shared, and only loaded when the first answer is recorded
+        self._voice_bot = voice_bot
         
         # Scoring Storage
         self.skill_scores = [] 
         self.current_skill_score = 0 
         
         print(f"\n  Reading Resume...")
-        self.topics = self._get_topics_from_resume(resume_text)
+        if resume_path:
+            ingestor = ingestor or ResumeIngestor()
+            resume_text, self.topics = ingestor.ingest(resume_path, job_description,
+                                                       self._get_topics_from_resume, DEFAULT_TOPICS)
+            cache_state = "cached" if ingestor.last_timing["warm"] else "cold"
+            print(f"📄 Resume ready in {ingestor.last_timing['total'] * 1000:.0f} ms ({cache_state})")
+        else:
+            self.topics = self._get_topics_from_resume(resume_text)
+        self.resume_text = resume_text
         print(f"✅ Topic Locked: {self.topics}")
         
         self.current_topic_index = 0
@@ -85,21 +198,78 @@ class AdaptiveInterviewer:
         self.questions_asked_in_current_topic = 0
         self.correct_answers_in_current_topic = 0
 
-    def _safe_api_call(self, client_instance, model, contents, config=None):
+    def _cache_for(self, role):
+        if role == "asker" and not self.cache_questions:
+            return None
+        return self.cache
+
+    def _safe_api_call(self, role, model, contents, config=None):
+        with instrument.span("llm.call", role=role) as span:
+            cache = self._cache_for(role)
+            if cache is None:
+                return self._call_llm(role, model, contents, config)
+
+            key = cache_key(model, contents, config)
+            response = cache.get(key)
+            result = "miss" if response is None else "hit"
+            span.set(cache=result)
+            instrument.counter("llm_cache_total", "Response cache lookups").inc(role=role, result=result)
+            if response is None:
+                start = time.perf_counter()
+                response = self._call_llm(role, model, contents, config)
+                cache.put(key, response, time.perf_counter() - start)
+            return response
+
+    def _submit(self, role, model, contents, config=None):
+        """
+        Like _safe_api_call but returns a Future from the async client; a cache hit comes back already resolved.
+        """
+        cache = self._cache_for(role)
+        if cache is None:
+            return self.llm.submit(role, model, contents, config)
+
+        key = cache_key(model, contents, config)
+        response = cache.get(key)
+        if response is not None:
+            future = Future()
+            future.set_result(response)
+            return future
+
+        start = time.perf_counter()
+        future = self.llm.submit(role, model, contents, config)
+
+        def _store(done):
+            if not done.cancelled() and done.exception() is None:
+                cache.put(key, done.result(), time.perf_counter() - start)
+        future.add_done_callback(_store)
+        return future
+
+    def _call_llm(self, role, model, contents, config=None):
+        if self.llm is not None:
+            return self.llm.call(role, model, contents, config)
+
+        from llm import LLM_RETRIES, LLM_RETRY_SLEEP, LLM_FAILURES
+        client_instance = get_client(role)
         max_retries = 3
         for attempt in range(max_retries):
+            instrument.current_span().set(attempts=attempt + 1)
             try:
                 if config:
                     return client_instance.models.generate_content(model=model, contents=contents, config=config)
                 return client_instance.models.generate_content(model=model, contents=contents)
             except Exception as e:
                 if "429" in str(e) or "503" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                    LLM_RETRIES.inc(role=role)
+                    LLM_RETRY_SLEEP.inc(2, role=role)
                     time.sleep(2)
                 else:
+                    LLM_FAILURES.inc(role=role)
                     return None
+        LLM_FAILURES.inc(role=role)
         return None
 
     def _get_topics_from_resume(self, text):
+        from google.genai import types
         prompt = f"""
         You are a Technical Recruiter.
         RESUME: {text[:2000]}...
@@ -107,7 +277,7 @@ class AdaptiveInterviewer:
         TASK: Identify the TOP 1 single most important technical skill.
         """
         response = self._safe_api_call(
-            client_instance=client_topics, 
+            role="topics",
             model="gemini-flash-latest",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -120,55 +290,107 @@ class AdaptiveInterviewer:
                 return json.loads(response.text)['topics'][:1]
             except:
                 pass
-        return ["General Skills"]
+        return list(DEFAULT_TOPICS)
 
-    def generate_question(self):
-        topic = self.topics[self.current_topic_index]
-        prompt = f"""
+    def _question_prompt(self, topic_index, difficulty, questions_asked):
+        topic = self.topics[topic_index]
+        return f"""
         You are a technical interviewer.
         CONTEXT:
         - Job Role: {self.job_description}
         - Topic: {topic}
-        - Difficulty: {self.difficulty_level}/3 (1=Easy, 3=Hard)
-        - Question Count: {self.questions_asked_in_current_topic + 1}
+        - Difficulty: {difficulty}/3 (1=Easy, 3=Hard)
+        - Question Count: {questions_asked + 1}
         TASK:
         Ask ONE direct interview question about {topic}.
         - STRICTLY 1 or 2 sentences max.
         """
-        response = self._safe_api_call(
-            client_instance=client_asker,
-            model="gemini-flash-latest", 
-            contents=prompt
-        )
+
+    def _state_key(self):
+        return (self.current_topic_index, self.difficulty_level, self.questions_asked_in_current_topic)
+
+    def _next_state_key(self, is_correct):
+        """
+        The state evaluate_answer will leave us in for a given grade, without changing anything.
+        """
+        asked = self.questions_asked_in_current_topic + 1
+        correct = self.correct_answers_in_current_topic + (1 if is_correct else 0)
+        if correct >= 3 or asked >= 5:
+            return (self.current_topic_index + 1, 2, 0)
+        difficulty = min(3, self.difficulty_level + 1) if is_correct else max(1, self.difficulty_level - 1)
+        return (self.current_topic_index, difficulty, asked)
+
+    def _prefetch_next_questions(self):
+        # Speculatively write the next question for both possible grades
+        for is_correct in (True, False):
+            key = self._next_state_key(is_correct)
+            if key[0] < len(self.topics) and key not in self._prefetched:
+                self._prefetched[key] = self._submit("asker", "gemini-flash-latest", self._question_prompt(*key))
+
+    def _discard_prefetched(self, keep=None):
+        for key in list(self._prefetched):
+            if key != keep:
+                self.llm.discard(self._prefetched.pop(key))
+
+    def generate_question(self):
+        with instrument.span("interview.question"):
+            return self._generate_question()
+
+    def _generate_question(self):
+        topic = self.topics[self.current_topic_index]
+        prefetched = self._prefetched.pop(self._state_key(), None)
+        if prefetched is not None:
+            response = prefetched.result()
+        else:
+            response = self._safe_api_call(
+                role="asker",
+                model="gemini-flash-latest", 
+                contents=self._question_prompt(*self._state_key())
+            )
         if response and response.text:
             self.current_question_text = response.text.strip()
         else:
             self.current_question_text = f"Tell me about {topic}."
+        self.questions_generated += 1
+        if self.session_log is not None:
+            self.session_log.mark_question(self.questions_generated - 1, self.current_topic_index,
+                                           self.difficulty_level)
             
-        # 🔥 SEND TO WEBHOOK (Brain Speaks)
-        try:
-            webhook_payload = {"text": self.current_question_text}
-            requests.post(WEBHOOK_URL, json=webhook_payload)
-        except Exception as e:
-            print(f"⚠️ Webhook Error: {e}")
+        # 🔥 SEND TO WEBHOOK (Brain Speaks) - queued, delivered in the background
+        if self.webhook is not None:
+            self.webhook.emit({"text": self.current_question_text})
 
         return self.current_question_text
 
     def evaluate_answer(self, user_answer):
+        with instrument.span("interview.answer") as span:
+            status = self._evaluate_answer(user_answer)
+            span.set(status=status)
+            return status
+
+    def _evaluate_answer(self, user_answer):
+        from google.genai import types
         prompt = f"""
         Question: "{self.current_question_text}"
         User Answer: "{user_answer}"
         Task: Check if factually correct.
         """
-        response = self._safe_api_call(
-            client_instance=client_grader,
-            model="gemini-flash-latest",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=AnswerGrade
-            )
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=AnswerGrade
         )
+        if self.llm is not None and PREFETCH_QUESTIONS:
+            # Grade while both possible next questions are already being written
+            grading = self._submit("grader", "gemini-flash-latest", prompt, config)
+            self._prefetch_next_questions()
+            response = grading.result()
+        else:
+            response = self._safe_api_call(
+                role="grader",
+                model="gemini-flash-latest",
+                contents=prompt,
+                config=config
+            )
         
         is_correct = True
         if response and response.text:
@@ -179,24 +401,34 @@ class AdaptiveInterviewer:
 
         self.questions_asked_in_current_topic += 1
         
+        instrument.counter("interview_answers_total", "Graded answers").inc(correct=bool(is_correct))
+        points = 30 + (self.difficulty_level * 2) if is_correct else 0
+        if self.session_log is not None:
+            self.session_log.mark_answer(self.questions_generated - 1, self.current_topic_index,
+                                         self.difficulty_level, is_correct, points)
         if is_correct:
-            points = 30 + (self.difficulty_level * 2)
             self.current_skill_score += points
             self.correct_answers_in_current_topic += 1 
-            print(f"   ✅ Correct! (+{points} pts)")
+            instrument.emit("interview.grade", correct=True, points=points)
             self.difficulty_level = min(3, self.difficulty_level + 1)
         else:
-            print(f"   ❌ Wrong. (+0 pts)")
+            instrument.emit("interview.grade", correct=False, points=0)
             self.difficulty_level = max(1, self.difficulty_level - 1)
 
         if self.correct_answers_in_current_topic >= 3 or self.questions_asked_in_current_topic >= 5:
             self._move_next_topic()
-            return "SWITCHED_TOPIC"
-            
-        return "CONTINUE"
+            status = "SWITCHED_TOPIC"
+        else:
+            status = "CONTINUE"
+
+        # Keep only the speculative question for the branch we actually took
+        if self._prefetched:
+            self._discard_prefetched(keep=self._state_key())
+        return status
 
     def _move_next_topic(self):
-        print(f"   📝 Section Score Locked: {self.current_skill_score}")
+        instrument.emit("interview.topic_score", topic=self.topics[self.current_topic_index],
+                        score=self.current_skill_score)
         self.skill_scores.append(self.current_skill_score)
         self.current_topic_index += 1
         self.current_skill_score = 0
@@ -204,26 +436,44 @@ class AdaptiveInterviewer:
         self.correct_answers_in_current_topic = 0
         self.difficulty_level = 2 
 
+    @property
+    def voice_bot(self):
+        if self._voice_bot is None:
+            self._voice_bot = default_voice_bot()
+        return self._voice_bot
+
     # 🔥 Method for Voice Input
     def get_human_input(self):
         # Calls the listen method from your voice.py
-        return self.voice_bot.listen()
+        # The voice bot may be shared between sessions, so the log goes with the call
+        return self.voice_bot.listen(session_log=self.session_log)
 
 # --- 4. MAIN EXECUTION ---
 def extract_text_from_pdf(pdf_path):
     try:
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages: text += page.extract_text() + "\n"
-        return text
+        return extract_pdf_text(pdf_path)
     except: return "Experience with Python."
 
 if __name__ == "__main__":
-    resume_path = "brain/Alex_Taylor_Resume.pdf"
-    content = extract_text_from_pdf(resume_path) if os.path.exists(resume_path) else "Python Skills"
+    try:
+        init()
+    except RuntimeError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    instrument.configure()
 
-    bot = AdaptiveInterviewer(content, TARGET_JOB_DESCRIPTION)
+    resume_path = os.path.join(current_dir, "Alex_Taylor_Resume.pdf")
+    llm = None
+    if USE_ASYNC_LLM:
+        from llm import LLMClient
+        llm = LLMClient(role_keys(), base_url=LLM_BASE_URL)
+    from sessionlog import SessionLog, upload
+    session_log = SessionLog(SESSION_LOG_PATH)
+    if os.path.exists(resume_path):
+        bot = AdaptiveInterviewer(None, TARGET_JOB_DESCRIPTION, resume_path=resume_path, llm=llm,
+                                  session_log=session_log)
+    else:
+        bot = AdaptiveInterviewer("Python Skills", TARGET_JOB_DESCRIPTION, llm=llm, session_log=session_log)
     
     print("\n" + "="*40 + "\n🤖 INTERVIEW STARTED\n" + "="*40)
     
@@ -247,4 +497,13 @@ if __name__ == "__main__":
     print("\n📊 INTERVIEW COMPLETE")
     if bot.skill_scores:
         avg = sum(bot.skill_scores) / len(bot.skill_scores)
-        print(f"Final Score: {avg:.2f}")
\ No newline at end of file
+        print(f"Final Score: {avg:.2f}")
+
+    session_log.close()
+    if SAVE_URL:
+        stats = upload([session_log.summary(USER_ID)], SAVE_URL)
+        print(f"📦 Session {'saved' if not stats['failed'] else 'NOT saved'} "
+              f"({stats['bytes']} bytes gzip for {stats['raw_bytes']} bytes of JSON)")
+
+    if llm is not None:
+        llm.close()
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Adaptive interviewer: Gemini clients, resume ingestion, webhook, server.
+
+The modules in this folder import each other by bare name (so they also run
+as scripts), which is why importing the package puts the folder on sys.path.
+Nothing heavy happens here; call init() (or just build an
+AdaptiveInterviewer) to load configuration, and attributes such as
+Brain.AdaptiveInterviewer are read from Brain/Brain.py on first access.
+"""
+import os
+import sys
+import importlib
+
+_here = os.path.dirname(os.path.abspath(__file__))
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+
+# Shared metrics / tracing (telemetry/instrument.py) is imported by bare name too
+_telemetry = os.path.join(os.path.dirname(_here), "telemetry")
+if _telemetry not in sys.path:
+    sys.path.append(_telemetry)
+
+
+def __getattr__(name):
+    # Forwarded on every access, so values set by init() are always current
+    return getattr(importlib.import_module(__name__ + ".Brain"), name)
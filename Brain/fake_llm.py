@@ -0,0 +1,135 @@
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURATION ---
+DEFAULT_LATENCY = 0.3       # Seconds per generate_content call
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024   # Load tests open connections in bursts; a short backlog costs a 1 s SYN retry
+
+
+class FakeModelServer:
+    """
+    Local stand-in for the Gemini REST API so the real google-genai client can
+    be pointed at it (http_options base_url) and tested offline.
+
+    Answers ":generateContent" with a canned question, or with JSON filled in
+    from the request's response schema (booleans come from `grade`, lists of
+    strings become ["Python"]). Every call is counted per model and per API
+    key; `error_rate` answers a share of calls with 429 RESOURCE_EXHAUSTED.
+    """
+    def __init__(self, latency=DEFAULT_LATENCY, error_rate=0.0, grade=True, port=0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.grade = grade          # True/False, or a probability of answering "correct"
+        self.calls = 0
+        self.errors = 0
+        self.calls_by_key = {}
+        self.calls_by_model = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.calls_by_key = {}
+            self.calls_by_model = {}
+
+    # --- RESPONSES ---
+    def _fill_schema(self, schema):
+        kind = str(schema.get("type", "")).lower()
+        if kind == "object" or "properties" in schema:
+            return {name: self._fill_schema(prop) for name, prop in schema.get("properties", {}).items()}
+        if kind == "array":
+            return ["Python"]
+        if kind == "boolean":
+            if isinstance(self.grade, bool):
+                return self.grade
+            with self._lock:
+                return self._rng.random() < self.grade
+        if kind in ("integer", "number"):
+            return 1
+        return "Looks fine."
+
+    def _respond(self, model, body):
+        config = body.get("generationConfig", {})
+        schema = config.get("responseJsonSchema") or config.get("responseSchema")
+        if config.get("responseMimeType") == "application/json" and schema:
+            text = json.dumps(self._fill_schema(schema))
+        else:
+            text = f"Can you explain how you would use this skill in practice? ({model})"
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+            "modelVersion": model,
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                model = self.path.split("/models/")[-1].split(":")[0]
+                key = self.headers.get("x-goog-api-key", "")
+
+                with server._lock:
+                    server.calls += 1
+                    server.calls_by_key[key] = server.calls_by_key.get(key, 0) + 1
+                    server.calls_by_model[model] = server.calls_by_model.get(model, 0) + 1
+                    fail = server._rng.random() < server.error_rate
+                    if fail:
+                        server.errors += 1
+
+                time.sleep(server.latency)
+
+                if fail:
+                    status, payload = 429, {"error": {"code": 429, "message": "Quota exceeded",
+                                                      "status": "RESOURCE_EXHAUSTED"}}
+                elif not self.path.endswith(":generateContent"):
+                    status, payload = 404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}}
+                else:
+                    status, payload = 200, server._respond(model, body)
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except BrokenPipeError:
+                    pass    # The client cancelled a speculative request
+
+        return Handler
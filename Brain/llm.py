@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+import httpx
+from google import genai
+from google.genai import types
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+# Shared metrics / tracing (telemetry/instrument.py)
+import instrument   # telemetry/, on sys.path via the package __init__
+
+# --- CONFIGURATION ---
+REQUEST_TIMEOUT = 30.0          # Seconds per generate_content attempt
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5              # First retry waits ~0.5 s, then ~1 s, ~2 s ... (with jitter)
+BACKOFF_CAP = 8.0
+REQUESTS_PER_MINUTE = 60        # Per API key
+MAX_CONNECTIONS = 1000          # Per API key; httpx's default of 100 queues calls once many sessions share a client
+RETRYABLE = ("429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE")
+
+# Metrics (also counted by AdaptiveInterviewer when it calls a client directly)
+LLM_RETRIES = instrument.counter("llm_retries_total", "Gemini calls retried after 429/503")
+LLM_RETRY_SLEEP = instrument.counter("llm_retry_sleep_seconds_total", "Seconds slept before retries")
+LLM_FAILURES = instrument.counter("llm_failures_total", "Gemini calls given up on")
+LLM_TIMEOUTS = instrument.counter("llm_timeouts_total", "Gemini attempts that timed out")
+
+
+class RateLimiter:
+    """
+    Token bucket per API key: bursts up to `per_minute / 6` calls, then one
+    call every 60 / per_minute seconds. Only used from the client's event loop.
+    """
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class LLMClient:
+    """
+    Async Gemini access for all interview roles, run on one background event loop.
+
+    One genai.Client per distinct API key (so its HTTP connections are reused),
+    a rate limiter per key, a timeout per attempt and exponential backoff with
+    jitter on 429/503. Sync code uses submit() for a concurrent Future or
+    call() to block; async code awaits generate().
+
+    keys maps role ("topics", "asker", "grader") -> API key.
+    """
+    def __init__(self, keys, base_url=None, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+                 requests_per_minute=REQUESTS_PER_MINUTE, max_connections=MAX_CONNECTIONS):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections // 4)
+        http_options = types.HttpOptions(base_url=base_url, async_client_args={"limits": limits})
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._clients = {}
+        self._limiters = {}
+        self._role_keys = dict(keys)
+        for key in set(keys.values()):
+            self._clients[key] = genai.Client(api_key=key, http_options=http_options)
+            self._limiters[key] = RateLimiter(requests_per_minute)
+
+        self.stats = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0, "cancelled": 0}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def generate(self, role, model, contents, config=None):
+        """
+        Returns the response, or None once retries are exhausted or on a
+        non-retryable error (same contract as AdaptiveInterviewer._safe_api_call).
+        """
+        key = self._role_keys[role]
+        client = self._clients[key]
+        limiter = self._limiters[key]
+
+        with instrument.span("llm.generate", role=role) as span:
+            for attempt in range(self.max_retries):
+                await limiter.acquire()
+                self.stats["calls"] += 1
+                span.set(attempts=attempt + 1)
+                try:
+                    request = client.aio.models.generate_content(model=model, contents=contents, config=config)
+                    return await asyncio.wait_for(request, self.timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    LLM_TIMEOUTS.inc(role=role)
+                except Exception as e:
+                    if not any(code in str(e) for code in RETRYABLE):
+                        self.stats["failures"] += 1
+                        LLM_FAILURES.inc(role=role)
+                        return None
+
+                if attempt < self.max_retries - 1:
+                    self.stats["retries"] += 1
+                    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+                    LLM_RETRIES.inc(role=role)
+                    LLM_RETRY_SLEEP.inc(delay, role=role)
+                    await asyncio.sleep(delay)
+
+            self.stats["failures"] += 1
+            LLM_FAILURES.inc(role=role)
+            return None
+
+    def submit(self, role, model, contents, config=None):
+        """
+        Schedules a call on the client's loop and returns a concurrent.futures.Future.
+        Cancelling the future cancels the request.
+        """
+        return asyncio.run_coroutine_threadsafe(self.generate(role, model, contents, config), self._loop)
+
+    def call(self, role, model, contents, config=None):
+        return self.submit(role, model, contents, config).result()
+
+    def discard(self, future):
+        # Drop a speculative request we no longer need
+        if future.cancel():
+            self.stats["cancelled"] += 1
+
+    def close(self):
+        async def _close():
+            for client in self._clients.values():
+                try:
+                    await client.aio.aclose()
+                except Exception:
+                    pass
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+# --- BENCHMARK ---
+def benchmark(latency=0.3, interviews=3):
+    """
+    Answer-to-next-question latency and call counts, blocking clients vs. this
+    layer with speculative prefetch, against fake_llm.FakeModelServer.
+    """
+    from fake_llm import FakeModelServer
+
+    with FakeModelServer(latency=latency, grade=0.6) as server:
+        for name in ("GEMINI_KEY_TOPICS", "GEMINI_KEY_ASKER", "GEMINI_KEY_GRADER"):
+            os.environ.setdefault(name, "fake-" + name.lower())
+        os.environ["GEMINI_BASE_URL"] = server.url
+        os.environ["WEBHOOK_URL"] = ""
+        import Brain
+        Brain.USE_RESPONSE_CACHE = False    # Measure real LLM traffic
+
+        keys = Brain.role_keys()
+        for label, llm in (("Blocking clients", None), ("Async + prefetch", LLMClient(keys, base_url=server.url, requests_per_minute=6000))):
+            server.reset_counts()
+            turn_times = []
+            for _ in range(interviews):
+                bot = Brain.AdaptiveInterviewer("Python Skills", "File clerk", llm=llm)
+                bot.generate_question()
+                while True:
+                    t = time.perf_counter()
+                    bot.evaluate_answer("I would use a dictionary.")
+                    if bot.current_topic_index >= len(bot.topics):
+                        break
+                    bot.generate_question()
+                    turn_times.append(time.perf_counter() - t)
+
+            turn_ms = sorted(x * 1000 for x in turn_times)
+            print(f"⏱️  {label}: answer -> next question p50 {turn_ms[len(turn_ms) // 2]:.0f} ms, "
+                  f"max {turn_ms[-1]:.0f} ms | {server.calls / interviews:.1f} LLM calls per interview")
+            if llm is not None:
+                print(f"   Client stats: {llm.stats}")
+                llm.close()
+
+
+if __name__ == "__main__":
+    benchmark()
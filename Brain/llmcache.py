@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pydantic import BaseModel
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(current_dir, ".llm_cache.sqlite"))
+MEMORY_ENTRIES = 1024
+DISK_MAX_BYTES = 100 * 1024 * 1024
+TTL = 7 * 24 * 3600             # Seconds; ignored in replay mode
+
+
+def _schema_fingerprint(config):
+    # Everything in the config that changes what the model answers
+    if config is None:
+        return None
+    schema = config.response_schema
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    elif schema is not None:
+        schema = str(schema)
+    return {
+        "mime": config.response_mime_type,
+        "schema": schema,
+        "temperature": config.temperature,
+        "system": str(config.system_instruction) if config.system_instruction else None,
+    }
+
+
+def cache_key(model, contents, config=None):
+    """
+    sha256 of model + whitespace-normalized prompt + response schema, so
+    re-indented f-string prompts still hit.
+    """
+    if isinstance(contents, str):
+        prompt = " ".join(contents.split())
+    else:
+        prompt = json.dumps(contents, sort_keys=True, default=str)
+    material = json.dumps([model, prompt, _schema_fingerprint(config)], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of Gemini responses: an in-memory LRU in front of a SQLite
+    file with a TTL and a byte budget (least recently used rows go first).
+
+    Responses are stored as their JSON dump and rebuilt as
+    GenerateContentResponse, so callers can't tell a hit from a fresh call.
+    Each entry remembers how long the original call took, which is what a
+    hit saves.
+
+    mode="replay" serves anything ever stored regardless of TTL, so a
+    recorded run replays identically (misses are still called and recorded).
+    Pass path=None for a memory-only cache.
+    """
+    def __init__(self, path=CACHE_PATH, memory_entries=MEMORY_ENTRIES, max_bytes=DISK_MAX_BYTES, ttl=TTL,
+                 mode="normal"):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.replay = mode == "replay"
+        self.reset_stats()
+
+        self._memory = OrderedDict()    # key -> (created, latency, response)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, value BLOB, created REAL, accessed REAL, latency REAL, size INTEGER)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._db.commit()
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def reset_stats(self):
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "saved_seconds": 0.0}
+
+    @property
+    def hit_ratio(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _fresh(self, created):
+        return self.replay or time.time() - created <= self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._fresh(entry[0]):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["saved_seconds"] += entry[1]
+                return entry[2]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created, latency FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and self._fresh(row[1]):
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    from google.genai import types
+                    response = types.GenerateContentResponse.model_validate_json(row[0])
+                    self._remember(key, (row[1], row[2], response))
+                    self.stats["disk_hits"] += 1
+                    self.stats["saved_seconds"] += row[2]
+                    return response
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, response, latency):
+        if response is None or not response.text:
+            return      # Never cache failures, they'd stick for a whole TTL
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now, latency, response))
+            self.stats["stores"] += 1
+            if self._db is None:
+                return
+            value = response.model_dump_json(exclude_none=True).encode()
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, value, now, now, latency, len(value)))
+            self._bytes += len(value) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        if not self.replay:
+            expired = self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)).rowcount
+            if expired:
+                self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k, _ in rows])
+            for key, size in rows:
+                self._memory.pop(key, None)
+                self._bytes -= size
+                self.stats["evictions"] += 1
+
+    def summary(self):
+        return (f"hit ratio {self.hit_ratio:.0%} ({self.stats['memory_hits']} memory, {self.stats['disk_hits']} disk, "
+                f"{self.stats['misses']} misses) | saved {self.stats['saved_seconds']:.1f} s of LLM time")
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+
+# --- BENCHMARK ---
+def benchmark(latency=0.3, interviews=5):
+    """
+    Replays the same drill interviews against fake_llm.FakeModelServer:
+    the first pass fills the cache, the next ones run from memory and then
+    from disk as a fresh process would.
+    """
+    import tempfile
+    from fake_llm import FakeModelServer
+
+    with FakeModelServer(latency=latency, grade=True) as server, tempfile.TemporaryDirectory() as tmp:
+        for name in ("GEMINI_KEY_TOPICS", "GEMINI_KEY_ASKER", "GEMINI_KEY_GRADER"):
+            os.environ.setdefault(name, "fake-" + name.lower())
+        os.environ["GEMINI_BASE_URL"] = server.url
+        os.environ["WEBHOOK_URL"] = ""
+        import Brain
+
+        path = os.path.join(tmp, "cache.sqlite")
+        for label in ("Cold (records)", "Warm (memory)", "Replay (new process, disk)"):
+            if label.startswith("Cold"):
+                cache = ResponseCache(path, mode="replay")
+            elif label.startswith("Replay"):
+                cache.close()
+                cache = ResponseCache(path, mode="replay")
+            server.reset_counts()
+            cache.reset_stats()
+            t = time.perf_counter()
+            for _ in range(interviews):
+                bot = Brain.AdaptiveInterviewer("Python Skills", "File clerk", cache=cache, cache_questions=True)
+                while bot.current_topic_index < len(bot.topics):
+                    bot.generate_question()
+                    bot.evaluate_answer("I would use a dictionary.")
+            elapsed = time.perf_counter() - t
+            print(f"⏱️  {label}: {elapsed / interviews * 1000:.0f} ms per interview, "
+                  f"{server.calls} LLM calls | {cache.summary()}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+    benchmark()
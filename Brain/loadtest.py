@@ -0,0 +1,148 @@
+import os
+import io
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+
+# --- CONFIGURATION ---
+SESSIONS = 200              # Virtual candidates in total
+CONCURRENCY = 100           # Candidates interviewing at the same time
+LLM_LATENCY = 0.3           # Seconds per stubbed Gemini call
+ANSWER = "I would use a dictionary."
+
+
+class Client:
+    """
+    One keep-alive HTTP/1.1 connection to the interview server.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, body=None):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        self._writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n").encode() + data)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, value = line.decode("latin-1").split(":", 1)
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self._reader.readexactly(length))
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} -> {status}: {payload}")
+        return payload
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+async def candidate(host, port, turn_times):
+    """
+    One full interview. A turn is answer -> next question, the wait a candidate actually feels.
+    """
+    client = Client(host, port)
+    try:
+        session = await client.request("POST", "/sessions", {"resume_text": "Python Skills",
+                                                             "job_description": "File clerk"})
+        base = f"/sessions/{session['session_id']}"
+        await client.request("POST", base + "/question")
+        while True:
+            t = time.perf_counter()
+            result = await client.request("POST", base + "/answer", {"answer": ANSWER})
+            if result["finished"]:
+                break
+            await client.request("POST", base + "/question")
+            turn_times.append(time.perf_counter() - t)
+        return await client.request("POST", base + "/finish")
+    finally:
+        await client.close()
+
+
+async def run(sessions, concurrency, latency):
+    from fake_llm import FakeModelServer
+    from webhook import FakeWebhookServer
+
+    with FakeModelServer(latency=latency, grade=0.6) as llm_server, FakeWebhookServer() as hook:
+        for name in ("GEMINI_KEY_TOPICS", "GEMINI_KEY_ASKER", "GEMINI_KEY_GRADER"):
+            os.environ.setdefault(name, "fake-" + name.lower())
+        os.environ["GEMINI_BASE_URL"] = llm_server.url
+        os.environ["WEBHOOK_URL"] = hook.url
+
+        import Brain
+        Brain.USE_RESPONSE_CACHE = False    # Measure real LLM traffic
+        from server import InterviewServer, build_manager
+
+        t = time.perf_counter()
+        # The stub has no quota, so don't let the per-key rate limiter become the bottleneck
+        manager = build_manager(requests_per_minute=10 ** 6)
+        startup = time.perf_counter() - t
+        server = await InterviewServer(manager, "127.0.0.1", 0).start()
+
+        turn_times = []
+        gate = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with gate:
+                return await candidate("127.0.0.1", server.port, turn_times)
+
+        t = time.perf_counter()
+        # The interviewer prints every grade; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await asyncio.gather(*(limited() for _ in range(sessions)), return_exceptions=True)
+        elapsed = time.perf_counter() - t
+
+        # What the server's own telemetry saw (the same data GET /metrics serves)
+        import instrument
+        metrics = instrument.snapshot()["metrics"]
+
+        await server.stop()
+        manager.close()
+        manager.llm.close()
+        Brain.WEBHOOK.close()
+
+    failures = [r for r in results if isinstance(r, Exception)]
+    turn_ms = sorted(x * 1000 for x in turn_times)
+    print(f"🚀 Startup (models + clients, once): {startup * 1000:.0f} ms")
+    print(f"⏱️  {sessions - len(failures)}/{sessions} interviews in {elapsed:.2f} s "
+          f"({(sessions - len(failures)) / elapsed:.1f} sessions/sec, concurrency {concurrency})")
+    if turn_ms:
+        p = lambda q: turn_ms[min(len(turn_ms) - 1, int(q * len(turn_ms)))]
+        print(f"⏱️  Turn latency over {len(turn_ms)} turns: p50 {p(0.5):.0f} ms, "
+              f"p99 {p(0.99):.0f} ms, max {turn_ms[-1]:.0f} ms (stub LLM: {latency * 1000:.0f} ms/call)")
+    print(f"   LLM calls per interview: {llm_server.calls / sessions:.1f}")
+    print(f"   Webhook: {Brain.WEBHOOK.summary()}")
+    for name in ("interview_question_seconds", "interview_answer_seconds", "llm_generate_seconds",
+                 "webhook_post_seconds"):
+        for series in metrics.get(name, {}).get("values", []):
+            labels = "".join(f" {k}={v}" for k, v in series["labels"].items())
+            print(f"📊 {name}{labels}: {series['count']} spans, p50 {series['p50'] * 1000:.0f} ms, "
+                  f"p95 {series['p95'] * 1000:.0f} ms")
+    if failures:
+        print(f"⚠️ {len(failures)} interviews failed, first: {failures[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the interview server against a stubbed LLM.")
+    parser.add_argument("--sessions", type=int, default=SESSIONS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=LLM_LATENCY)
+    args = parser.parse_args()
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+    asyncio.run(run(args.sessions, args.concurrency, args.latency))
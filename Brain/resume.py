@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("RESUME_CACHE_DIR", os.path.join(current_dir, ".resume_cache"))
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+PROMPT_CHARS = 2000         # The topic prompt only ever sees this much of the resume
+PARALLEL_MIN_PAGES = 16     # Smaller PDFs are faster to read in-process
+PAGES_PER_TASK = 8
+
+
+def _extract_page_range(pdf_path, start, end):
+    # Runs in a worker process: each worker parses the PDF itself
+    import PyPDF2
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [(reader.pages[i].extract_text() or "") + "\n" for i in range(start, end)]
+
+
+def iter_pages(pdf_path, workers=None):
+    """
+    Yields page texts in order, each followed by "\\n" (same text as
+    extract_text_from_pdf once joined). Large PDFs are split into page ranges
+    extracted by a process pool, but the first range is still yielded as soon
+    as it is ready.
+    """
+    import PyPDF2
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        n_pages = len(reader.pages)
+
+        if n_pages < PARALLEL_MIN_PAGES:
+            for page in reader.pages:
+                yield (page.extract_text() or "") + "\n"
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # The first pages come from this process so the prompt isn't delayed by pool start-up
+            futures = [pool.submit(_extract_page_range, pdf_path, start, min(start + PAGES_PER_TASK, n_pages))
+                       for start in range(PAGES_PER_TASK, n_pages, PAGES_PER_TASK)]
+            for i in range(min(PAGES_PER_TASK, n_pages)):
+                yield (reader.pages[i].extract_text() or "") + "\n"
+            for future in futures:
+                yield from future.result()
+
+
+def extract_pdf_text(pdf_path, workers=None):
+    return "".join(iter_pages(pdf_path, workers))
+
+
+def file_digest(pdf_path):
+    h = hashlib.sha256()
+    with open(pdf_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResumeCache:
+    """
+    JSON files on disk, one per key, evicted least-recently-used first once the
+    directory grows past max_bytes. A hit refreshes the file's mtime.
+    The directory size is tracked in memory; it is only listed (and the tracked
+    size corrected for other writers) when that size crosses max_bytes.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        path = self._path(key)
+        # A unique temp file, so concurrent puts of the same key can't interleave their writes
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+                size = f.tell()
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+        self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+        self._size = total
+
+
+class ResumeIngestor:
+    """
+    Resume text + topics with an on-disk cache.
+
+    Text is keyed by the PDF's content hash, topics by that hash plus the job
+    description. On a miss the topic call starts as soon as the first
+    PROMPT_CHARS characters are extracted, while the remaining pages are
+    still being read.
+    """
+    def __init__(self, cache=None, workers=None):
+        self.cache = cache or ResumeCache()
+        self.workers = workers
+        self.last_timing = {}
+
+    def ingest(self, pdf_path, job_description, topic_fn, fallback_topics=None):
+        """
+        Returns (resume_text, topics). topic_fn(text) is the topic lookup; results
+        equal to fallback_topics (e.g. after an API failure) are not cached.
+        """
+        start = time.perf_counter()
+        digest = file_digest(pdf_path)
+        text_key = "text-" + digest
+        topic_key = "topics-" + hashlib.sha256((digest + "\n" + job_description).encode()).hexdigest()
+
+        cached_text = self.cache.get(text_key)
+        cached_topics = self.cache.get(topic_key)
+
+        if cached_text is not None and cached_topics is not None:
+            self.last_timing = {"total": time.perf_counter() - start, "warm": True}
+            return cached_text, cached_topics
+
+        if cached_text is not None:
+            text, topics = cached_text, topic_fn(cached_text)
+        else:
+            text, topics = self._extract_and_ask(pdf_path, topic_fn, cached_topics)
+            self.cache.put(text_key, text)
+
+        if cached_topics is None and topics != fallback_topics:
+            self.cache.put(topic_key, topics)
+
+        self.last_timing = {"total": time.perf_counter() - start, "warm": False}
+        return text, topics
+
+    def _extract_and_ask(self, pdf_path, topic_fn, cached_topics):
+        pages = []
+        n_chars = 0
+        topic_future = None
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for page in iter_pages(pdf_path, self.workers):
+                pages.append(page)
+                n_chars += len(page)
+                if topic_future is None and cached_topics is None and n_chars >= PROMPT_CHARS:
+                    topic_future = pool.submit(topic_fn, "".join(pages))
+
+            text = "".join(pages)
+            if cached_topics is not None:
+                return text, cached_topics
+            if topic_future is None:
+                # Short resume: the whole text fits in the prompt
+                return text, topic_fn(text)
+            return text, topic_future.result()
+
+
+# --- BENCHMARK ---
+def benchmark(pdf_path=os.path.join(current_dir, "Alex_Taylor_Resume.pdf"), topic_latency=1.0):
+    """
+    Cold vs. warm ingestion with a stand-in for the Gemini topic call.
+    """
+    import tempfile
+    import PyPDF2
+
+    def fake_topics(text):
+        time.sleep(topic_latency)
+        return ["Python"]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ingestor = ResumeIngestor(ResumeCache(cache_dir))
+
+        t = time.perf_counter()
+        old_text = "".join((p.extract_text() or "") + "\n" for p in PyPDF2.PdfReader(pdf_path).pages)
+        fake_topics(old_text[:PROMPT_CHARS])
+        sequential = time.perf_counter() - t
+
+        ingestor.ingest(pdf_path, "File clerk", fake_topics)
+        cold = ingestor.last_timing["total"]
+        ingestor.ingest(pdf_path, "File clerk", fake_topics)
+        warm = ingestor.last_timing["total"]
+        ingestor.ingest(pdf_path, "Data analyst", fake_topics)
+        new_job = ingestor.last_timing["total"]
+
+    print(f"⏱️  Sequential (today): {sequential * 1000:.1f} ms")
+    print(f"⏱️  Cold:               {cold * 1000:.1f} ms")
+    print(f"⏱️  Warm:               {warm * 1000:.1f} ms")
+    print(f"⏱️  Same PDF, new job:  {new_job * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark(*sys.argv[1:2])
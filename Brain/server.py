@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+from llm import LLMClient, REQUESTS_PER_MINUTE
+import instrument   # telemetry/, on sys.path via the package __init__
+
+# --- CONFIGURATION ---
+HOST = os.getenv("INTERVIEW_HOST", "127.0.0.1")
+PORT = int(os.getenv("INTERVIEW_PORT", "8765"))
+SESSION_TTL = 30 * 60           # Seconds a session may sit idle before it is dropped
+TURN_WORKERS = 256              # Threads that wait on LLM calls for the blocking interviewer methods
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           409: "Conflict", 500: "Internal Server Error"}
+
+
+class InterviewSession:
+    """
+    One candidate: the interviewer state plus what the server needs to serialize
+    and expire it. Heavy objects (LLM client, voice model) are shared, not held here.
+    """
+    __slots__ = ("session_id", "bot", "lock", "last_active", "turns")
+
+    def __init__(self, session_id, bot):
+        self.session_id = session_id
+        self.bot = bot
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+        self.turns = 0
+
+    @property
+    def finished(self):
+        return self.bot.current_topic_index >= len(self.bot.topics)
+
+
+class SessionManager:
+    """
+    Holds every running interview. The LLM client and the voice system are
+    created once at startup and shared; each AdaptiveInterviewer method runs
+    on a worker thread so a slow Gemini call never blocks other sessions.
+    """
+    def __init__(self, llm, voice_bot, interviewer_cls, max_workers=TURN_WORKERS):
+        self.llm = llm
+        self.voice_bot = voice_bot
+        self.interviewer_cls = interviewer_cls
+        self.sessions = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="turn")
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.last_active = time.monotonic()
+        return session
+
+    async def create(self, resume_text, job_description):
+        bot = await self._run(lambda: self.interviewer_cls(resume_text, job_description,
+                                                           llm=self.llm, voice_bot=self.voice_bot))
+        session = InterviewSession(uuid.uuid4().hex, bot)
+        self.sessions[session.session_id] = session
+        return session
+
+    async def question(self, session):
+        async with session.lock:
+            return await self._run(session.bot.generate_question)
+
+    async def answer(self, session, text):
+        async with session.lock:
+            status = await self._run(session.bot.evaluate_answer, text)
+            session.turns += 1
+            return status
+
+    async def finish(self, session):
+        async with session.lock:
+            self.sessions.pop(session.session_id, None)
+            self._discard(session)
+        scores = session.bot.skill_scores
+        return {
+            "skill_scores": scores,
+            "final_score": sum(scores) / len(scores) if scores else None,
+            "turns": session.turns,
+        }
+
+    async def expire_idle(self):
+        cutoff = time.monotonic() - SESSION_TTL
+        for session in [s for s in self.sessions.values() if s.last_active < cutoff]:
+            if session.lock.locked():
+                continue        # A turn is running on the pool, so it isn't idle
+            async with session.lock:
+                self.sessions.pop(session.session_id, None)
+                self._discard(session)
+
+    @staticmethod
+    def _discard(session):
+        # Speculative next questions of a dead session would still spend rate-limiter tokens
+        if session.bot._prefetched:
+            session.bot._discard_prefetched()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class InterviewServer:
+    """
+    Minimal HTTP/1.1 JSON API (keep-alive) on asyncio streams:
+
+        POST /sessions                 {"resume_text", "job_description"} -> {"session_id", "topics"}
+        POST /sessions/<id>/question   -> {"question", "difficulty"}
+        POST /sessions/<id>/answer     {"answer"} -> {"status", "finished", "current_skill_score"}
+        POST /sessions/<id>/finish     -> {"skill_scores", "final_score", "turns"}
+        GET  /health                   -> {"sessions"}
+        GET  /metrics                  -> every metric, Prometheus text format
+        GET  /metrics.json             -> instrument.snapshot()
+    """
+    def __init__(self, manager, host=HOST, port=PORT):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self._server = None
+        self._reaper = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._reaper = asyncio.create_task(self._reap())
+        return self
+
+    async def stop(self):
+        self._reaper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(60)
+            await self.manager.expire_idle()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, value = line.decode("latin-1").split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # Can't tell where this request ends, so the connection can't be reused
+                    await self._respond(writer, 400, {"error": "Malformed request"})
+                    break
+
+                raw = await reader.readexactly(length)
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    status, payload = 400, {"error": "Invalid JSON"}
+                else:
+                    if not isinstance(body, dict):
+                        status, payload = 400, {"error": "Body must be a JSON object"}
+                    else:
+                        try:
+                            status, payload = await self.dispatch(method, path, body)
+                        except Exception as e:
+                            status, payload = 500, {"error": str(e)}
+
+                await self._respond(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload):
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload, default=float).encode(), "application/json"
+        writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(data)}\r\n\r\n").encode() + data)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+
+        if method == "GET" and parts == ["health"]:
+            return 200, {"sessions": len(self.manager.sessions)}
+
+        if method == "GET" and parts == ["metrics"]:
+            instrument.gauge("server_sessions", "Running interviews").set(len(self.manager.sessions))
+            return 200, instrument.prometheus()
+
+        if method == "GET" and parts == ["metrics.json"]:
+            return 200, instrument.snapshot()
+
+        if method == "POST" and parts == ["sessions"]:
+            session = await self.manager.create(body.get("resume_text", ""), body.get("job_description", ""))
+            return 201, {"session_id": session.session_id, "topics": session.bot.topics}
+
+        if method != "POST" or len(parts) != 3 or parts[0] != "sessions":
+            return 404, {"error": "Unknown route"}
+
+        session = self.manager.get(parts[1])
+        if session is None:
+            return 404, {"error": "Unknown session"}
+        action = parts[2]
+
+        if action == "question":
+            if session.finished:
+                return 409, {"error": "Interview already finished"}
+            question = await self.manager.question(session)
+            return 200, {"question": question, "difficulty": session.bot.difficulty_level}
+
+        if action == "answer":
+            if session.finished:
+                return 409, {"error": "Interview already finished"}
+            if not body.get("answer"):
+                return 400, {"error": "Missing answer"}
+            status = await self.manager.answer(session, body["answer"])
+            return 200, {"status": status, "finished": session.finished,
+                         "current_skill_score": session.bot.current_skill_score}
+
+        if action == "finish":
+            return 200, await self.manager.finish(session)
+
+        return 404, {"error": "Unknown route"}
+
+
+def build_manager(requests_per_minute=REQUESTS_PER_MINUTE):
+    """
+    Loads the heavy pieces once: one LLM client and one voice model for all sessions.
+    """
+    import Brain
+
+    keys = Brain.role_keys()
+    llm = LLMClient(keys, base_url=Brain.LLM_BASE_URL, requests_per_minute=requests_per_minute)
+    voice_bot = Brain.default_voice_bot()
+    voice_bot.init()
+    return SessionManager(llm, voice_bot, Brain.AdaptiveInterviewer)
+
+
+async def serve(host=HOST, port=PORT):
+    instrument.configure()
+    manager = build_manager()
+    server = await InterviewServer(manager, host, port).start()
+    print(f"🌐 Interview server listening on http://{host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        manager.close()
+        manager.llm.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nStopped.")
@@ -0,0 +1,394 @@
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+voice_folder_path = os.path.join(parent_dir, 'Voice_Confidence')
+video_folder_path = os.path.join(parent_dir, 'realProj')
+
+FUSED_RATE = 2.0                # Fused frames per second handed to the consumer
+FUSION_DELAY = 1.0              # Seconds; a frame describes the session this long ago, so slower stages have caught up
+AUDIO_HOP = 0.5                 # Seconds of audio per confidence update
+VIDEO_UPDATE_EVERY = 15         # Frames between body-language updates (0.5 s @ 30fps)
+VIDEO_CPU_BUDGET = 0.5          # Share of one core the video inference thread may use
+AUDIO_LAG_LIMIT = 1.0           # Seconds behind capture before the video budget is halved
+QUEUE_SIZE = 64                 # Per-stage queues; when full the oldest item is dropped
+HISTORY = 10.0                  # Seconds of per-modality samples kept for alignment
+
+# One fused, time-aligned reading. t is seconds since start(); the *_age fields
+# say how old each modality's value was at t (None = nothing yet)
+FusedFrame = namedtuple("FusedFrame", ["t", "confidence", "speaking", "attention", "stability", "smoothness",
+                                       "audio_age", "video_age"])
+AudioSample = namedtuple("AudioSample", ["t", "confidence", "speaking"])
+VideoSample = namedtuple("VideoSample", ["t", "attention", "stability", "smoothness"])
+
+
+def _add_paths():
+    # Both component folders hold plain modules imported by bare name
+    for path in (voice_folder_path, video_folder_path):
+        if path not in sys.path:
+            sys.path.append(path)
+
+
+def _offer(q, item):
+    """
+    put() that never blocks a producer: when the queue is full the oldest
+    item makes room. Returns True when something was dropped.
+    """
+    try:
+        q.put_nowait(item)
+        return False
+    except queue.Full:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        q.put_nowait(item)
+        return True
+
+
+class CpuBudget:
+    """
+    Keeps a stage under `share` of one core: after each call it rests for as
+    long as the call's CPU time (time.thread_time) allows. Lowering `share`
+    takes effect on the next call.
+    """
+    def __init__(self, share=VIDEO_CPU_BUDGET):
+        self.base_share = share
+        self.share = share
+        self.cpu_seconds = 0.0
+        self.rested_seconds = 0.0
+
+    def run(self, fn, *args):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        result = fn(*args)
+        used = time.thread_time() - cpu
+        self.cpu_seconds += used
+        if self.share < 1.0:
+            rest = used / self.share - (time.perf_counter() - wall)
+            if rest > 0:
+                time.sleep(rest)
+                self.rested_seconds += rest
+        return result
+
+
+class AudioStage(threading.Thread):
+    """
+    Reads the capture ring AUDIO_HOP at a time, runs the VAD and scores the
+    speech with the voice model. Emits one AudioSample per hop, stamped with
+    the capture time of its newest sample. A backlog longer than the
+    confidence window is skipped rather than queued, as in AnalysisWorker.
+    """
+    def __init__(self, ring, sample_rate, score, vad, window_samples, out):
+        super().__init__(daemon=True, name="session-audio")
+        from audiobuffer import RollingWindow
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.score = score
+        self.vad = vad
+        self.hop = int(AUDIO_HOP * sample_rate)
+        self.window_samples = window_samples
+        self.window = RollingWindow(window_samples)
+        self.out = out
+        self.start_time = None          # perf_counter time of stream sample 0, set by the engine
+        self.read_pos = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.cpu_seconds = 0.0
+        self.latencies = []             # Newest sample captured -> its score queued
+        self._stopping = threading.Event()
+
+    @property
+    def lag(self):
+        # Seconds of captured audio not analyzed yet
+        return (self.ring.write_pos - self.read_pos) / self.sample_rate
+
+    def run(self):
+        while True:
+            self.ring.data_ready.clear()
+            write_pos = self.ring.write_pos
+            if write_pos - self.read_pos < self.hop:
+                if self._stopping.is_set():
+                    break
+                self.ring.data_ready.wait(timeout=0.1)
+                continue
+
+            cpu = time.thread_time()
+            reset = write_pos - self.read_pos > self.window_samples
+            if reset:
+                self.skipped += 1
+                self.read_pos = write_pos - self.window_samples
+            samples, _ = self.ring.read(self.read_pos, write_pos)
+            self.read_pos = write_pos
+
+            speaking = self.vad.push(samples) > 0 or self.vad.is_speech
+            confidence = None
+            if speaking:
+                self.window.append(samples)
+                confidence = self.score(samples, self.window.view(), reset)
+            t = self.start_time + write_pos / self.sample_rate
+            self.dropped += _offer(self.out, AudioSample(t, confidence, speaking))
+            self.latencies.append(time.perf_counter() - t)
+            self.cpu_seconds += time.thread_time() - cpu
+
+    def stop(self):
+        self._stopping.set()
+        self.ring.data_ready.set()
+
+
+class SessionEngine:
+    """
+    Audio and video of one interview on a shared clock (time.perf_counter):
+
+    - audio: source -> capture ring -> AudioStage (VAD + confidence)
+    - video: CaptureThread -> newest-frame slot -> InferenceWorker (landmarks,
+      within a CpuBudget) -> MotionWindow
+    - fusion: every 1/FUSED_RATE s, the newest value of each modality at
+      t = now - FUSION_DELAY goes out as one FusedFrame
+
+    Stages hand over through bounded queues that drop their oldest item
+    rather than block, and the video budget is halved while the audio stage
+    is more than AUDIO_LAG_LIMIT behind, so landmarks can't starve the voice.
+
+    audio_source is a Voice_Confidence pipeline source (MicrophoneSource or
+    FakeAudioSource); video_source a camera index or file path. Pass
+    video_process (frame -> metrics dict or None) to replace the landmark
+    model, e.g. in tests. Pass session_log (a telemetry/sessionlog.SessionLog)
+    to keep every fused frame; its clock is set to the engine's on start().
+    """
+    def __init__(self, audio_source=None, video_source=0, voice_bot=None, video_process=None, realtime=True,
+                 fused_rate=FUSED_RATE, fusion_delay=FUSION_DELAY, video_budget=VIDEO_CPU_BUDGET,
+                 inference_scale=None, every_n=None, session_log=None):
+        _add_paths()
+        import voice
+        from vad import VoiceActivityDetector
+        from pipeline import AudioRing, MicrophoneSource, CAPTURE_BUFFER_DURATION
+        from video_pipeline import CaptureThread, InferenceWorker, INFERENCE_SCALE, PROCESS_EVERY_N
+        from motion import MotionWindow, BUFFER_SIZE
+
+        self.sample_rate = voice.SAMPLE_RATE
+        self.fused_rate = fused_rate
+        self.fusion_delay = fusion_delay
+        self.voice_bot = voice_bot or voice.VoiceAnalyzer()
+        if video_process is None:
+            from file import BodyLanguageProcessor
+            video_process = BodyLanguageProcessor().process
+
+        self.audio_source = audio_source or MicrophoneSource(self.sample_rate, int(self.sample_rate * AUDIO_HOP))
+        self.audio_ring = AudioRing(self.sample_rate * CAPTURE_BUFFER_DURATION)
+        self.audio_queue = queue.Queue(QUEUE_SIZE)
+        self.audio = AudioStage(self.audio_ring, self.sample_rate, self.voice_bot.live_scorer(),
+                                VoiceActivityDetector(self.sample_rate, voice.VAD_MODE),
+                                self.sample_rate * voice.CONFIDENCE_WINDOW, self.audio_queue)
+
+        self.video_budget = CpuBudget(video_budget)
+        self.video_queue = queue.Queue(QUEUE_SIZE)
+        self.video_dropped = 0
+        self.motion = MotionWindow(BUFFER_SIZE, VIDEO_UPDATE_EVERY)
+        self.capture = CaptureThread(video_source, realtime=realtime)
+        self.inference = InferenceWorker(self.capture.latest, lambda frame: self.video_budget.run(video_process, frame),
+                                         self._on_video_sample,
+                                         INFERENCE_SCALE if inference_scale is None else inference_scale,
+                                         PROCESS_EVERY_N if every_n is None else every_n, with_time=True)
+
+        self.frames_queue = queue.Queue(QUEUE_SIZE)
+        self.frames_dropped = 0
+        self.emitted = []
+        self.session_log = session_log
+        self.budget_cuts = 0            # Fusion ticks that ran with the video budget halved
+        self.t0 = None
+        self._fusion = threading.Thread(target=self._fuse, daemon=True, name="session-fusion")
+        self._stopping = threading.Event()
+        self.finished = threading.Event()
+
+    def _on_video_sample(self, metrics, t):
+        # Inference thread, one call per captured frame
+        if self.motion.append(metrics['wrist'], metrics['stability'], metrics['attention']):
+            self.video_dropped += _offer(self.video_queue, VideoSample(t, *self.motion.scores()))
+
+    def start(self):
+        import librosa  # noqa: F401 (the confidence penalty's first call would otherwise pay for the import)
+        self.t0 = time.perf_counter()
+        self.audio.start_time = self.t0
+        if self.session_log is not None:
+            self.session_log.t0 = self.t0
+        self.audio_source.start(self.audio_ring)
+        self.capture.start()
+        self.audio.start()
+        self.inference.start()
+        self._fusion.start()
+        return self
+
+    def _drained(self):
+        # File-backed sources are exhausted and every stage has caught up with them
+        return (getattr(self.audio_source, "finished", False) and self.capture.latest.closed
+                and not self.inference.is_alive() and self.audio.lag < AUDIO_HOP)
+
+    def _fuse(self):
+        audio, video = deque(), deque()
+        period = 1.0 / self.fused_rate
+        next_tick = self.t0 + self.fusion_delay + period
+        end_time = None
+        try:
+            while not self._stopping.is_set():
+                if end_time is None and self._drained():
+                    end_time = time.perf_counter()
+                if end_time is None:
+                    time.sleep(max(0.0, next_tick - time.perf_counter()))
+                target = next_tick - self.fusion_delay
+                if end_time is not None and target > end_time:
+                    break           # Once drained, the last FUSION_DELAY seconds are fused without waiting
+                next_tick += period
+
+                for q, history in ((self.audio_queue, audio), (self.video_queue, video)):
+                    while True:
+                        try:
+                            history.append(q.get_nowait())
+                        except queue.Empty:
+                            break
+                    while len(history) > 1 and history[1].t <= target - HISTORY:
+                        history.popleft()
+
+                # Video yields while audio is behind
+                if self.audio.lag > AUDIO_LAG_LIMIT:
+                    self.video_budget.share = self.video_budget.base_share / 2
+                    self.budget_cuts += 1
+                else:
+                    self.video_budget.share = self.video_budget.base_share
+
+                a = _latest_before(audio, target)
+                v = _latest_before(video, target)
+                frame = FusedFrame(round(target - self.t0, 3),
+                                   a.confidence if a else None, a.speaking if a else False,
+                                   *(v[1:] if v else (None, None, None)),
+                                   round(target - a.t, 3) if a else None, round(target - v.t, 3) if v else None)
+                self.emitted.append(frame)
+                if self.session_log is not None:
+                    self.session_log.append(frame.t, frame.confidence, frame.attention, frame.stability,
+                                            frame.smoothness, frame.speaking)
+                self.frames_dropped += _offer(self.frames_queue, frame)
+        finally:
+            self.finished.set()
+
+    def frames(self, timeout=0.5):
+        """
+        The single consumer's iterator over fused frames; ends when the
+        session has stopped or the file-backed sources are exhausted.
+        """
+        while True:
+            try:
+                yield self.frames_queue.get(timeout=timeout)
+            except queue.Empty:
+                if self.finished.is_set():
+                    return
+
+    def stop(self):
+        self._stopping.set()
+        self.audio_source.stop()
+        self.capture.stop()
+        self.inference.stop()
+        self.audio.stop()
+        for thread in (self.capture, self.inference, self.audio, self._fusion):
+            if thread.is_alive():
+                thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def summary(self):
+        """
+        Session averages in the shape of the backend's Interview model
+        (duration + scores), from the fused frames, plus per-stage counters.
+        """
+        def mean(field):
+            values = [getattr(f, field) for f in self.emitted if getattr(f, field) is not None]
+            return round(float(np.mean(values)), 1) if values else None
+
+        latencies = np.array(self.audio.latencies) * 1000 if self.audio.latencies else np.zeros(1)
+        return {
+            "duration": round(self.emitted[-1].t, 1) if self.emitted else 0.0,
+            "scores": {"confidence": mean("confidence"), "attention": mean("attention"),
+                       "stability": mean("stability"), "smoothness": mean("smoothness")},
+            "stages": {
+                "audio": {"cpu_seconds": round(self.audio.cpu_seconds, 2), "skipped": self.audio.skipped,
+                          "dropped": self.audio.dropped, "latency_p50_ms": float(np.percentile(latencies, 50)),
+                          "latency_p95_ms": float(np.percentile(latencies, 95))},
+                "video": {"cpu_seconds": round(self.video_budget.cpu_seconds, 2),
+                          "rested_seconds": round(self.video_budget.rested_seconds, 2),
+                          "inference_fps": round(self.inference.stats.fps(), 1),
+                          "capture_fps": round(self.capture.stats.fps(), 1), "dropped": self.video_dropped,
+                          "budget_cuts": self.budget_cuts},
+                "fusion": {"frames": len(self.emitted), "dropped": self.frames_dropped},
+            },
+        }
+
+
+def _latest_before(history, t):
+    # Newest sample stamped at or before t (history is in time order)
+    found = None
+    for sample in history:
+        if sample.t > t:
+            break
+        found = sample
+    return found
+
+
+# --- BENCHMARK ---
+def benchmark(seconds=12, video_cost=0.06):
+    """
+    A synthetic answer (speech-like audio + 720p clip) through the engine
+    with a stand-in landmark model that burns `video_cost` s of CPU per frame,
+    with and without the video CPU budget: audio scoring latency, video
+    inference FPS and how far apart the fused modalities are.
+    """
+    import tempfile
+    _add_paths()
+    from streaming import _speech_like
+    from pipeline import FakeAudioSource
+    from video_pipeline import _synthetic_clip
+
+    def heavy_process(frame):
+        # numpy releases the GIL, like MediaPipe's C++ graph: this competes for the core, not the GIL
+        end = time.thread_time() + video_cost
+        a = np.ones((120, 120))
+        while time.thread_time() < end:
+            a = a @ a * 1e-3
+        cols = np.flatnonzero(frame[frame.shape[0] // 2, :, 0] > 128)
+        x = cols.mean() / frame.shape[1] if len(cols) else 0.5
+        return {"wrist": [x, 0.5], "stability": [x, 0.4], "attention": 1.0}
+
+    audio = _speech_like(seconds, 22050)
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "clip.mp4")
+        _synthetic_clip(clip, seconds=seconds)
+
+        for label, budget in (("Lag cut only", 1.0), (f"Video budget {VIDEO_CPU_BUDGET:.0%}", VIDEO_CPU_BUDGET)):
+            engine = SessionEngine(FakeAudioSource(audio, 22050, 2205), clip, video_process=heavy_process,
+                                   video_budget=budget, every_n=1)
+            with engine:
+                frames = list(engine.frames())
+            stats = engine.summary()["stages"]
+            skew = [abs(f.audio_age - f.video_age) for f in frames if f.audio_age is not None and f.video_age is not None]
+            print(f"⏱️  {label:<18} audio latency p50 {stats['audio']['latency_p50_ms']:.0f} ms, "
+                  f"p95 {stats['audio']['latency_p95_ms']:.0f} ms | video inference "
+                  f"{stats['video']['inference_fps']:.1f} fps, {stats['video']['cpu_seconds']:.1f} CPU-s, "
+                  f"halved on {stats['video']['budget_cuts']} ticks "
+                  f"| {len(frames)} fused frames, modality skew p95 {np.percentile(skew, 95) * 1000:.0f} ms")
+        print(f"📊 {engine.summary()['scores']}")
+
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+    benchmark()
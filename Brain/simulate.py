@@ -0,0 +1,494 @@
+import os
+import io
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import importlib
+import contextlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+INTERVIEWS = 2000           # Simulated interviews in total
+CONCURRENCY = 200           # Interviews in flight at once, split across the worker processes
+WORKERS = os.cpu_count() or 1
+BATCHES_PER_WORKER = 4      # Smaller batches keep the workers evenly loaded and the progress line moving
+LLM_LATENCY = 0.05          # Mean seconds per stand-in LLM call
+LLM_JITTER = 0.5            # Lognormal sigma of the call latency (0 = always LLM_LATENCY)
+MAX_TURNS = 50              # Questions per interview before it's cut off (silent candidates re-ask forever)
+PROFILES = ("strong", "average", "weak")
+
+# The simulated candidate says whether its answer is right; StandInLLM's grader reads it from the prompt
+CORRECT_MARK = "[correct]"
+WRONG_MARK = "[wrong]"
+
+
+# --- CANDIDATES ---
+class ScriptedCandidate:
+    """
+    Answers from a script, cycled: True = correct, False = wrong, None =
+    silence (the interview loop then asks a new question). Stands in for the
+    voice bot: AdaptiveInterviewer.get_human_input() calls listen().
+    """
+    def __init__(self, script, name="scripted"):
+        self.script = list(script)
+        self.name = name
+        self.interviewer = None     # Set by the simulator once the interviewer exists
+        self._turn = 0
+
+    def decide(self):
+        decision = self.script[self._turn % len(self.script)]
+        self._turn += 1
+        return decision
+
+    def listen(self, source=None, session_log=None):
+        decision = self.decide()
+        if decision is None:
+            return ""
+        return f"{CORRECT_MARK if decision else WRONG_MARK} My answer to question {self._turn}."
+
+
+class StochasticCandidate(ScriptedCandidate):
+    """
+    Answers correctly with probability logistic(slope * (ability + topic
+    offset - difficulty)), so a candidate of ability 2 gets half of the
+    difficulty-2 questions right; stays silent with probability `silence`.
+    Topic offsets are drawn once per topic from N(0, topic_spread).
+    """
+    def __init__(self, ability=2.0, slope=1.5, topic_spread=0.5, silence=0.0, seed=0, name="stochastic"):
+        super().__init__([], name)
+        self.ability = ability
+        self.slope = slope
+        self.topic_spread = topic_spread
+        self.silence = silence
+        self._rng = random.Random(seed)
+        self._topic_offsets = {}
+
+    def p_correct(self, topic_index, difficulty):
+        if topic_index not in self._topic_offsets:
+            self._topic_offsets[topic_index] = self._rng.gauss(0.0, self.topic_spread)
+        skill = self.ability + self._topic_offsets[topic_index]
+        return 1.0 / (1.0 + math.exp(-self.slope * (skill - difficulty)))
+
+    def decide(self):
+        self._turn += 1
+        if self._rng.random() < self.silence:
+            return None
+        bot = self.interviewer
+        return self._rng.random() < self.p_correct(bot.current_topic_index, bot.difficulty_level)
+
+
+# name -> (class, keyword arguments); stochastic profiles also get a per-interview seed
+CANDIDATE_PROFILES = {
+    "strong": (StochasticCandidate, {"ability": 3.0}),
+    "average": (StochasticCandidate, {"ability": 2.0}),
+    "weak": (StochasticCandidate, {"ability": 1.0}),
+    "hesitant": (StochasticCandidate, {"ability": 2.0, "silence": 0.2}),
+    "all-correct": (ScriptedCandidate, {"script": [True]}),
+    "all-wrong": (ScriptedCandidate, {"script": [False]}),
+    "alternating": (ScriptedCandidate, {"script": [True, False]}),
+}
+
+
+def make_candidate(profile, seed=0):
+    cls, kwargs = CANDIDATE_PROFILES[profile]
+    if issubclass(cls, StochasticCandidate):
+        return cls(seed=seed, name=profile, **kwargs)
+    return cls(name=profile, **kwargs)
+
+
+# --- LLM STAND-IN ---
+class _Response:
+    # The only part of a genai response AdaptiveInterviewer reads
+    def __init__(self, text):
+        self.text = text
+
+
+class StandInLLM:
+    """
+    In-process stand-in for llm.LLMClient (same submit / call / discard /
+    close), for simulations where fake_llm.FakeModelServer's HTTP round trip
+    would be the bottleneck. Calls sleep on one background event loop, so
+    thousands can be pending without a thread each.
+
+    Latency is lognormal around `latency` (sigma `jitter`); `error_rate`
+    answers None, like a call whose retries ran out. The grader reads the
+    candidate's CORRECT_MARK / WRONG_MARK from the prompt (no mark: correct
+    with probability `grade`); topics come from `topics`.
+    """
+    def __init__(self, latency=LLM_LATENCY, jitter=LLM_JITTER, error_rate=0.0, grade=0.5, topics=("Python",),
+                 seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.grade = grade
+        self.topics = list(topics)
+        self.stats = {"calls": 0, "failures": 0, "cancelled": 0}
+        self._rng = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _delay(self):
+        if self.jitter <= 0:
+            return self.latency
+        # Lognormal with mean `latency`
+        return self.latency * math.exp(self._rng.gauss(-self.jitter ** 2 / 2, self.jitter))
+
+    def _text(self, role, contents):
+        if role == "topics":
+            return json.dumps({"topics": self.topics})
+        if role == "grader":
+            if CORRECT_MARK in contents:
+                correct = True
+            elif WRONG_MARK in contents:
+                correct = False
+            else:
+                correct = self._rng.random() < self.grade
+            return json.dumps({"is_correct": correct, "feedback": "Simulated."})
+        return "Can you explain how you would use this skill in practice?"
+
+    async def generate(self, role, model, contents, config=None):
+        # Only touched from the loop thread, so the counters and the RNG need no lock
+        self.stats["calls"] += 1
+        await asyncio.sleep(self._delay())
+        if self._rng.random() < self.error_rate:
+            self.stats["failures"] += 1
+            return None
+        return _Response(self._text(role, contents))
+
+    def submit(self, role, model, contents, config=None):
+        return asyncio.run_coroutine_threadsafe(self.generate(role, model, contents, config), self._loop)
+
+    def call(self, role, model, contents, config=None):
+        return self.submit(role, model, contents, config).result()
+
+    def discard(self, future):
+        if future.cancel():
+            self.stats["cancelled"] += 1
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+class _InterviewLLM:
+    """
+    One interview's view of the shared client: counts its calls per role,
+    the speculative ones it cancelled, and each call's latency as the
+    interviewer saw it (submit -> result).
+    """
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = {}
+        self.cancelled = 0
+        self.latencies = []
+
+    def submit(self, role, model, contents, config=None):
+        self.calls[role] = self.calls.get(role, 0) + 1
+        start = time.perf_counter()
+        future = self.llm.submit(role, model, contents, config)
+
+        def _done(done):
+            if not done.cancelled():
+                self.latencies.append(time.perf_counter() - start)
+        future.add_done_callback(_done)
+        return future
+
+    def call(self, role, model, contents, config=None):
+        return self.submit(role, model, contents, config).result()
+
+    def discard(self, future):
+        if future.cancel():
+            self.cancelled += 1
+
+    def close(self):
+        pass
+
+
+# --- ONE INTERVIEW ---
+def run_interview(interviewer_class, candidate, llm, max_turns=MAX_TURNS):
+    """
+    The interview loop of Brain.py's __main__ with `candidate` answering.
+    Returns the per-interview record the report is built from.
+    """
+    view = _InterviewLLM(llm)
+    start = time.perf_counter()
+    bot = interviewer_class("Python Skills", "File clerk", llm=view, voice_bot=candidate)
+    candidate.interviewer = bot
+    turn_times = []
+    asked = answered = correct = silent = 0
+    finished = False
+
+    t = time.perf_counter()
+    bot.generate_question()
+    first_question = time.perf_counter() - t
+    asked += 1
+    while True:
+        answer = bot.get_human_input()
+        if not answer:
+            # Brain.py's loop asks again
+            silent += 1
+            if asked >= max_turns:
+                break
+            bot.generate_question()
+            asked += 1
+            continue
+
+        t = time.perf_counter()
+        before = bot.current_skill_score + sum(bot.skill_scores)
+        bot.evaluate_answer(answer)
+        answered += 1
+        correct += (bot.current_skill_score + sum(bot.skill_scores)) > before
+        if bot.current_topic_index >= len(bot.topics):
+            finished = True
+            break
+        if asked >= max_turns:
+            break
+        bot.generate_question()
+        asked += 1
+        # Answer -> next question: what the candidate waits for
+        turn_times.append(time.perf_counter() - t)
+
+    return {
+        "profile": candidate.name,
+        "finished": finished,
+        "asked": asked,
+        "answered": answered,
+        "correct": correct,
+        "silent": silent,
+        "final_score": sum(bot.skill_scores) / len(bot.skill_scores) if bot.skill_scores else 0.0,
+        "topic_scores": list(bot.skill_scores),
+        "final_difficulty": bot.difficulty_level,
+        "llm_calls": dict(view.calls),
+        "llm_cancelled": view.cancelled,
+        "llm_latencies": view.latencies,
+        "first_question": first_question,
+        "turn_times": turn_times,
+        "duration": time.perf_counter() - start,
+    }
+
+
+# --- WORKER PROCESSES ---
+def _import_interviewer(policy):
+    """
+    The interviewer class: Brain.AdaptiveInterviewer, or "module:Class" for
+    a policy variant (a subclass overriding evaluate_answer, say).
+    """
+    if not policy:
+        import Brain
+        return Brain.AdaptiveInterviewer
+    module, _, name = policy.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _init_worker():
+    # Fake keys so Brain.init() passes; no webhook, no response cache (it would replay grades)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import Brain  # noqa: F401  (sys.path setup, for spawned workers)
+    for name in ("GEMINI_KEY_TOPICS", "GEMINI_KEY_ASKER", "GEMINI_KEY_GRADER"):
+        os.environ.setdefault(name, "fake-" + name.lower())
+    os.environ["WEBHOOK_URL"] = ""
+    import Brain
+    Brain.init()
+    Brain.USE_RESPONSE_CACHE = False
+
+
+def run_batch(jobs, concurrency, llm_options, policy=None, max_turns=MAX_TURNS):
+    """
+    Worker process: runs the (profile, seed) jobs `concurrency` at a time on
+    threads (AdaptiveInterviewer blocks on its LLM futures), sharing one
+    StandInLLM. Returns one record per job; a failure is recorded, not raised.
+    """
+    _init_worker()
+    interviewer_class = _import_interviewer(policy)
+    llm = StandInLLM(seed=jobs[0][1] if jobs else 0, **llm_options)
+
+    def one(job):
+        profile, seed = job
+        try:
+            return run_interview(interviewer_class, make_candidate(profile, seed), llm, max_turns)
+        except Exception as e:
+            return {"profile": profile, "error": f"{type(e).__name__}: {e}"}
+
+    # The interviewer prints every question and grade; nobody reads a worker's stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max(1, concurrency)) as pool:
+            results = list(pool.map(one, jobs))
+    llm.close()
+    return results
+
+
+async def simulate(interviews=INTERVIEWS, profiles=PROFILES, workers=WORKERS, concurrency=CONCURRENCY,
+                   llm_options=None, policy=None, max_turns=MAX_TURNS, seed=0, progress=True):
+    """
+    Runs `interviews` simulated interviews (profiles assigned round-robin)
+    across a pool of `workers` processes, `concurrency` in flight in total.
+    Returns (records, wall seconds).
+    """
+    llm_options = llm_options or {}
+    jobs = [(profiles[i % len(profiles)], seed + i) for i in range(interviews)]
+    batches = max(1, min(len(jobs), workers * BATCHES_PER_WORKER))
+    chunks = [jobs[i::batches] for i in range(batches)]
+    per_worker = max(1, concurrency // workers)
+
+    loop = asyncio.get_running_loop()
+    records = []
+    t = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        tasks = [loop.run_in_executor(pool, run_batch, chunk, per_worker, llm_options, policy, max_turns)
+                 for chunk in chunks]
+        for done in asyncio.as_completed(tasks):
+            records.extend(await done)
+            if progress:
+                print(f"\r   {len(records)}/{interviews} interviews", end="", flush=True)
+    if progress:
+        print()
+    return records, time.perf_counter() - t
+
+
+# --- REPORT ---
+def _percentiles(values, qs=(50, 95, 99)):
+    if not len(values):
+        return {f"p{q}": None for q in qs}
+    values = sorted(values)
+    return {f"p{q}": values[min(len(values) - 1, int(q / 100 * len(values)))] for q in qs}
+
+
+def summarize(records, elapsed):
+    """
+    Throughput, LLM calls per interview, latency and final-score
+    distributions (overall and per profile) from simulate()'s records.
+    """
+    ok = [r for r in records if "error" not in r]
+    turns = sum(r["answered"] for r in ok)
+    calls = [sum(r["llm_calls"].values()) for r in ok]
+    roles = sorted({role for r in ok for role in r["llm_calls"]})
+    summary = {
+        "interviews": len(records),
+        "failed": len(records) - len(ok),
+        "cut_off": sum(not r["finished"] for r in ok),
+        "seconds": elapsed,
+        "interviews_per_sec": len(ok) / elapsed if elapsed else 0.0,
+        "turns_per_sec": turns / elapsed if elapsed else 0.0,
+        "llm_calls_per_interview": {
+            "mean": sum(calls) / len(calls) if calls else 0.0,
+            **{role: sum(r["llm_calls"].get(role, 0) for r in ok) / len(ok) for role in roles},
+            "cancelled": sum(r["llm_cancelled"] for r in ok) / len(ok) if ok else 0.0,
+        },
+        "latency_ms": {
+            name: {k: None if v is None else v * 1000 for k, v in _percentiles(values).items()}
+            for name, values in (("turn", [x for r in ok for x in r["turn_times"]]),
+                                 ("first_question", [r["first_question"] for r in ok]),
+                                 ("llm_call", [x for r in ok for x in r["llm_latencies"]]))
+        },
+        "profiles": {},
+    }
+    for profile in sorted({r["profile"] for r in ok}):
+        group = [r for r in ok if r["profile"] == profile]
+        scores = [r["final_score"] for r in group]
+        mean = sum(scores) / len(scores)
+        answered = sum(r["answered"] for r in group)
+        summary["profiles"][profile] = {
+            "interviews": len(group),
+            "questions": sum(r["asked"] for r in group) / len(group),
+            "accuracy": sum(r["correct"] for r in group) / answered if answered else 0.0,
+            "score_mean": mean,
+            "score_std": (sum((s - mean) ** 2 for s in scores) / len(scores)) ** 0.5,
+            **{f"score_{k}": v for k, v in _percentiles(scores, (10, 50, 90)).items()},
+            "histogram": _histogram(scores),
+        }
+    if len(ok) < len(records):
+        summary["first_error"] = next(r["error"] for r in records if "error" in r)
+    return summary
+
+
+def _histogram(scores, width=10):
+    # Final score -> count, in buckets of `width` points
+    counts = {}
+    for s in scores:
+        bucket = int(s // width) * width
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def print_report(summary):
+    print(f"⏱️  {summary['interviews'] - summary['failed']}/{summary['interviews']} interviews in "
+          f"{summary['seconds']:.2f} s: {summary['interviews_per_sec']:.1f} interviews/sec, "
+          f"{summary['turns_per_sec']:.1f} turns/sec"
+          + (f" ({summary['cut_off']} cut off unfinished)" if summary["cut_off"] else ""))
+    calls = summary["llm_calls_per_interview"]
+    roles = ", ".join(f"{k} {v:.1f}" for k, v in calls.items() if k not in ("mean", "cancelled"))
+    print(f"📊 LLM calls per interview: {calls['mean']:.1f} ({roles}; {calls['cancelled']:.1f} speculative cancelled)")
+    for name, p in summary["latency_ms"].items():
+        if p["p50"] is not None:
+            print(f"📊 {name} latency: p50 {p['p50']:.0f} ms, p95 {p['p95']:.0f} ms, p99 {p['p99']:.0f} ms")
+    for profile, s in summary["profiles"].items():
+        bars = " ".join(f"{bucket}:{count}" for bucket, count in s["histogram"].items())
+        print(f"📐 {profile:<12} {s['interviews']:5d} interviews, {s['questions']:.1f} questions, "
+              f"{s['accuracy']:.0%} correct | final score {s['score_mean']:.1f} ± {s['score_std']:.1f} "
+              f"(p10 {s['score_p10']:.0f}, p50 {s['score_p50']:.0f}, p90 {s['score_p90']:.0f}) | {bars}")
+    if summary["failed"]:
+        print(f"⚠️ {summary['failed']} interviews failed, first: {summary['first_error']}")
+
+
+# --- BENCHMARK ---
+def benchmark(interviews=400):
+    """
+    The same simulated interviews one at a time vs. CONCURRENCY in flight
+    (LLM_LATENCY per call): throughput of the turn loop and what
+    concurrency does to turn latency.
+    """
+    for label, workers, concurrency in (("Sequential", 1, 1), (f"Concurrency {CONCURRENCY}", WORKERS, CONCURRENCY)):
+        n = interviews // 10 if concurrency == 1 else interviews
+        records, elapsed = asyncio.run(simulate(n, workers=workers, concurrency=concurrency, progress=False))
+        summary = summarize(records, elapsed)
+        turn = summary["latency_ms"]["turn"]
+        print(f"⏱️  {label:<16} {n} interviews: {summary['turns_per_sec']:7.1f} turns/sec, "
+              f"{summary['interviews_per_sec']:6.1f} interviews/sec | turn p50 {turn['p50']:.0f} ms, "
+              f"p99 {turn['p99']:.0f} ms (LLM {LLM_LATENCY * 1000:.0f} ms/call)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many AdaptiveInterviewer interviews against a local LLM stand-in.")
+    parser.add_argument("--interviews", type=int, default=INTERVIEWS)
+    parser.add_argument("--profiles", default=",".join(PROFILES),
+                        help=f"Comma-separated candidate profiles out of {','.join(CANDIDATE_PROFILES)}")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Interviews in flight, all workers")
+    parser.add_argument("--latency", type=float, default=LLM_LATENCY, help="Mean seconds per LLM call")
+    parser.add_argument("--jitter", type=float, default=LLM_JITTER, help="Lognormal sigma of the LLM latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of LLM calls that fail")
+    parser.add_argument("--policy", help="Interviewer class as module:Class (default Brain:AdaptiveInterviewer)")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the summary and every interview's record to this JSON file")
+    parser.add_argument("--benchmark", action="store_true", help="Sequential vs. concurrent throughput")
+    args = parser.parse_args()
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+    if args.benchmark:
+        benchmark()
+        raise SystemExit(0)
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in CANDIDATE_PROFILES]
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(unknown)}")
+    llm_options = {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate}
+    records, elapsed = asyncio.run(simulate(args.interviews, profiles, args.workers, args.concurrency, llm_options,
+                                            args.policy, args.max_turns, args.seed))
+    summary = summarize(records, elapsed)
+    print_report(summary)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"summary": summary, "interviews": records}, f)
+        print(f"✅ Records written to {args.out}")
@@ -0,0 +1,358 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import threading
+from collections import deque
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Brain  # noqa: F401
+
+# --- CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SPOOL_PATH = os.getenv("WEBHOOK_SPOOL", os.path.join(current_dir, ".webhook_spool.jsonl"))
+REQUEST_TIMEOUT = 5.0           # Seconds per POST (connect + read)
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+QUEUE_SIZE = 10000              # Beyond this, events go straight to the spool instead of blocking
+BATCH_SIZE = 1                  # 1 = one POST per event with the original {"text": ...} body
+BATCH_WINDOW = 0.05             # Seconds to wait for more events once a batch has started
+SENDERS = 4                     # Sender threads, each with a pooled connection
+LATENCY_SAMPLES = 10000         # Newest delivery latencies kept for summary()
+REPLAY_TIMEOUT = 5.0            # Seconds start() may wait for queue space while replaying the spool
+
+# Shared metrics / tracing (telemetry/instrument.py)
+import instrument   # telemetry/, on sys.path via the package __init__
+
+
+class WebhookDispatcher:
+    """
+    Fire-and-forget delivery of interview events (e.g. each generated question)
+    to the n8n webhook.
+
+    emit() only puts the event on a queue; background sender threads post it
+    over one pooled requests.Session, retrying 429/5xx and connection errors with
+    exponential backoff. With batch_size > 1, events that arrive within
+    batch_window of each other (from any session) go out in one POST as
+    {"events": [...]}. Events that still can't be delivered (connection
+    errors, 429, 5xx), or that arrive while the queue is full, are appended
+    to a JSON-lines spool and sent again the next time a dispatcher starts.
+    Other 4xx answers are permanent: those events are dropped and counted
+    as "rejected".
+    """
+    def __init__(self, url, batch_size=BATCH_SIZE, batch_window=BATCH_WINDOW, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES, spool_path=SPOOL_PATH, queue_size=QUEUE_SIZE, senders=SENDERS):
+        self.url = url
+        self.senders = senders
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.spool_path = spool_path
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._request_error = requests.RequestException
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=senders))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=senders))
+
+        self.stats = {"emitted": 0, "delivered": 0, "posts": 0, "retries": 0, "spooled": 0, "replayed": 0,
+                      "rejected": 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # Seconds from emit() to a successful POST
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spool_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._closing = threading.Event()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def start(self):
+        # Started lazily by the first emit(), so importing Brain doesn't spawn threads
+        with self._start_lock:
+            if not self._threads:
+                self._threads = [threading.Thread(target=self._run, name=f"webhook-{i}", daemon=True)
+                                 for i in range(self.senders)]
+                for thread in self._threads:
+                    thread.start()
+                atexit.register(self.close)
+                # After the senders, which make room in the queue while the spool is read back
+                self._replay_spool()
+        return self
+
+    def _count(self, name, n=1):
+        # stats are updated from every sender thread
+        with self._stats_lock:
+            self.stats[name] += n
+
+    def emit(self, payload):
+        self.start()
+        self._count("emitted")
+        event = (time.monotonic(), payload)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._spool([event])
+
+    # --- SENDER ---
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if event is None:
+                    self._deliver(batch)
+                    return
+                batch.append(event)
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        try:
+            self._post(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _post(self, batch):
+        with instrument.span("webhook.post") as span:
+            span.set(events=len(batch))
+            delivered = self._post_batch(batch, span)
+            span.set(delivered=delivered)
+            return delivered
+
+    def _post_batch(self, batch, span):
+        body = batch[0][1] if self.batch_size == 1 else {"events": [payload for _, payload in batch]}
+        for attempt in range(self.max_retries):
+            self._count("posts")
+            span.set(attempts=attempt + 1)
+            try:
+                response = self.session.post(self.url, json=body, timeout=self.timeout)
+                instrument.counter("webhook_posts_total", "Webhook POSTs by HTTP status").inc(
+                    status=response.status_code)
+                if response.status_code < 300:
+                    now = time.monotonic()
+                    with self._stats_lock:
+                        self.stats["delivered"] += len(batch)
+                        self.latencies.extend(now - emitted for emitted, _ in batch)
+                    delivery = instrument.histogram("webhook_delivery_seconds", "emit() to a successful POST")
+                    for emitted, _ in batch:
+                        delivery.observe(now - emitted)
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    # Permanent (404 from an n8n test URL nobody is listening on, 400, ...):
+                    # spooling would replay these on every start, forever
+                    print(f"⚠️ Webhook Error: HTTP {response.status_code}, {len(batch)} events dropped")
+                    self._count("rejected", len(batch))
+                    instrument.counter("webhook_rejected_total", "Events dropped after a permanent 4xx").inc(len(batch))
+                    return False
+            except self._request_error:
+                instrument.counter("webhook_posts_total", "Webhook POSTs by HTTP status").inc(status="error")
+
+            # Don't sit in backoff while the process is shutting down: spool instead
+            if attempt < self.max_retries - 1 and not self._closing.is_set():
+                self._count("retries")
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+                instrument.counter("webhook_retries_total", "Webhook POSTs retried").inc()
+                instrument.counter("webhook_backoff_seconds_total", "Seconds spent in retry backoff").inc(delay)
+                if self._closing.wait(delay):
+                    break
+
+        self._spool(batch)
+        return False
+
+    # --- SPOOL ---
+    def _spool(self, events):
+        with self._spool_lock:
+            with open(self.spool_path, "a") as f:
+                for emitted, payload in events:
+                    f.write(json.dumps(payload) + "\n")
+        self._count("spooled", len(events))
+        instrument.counter("webhook_spooled_total", "Events written to the spool instead of delivered").inc(len(events))
+
+    def _replay_spool(self):
+        with self._spool_lock:
+            try:
+                with open(self.spool_path) as f:
+                    lines = f.readlines()
+                os.remove(self.spool_path)
+            except OSError:
+                return
+        now = time.monotonic()
+        deadline = now + REPLAY_TIMEOUT
+        for i, line in enumerate(lines):
+            try:
+                event = (now, json.loads(line))
+            except ValueError:
+                continue
+            try:
+                self._queue.put(event, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                # The webhook is too slow (or down) to take the whole spool now: keep the rest for next time
+                with self._spool_lock:
+                    with open(self.spool_path, "a") as f:
+                        f.writelines(lines[i:])
+                return
+            self._count("replayed")
+
+    # --- SHUTDOWN ---
+    def flush(self, timeout=None):
+        """
+        Waits until everything emitted so far has been delivered or spooled
+        (including the batch being posted right now).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks and (deadline is None or time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def close(self, timeout=REQUEST_TIMEOUT):
+        if not self._threads or self._closing.is_set():
+            return
+        self.flush(timeout)
+        self._closing.set()
+        for thread in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+        # Whatever is still queued survives in the spool
+        leftover = []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not None:
+                leftover.append(event)
+        if leftover:
+            self._spool(leftover)
+        self.session.close()
+
+    def summary(self):
+        with self._stats_lock:
+            lat_ms = sorted(x * 1000 for x in self.latencies)
+        p = lambda q: lat_ms[min(len(lat_ms) - 1, int(q * len(lat_ms)))] if lat_ms else 0.0
+        return (f"{self.stats['delivered']}/{self.stats['emitted'] + self.stats['replayed']} delivered in "
+                f"{self.stats['posts']} POSTs, {self.stats['retries']} retries, {self.stats['spooled']} spooled, "
+                f"{self.stats['rejected']} rejected, "
+                f"queue depth {self.queue_depth} | latency p50 {p(0.5):.0f} ms, p99 {p(0.99):.0f} ms")
+
+
+class FakeWebhookServer:
+    """
+    Local stand-in for the n8n webhook: records every body it receives and can
+    be made slow (`latency`), flaky (`error_rate` answers 503) or answer every
+    POST with another `status` (e.g. 404 like an n8n test URL nobody listens on).
+    """
+    def __init__(self, latency=0.05, error_rate=0.0, port=0, seed=0, status=200):
+        from http.server import BaseHTTPRequestHandler
+        from fake_llm import _Server
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.status = status
+        self.received = []      # Event payloads, unpacked from batches
+        self.posts = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-alive, so connection reuse is visible
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                time.sleep(server.latency)
+                with server._lock:
+                    server.posts += 1
+                    fail = server._rng.random() < server.error_rate
+                    status = 503 if fail else server.status
+                    if status < 300:
+                        server.received.extend(body["events"] if "events" in body else [body])
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self._server = _Server(("127.0.0.1", port), Handler)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --- BENCHMARK ---
+def benchmark(events=200, latency=0.05):
+    """
+    Time a question generator spends on the webhook: inline requests.post vs.
+    emit(), plus delivery latency, batching and spool recovery.
+    """
+    import tempfile
+    import requests
+
+    with tempfile.TemporaryDirectory() as tmp, FakeWebhookServer(latency=latency) as hook:
+        t = time.perf_counter()
+        for i in range(events // 10):
+            requests.post(hook.url, json={"text": f"Question {i}"})
+        inline = (time.perf_counter() - t) / (events // 10)
+        print(f"⏱️  Inline requests.post: {inline * 1000:.1f} ms blocked per question")
+
+        for label, batch_size, error_rate in (("Dispatcher", 1, 0.0), ("Batched x16", 16, 0.0),
+                                              ("Batched, 30% 503s", 16, 0.3)):
+            hook.error_rate = error_rate
+            hook.received.clear()
+            dispatcher = WebhookDispatcher(hook.url, batch_size=batch_size,
+                                           spool_path=os.path.join(tmp, "spool.jsonl"))
+            t = time.perf_counter()
+            for i in range(events):
+                dispatcher.emit({"text": f"Question {i}"})
+            emit_cost = (time.perf_counter() - t) / events
+            dispatcher.flush()
+            dispatcher.close()
+            print(f"⏱️  {label}: {emit_cost * 1e6:.0f} µs blocked per question | {dispatcher.summary()}")
+
+        # Webhook down: everything lands in the spool, then a new dispatcher delivers it
+        hook.error_rate = 0.0
+        hook.received.clear()
+        down = WebhookDispatcher("http://127.0.0.1:9/webhook", max_retries=2, timeout=0.2,
+                                 spool_path=os.path.join(tmp, "spool.jsonl"))
+        for i in range(20):
+            down.emit({"text": f"Question {i}"})
+        down.flush()
+        down.close()
+        recovered = WebhookDispatcher(hook.url, spool_path=os.path.join(tmp, "spool.jsonl")).start()
+        recovered.flush()
+        recovered.close()
+        print(f"📦 Webhook down: {down.stats['spooled']} spooled; next start replayed "
+              f"{recovered.stats['replayed']}, delivered {len(hook.received)}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,19 @@
+"""
+Voice confidence: feature extraction, streaming analysis and the VoiceAnalyzer.
+
+The modules import each other by bare name (so they also run as scripts),
+which is why importing the package puts this folder on sys.path. Nothing is
+loaded here: voice.load_model() / VoiceAnalyzer.init() load the model and
+audio libraries explicitly, otherwise they load on first use.
+"""
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+
+# Shared metrics / tracing (telemetry/instrument.py) is imported by bare name too
+_telemetry = os.path.join(os.path.dirname(_here), "telemetry")
+if _telemetry not in sys.path:
+    sys.path.append(_telemetry)
@@ -0,0 +1,215 @@
+import time
+import numpy as np
+from functools import cached_property
+
+from streaming import PITCH_FLOOR, PITCH_CEILING, RMS_FRAME_LENGTH, RMS_HOP_LENGTH
+
+# --- CONFIGURATION ---
+N_FFT = 2048                    # librosa's defaults, which spectral_flatness always used
+SPLIT_TOP_DB = 20               # Non-silent intervals (the old librosa.effects.split call)
+
+
+class WindowAnalysis:
+    """
+    Everything the confidence features and the flatness penalty read from
+    one window of audio, each analysis computed on first use and then
+    shared:
+
+    - frames / rms: RMS_FRAME_LENGTH frames (centred, zero padded like
+      librosa) and their RMS envelope; energy, speaking rate and the
+      non-silent intervals all read the same envelope
+    - spectrogram / flatness: one magnitude STFT
+    - sound / pitch / pulses / harmonicity: Praat's analyses on one Sound
+
+    Praat's pulse finder tracks pitch up to PITCH_CEILING (500 Hz) while
+    the pitch features use to_pitch()'s 600 Hz, so those stay two tracks;
+    merging them changes jitter and shimmer on some windows.
+
+    `sound` can be passed in for audio Praat should read at its own rate
+    (extract_features(audio_path=...) always gave Praat the file itself).
+    """
+    def __init__(self, y, sample_rate=22050, sound=None):
+        self.y = y
+        self.sample_rate = sample_rate
+        if sound is not None:
+            self.sound = sound
+        self.timing = {}            # Seconds spent per analysis, for the benchmark
+
+    def _timed(self, name, fn, *args, **kwargs):
+        t = time.perf_counter()
+        value = fn(*args, **kwargs)
+        self.timing[name] = self.timing.get(name, 0.0) + time.perf_counter() - t
+        return value
+
+    # --- SIGNAL ---
+    @property
+    def frames(self):
+        # (RMS_FRAME_LENGTH, n_frames) strided view of a padded copy; not kept, it's only read once
+        import librosa
+        half = RMS_FRAME_LENGTH // 2
+        return librosa.util.frame(np.pad(self.y, (half, half)), frame_length=RMS_FRAME_LENGTH,
+                                  hop_length=RMS_HOP_LENGTH)
+
+    @cached_property
+    def rms(self):
+        # Same arithmetic as librosa.feature.rms(y=y)[0], on the shared frames
+        import librosa
+        return self._timed("rms", lambda: np.sqrt(np.mean(librosa.util.abs2(self.frames, dtype=np.float32), axis=0)))
+
+    @cached_property
+    def spectrogram(self):
+        import librosa
+        return self._timed("spectrogram", lambda: np.abs(librosa.stft(self.y, n_fft=N_FFT, hop_length=RMS_HOP_LENGTH)))
+
+    @cached_property
+    def flatness(self):
+        import librosa
+        return librosa.feature.spectral_flatness(S=self.spectrogram)[0]
+
+    def segments(self, top_db=SPLIT_TOP_DB):
+        """
+        Non-silent (start, end) sample intervals, as librosa.effects.split(y, top_db) finds them.
+        """
+        import librosa
+        non_silent = librosa.amplitude_to_db(self.rms, ref=np.max, top_db=None) > -top_db
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], non_silent.astype(np.int8), [0]))))
+        return np.minimum(edges * RMS_HOP_LENGTH, len(self.y)).reshape(-1, 2)
+
+    # --- PRAAT ---
+    @cached_property
+    def sound(self):
+        import parselmouth
+        return parselmouth.Sound(self.y, sampling_frequency=self.sample_rate)
+
+    @cached_property
+    def pitch(self):
+        return self._timed("pitch", self.sound.to_pitch)
+
+    @cached_property
+    def pulses(self):
+        from parselmouth.praat import call
+        return self._timed("pulses", call, self.sound, "To PointProcess (periodic, cc)", PITCH_FLOOR, PITCH_CEILING)
+
+    @cached_property
+    def harmonicity(self):
+        from parselmouth.praat import call
+        return self._timed("harmonicity", call, self.sound, "To Harmonicity (cc)", 0.01, PITCH_FLOOR, 0.1, 1.0)
+
+    # --- FEATURES ---
+    def features(self):
+        """
+        [PitchMean, PitchVar, EnergyMean, EnergyVar, Jitter, Shimmer, HNR, SpeakingRate],
+        exactly what extract_features always returned.
+        """
+        import librosa
+        from parselmouth.praat import call
+
+        # --- A. PITCH & JITTER (The "Shaky Voice" detectors) ---
+        f0_values = self.pitch.selected_array['frequency']
+        f0_values = f0_values[f0_values != 0] # Remove unvoiced parts (silence)
+        if len(f0_values) > 0:
+            pitch_mean = np.mean(f0_values)
+            pitch_var = np.var(f0_values)
+        else:
+            pitch_mean = 0
+            pitch_var = 0
+        jitter = call(self.pulses, "Get jitter (local)", 0, 0, 0.0001, 0.02, 1.3)
+
+        # --- B. ENERGY & SHIMMER (The "Volume Stability" detectors) ---
+        energy_mean = np.mean(self.rms)
+        energy_var = np.var(self.rms)
+        shimmer = call([self.sound, self.pulses], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
+
+        # --- C. HNR (Harmonics-to-Noise Ratio) ---
+        hnr = call(self.harmonicity, "Get mean", 0, 0)
+
+        # --- D. SPEAKING RATE ---
+        # Heuristic syllables / second: "peaks" in the energy envelope
+        peaks = librosa.util.peak_pick(self.rms, pre_max=5, post_max=5, pre_avg=5, post_avg=5, delta=0.1, wait=10)
+        speaking_rate = len(peaks) / (len(self.y) / self.sample_rate) if len(self.y) > 0 else 0
+
+        return [pitch_mean, pitch_var, energy_mean, energy_var, jitter, shimmer, hnr, speaking_rate]
+
+
+# --- BENCHMARK ---
+def _separate_analyses(y, sr):
+    # extract_features + get_linguistic_penalty as they were: every step analyzes the signal itself
+    import librosa
+    import parselmouth
+    from parselmouth.praat import call
+
+    sound = parselmouth.Sound(y, sampling_frequency=sr)
+    f0 = sound.to_pitch().selected_array['frequency']
+    f0 = f0[f0 != 0]
+    point_process = call(sound, "To PointProcess (periodic, cc)", 75, 500)
+    jitter = call(point_process, "Get jitter (local)", 0, 0, 0.0001, 0.02, 1.3)
+    rms = librosa.feature.rms(y=y)[0]
+    shimmer = call([sound, point_process], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
+    hnr = call(call(sound, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0), "Get mean", 0, 0)
+    librosa.effects.split(y, top_db=20)
+    peaks = librosa.util.peak_pick(rms, pre_max=5, post_max=5, pre_avg=5, post_avg=5, delta=0.1, wait=10)
+    features = [np.mean(f0) if len(f0) else 0, np.var(f0) if len(f0) else 0, np.mean(rms), np.var(rms),
+                jitter, shimmer, hnr, len(peaks) / (len(y) / sr)]
+    flatness = np.mean(librosa.feature.spectral_flatness(y=y))
+    return features, flatness
+
+
+def benchmark(windows=12, sample_rate=22050, window_duration=3):
+    """
+    Per-window CPU time and peak Python/NumPy allocation of one live
+    window (8 features + flatness penalty) with separate analyses vs. the
+    shared WindowAnalysis, where the time goes, and whether the features
+    are bit-identical. Praat's own C++ allocations aren't visible to tracemalloc.
+    """
+    import tracemalloc
+    from streaming import _speech_like
+
+    sr = sample_rate
+    audio = _speech_like(windows * window_duration, sr, seed=3)
+    n = window_duration * sr
+    clips = [audio[i * n:(i + 1) * n] for i in range(windows)]
+    clips.append((0.05 * np.random.default_rng(0).standard_normal(n)).astype(np.float32))   # Room noise
+    _separate_analyses(clips[0], sr)            # Warm up numba / Praat
+    WindowAnalysis(clips[0], sr).features()
+
+    def shared(y, sr):
+        analysis = WindowAnalysis(y, sr)
+        return analysis.features(), np.mean(analysis.flatness), analysis
+
+    results = {}
+    for label, run in (("Separate analyses", _separate_analyses), ("Shared WindowAnalysis", shared)):
+        cpu, peaks, outputs = [], [], []
+        for y in clips:
+            t = time.process_time()
+            outputs.append(run(y, sr))
+            cpu.append(time.process_time() - t)
+            tracemalloc.start()
+            run(y, sr)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        results[label] = outputs
+        print(f"⏱️  {label:<22} {np.median(cpu) * 1000:6.1f} ms CPU per window (p50), "
+              f"max {np.max(cpu) * 1000:6.1f} ms | peak allocation {np.median(peaks) / 1e6:.2f} MB")
+
+    old, new = results["Separate analyses"], results["Shared WindowAnalysis"]
+    same = all(np.array_equal(a[0], b[0], equal_nan=True) for a, b in zip(old, new))
+    flat = max(abs(a[1] - b[1]) for a, b in zip(old, new))
+    print(f"📏 Features bit-identical: {same} | max flatness difference {flat:.1e}")
+
+    stages = {}
+    for _, _, analysis in new:
+        for name, seconds in analysis.timing.items():
+            stages[name] = stages.get(name, 0.0) + seconds
+    total = sum(stages.values())
+    print("📊 Shared analysis time: " + ", ".join(f"{name} {seconds / total:.0%}" for name, seconds in
+                                                 sorted(stages.items(), key=lambda kv: -kv[1])))
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    benchmark()
@@ -0,0 +1,195 @@
+import os
+import time
+import tempfile
+import numpy as np
+
+# --- CONFIGURATION ---
+INITIAL_RECORDING_DURATION = 30     # Seconds preallocated for a new answer
+SPILL_AFTER_DURATION = 300          # Longer recordings move to a memory-mapped temp file
+
+
+class RollingWindow:
+    """
+    Fixed-capacity circular window with a contiguous, zero-copy view.
+
+    Every sample is written twice, at i and i + capacity, so the newest
+    `capacity` samples are always one contiguous slice of the backing array.
+    Appending costs two small copies instead of np.roll's full reallocation.
+    Starts filled with silence, like np.zeros(capacity).
+    """
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = int(capacity)
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._head = 0      # Index of the oldest sample in the view
+
+    def append(self, samples):
+        samples = np.asarray(samples)
+        n = len(samples)
+        if n >= self.capacity:
+            self._data[:self.capacity] = samples[-self.capacity:]
+            self._data[self.capacity:] = samples[-self.capacity:]
+            self._head = 0
+            return
+
+        start = self._head
+        first = min(n, self.capacity - start)
+        rest = n - first
+        for offset in (0, self.capacity):
+            self._data[offset + start:offset + start + first] = samples[:first]
+            self._data[offset:offset + rest] = samples[first:]
+        self._head = (start + n) % self.capacity
+
+    def view(self):
+        """
+        The last `capacity` samples, oldest first. Read-only and only valid until
+        the next append.
+        """
+        v = self._data[self._head:self._head + self.capacity]
+        v.flags.writeable = False
+        return v
+
+    def clear(self):
+        self._data[:] = 0
+        self._head = 0
+
+
+class RecordingStore:
+    """
+    Growable float32 store for a whole answer.
+
+    Capacity doubles when full (amortized O(1) appends, no per-chunk bytes
+    objects). Past `spill_after` samples the data moves to a memory-mapped temp
+    file, which then grows in place without copying.
+    """
+    def __init__(self, sample_rate=22050, initial_duration=INITIAL_RECORDING_DURATION,
+                 spill_after_duration=SPILL_AFTER_DURATION):
+        self.sample_rate = sample_rate
+        self.spill_after = int(spill_after_duration * sample_rate)
+        self._data = np.empty(int(initial_duration * sample_rate), dtype=np.float32)
+        self._size = 0
+        self._file = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def is_memory_mapped(self):
+        return self._file is not None
+
+    def append(self, samples):
+        n = len(samples)
+        if self._size + n > len(self._data):
+            self._grow(self._size + n)
+        self._data[self._size:self._size + n] = samples
+        self._size += n
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._data))
+
+        if self._file is not None:
+            self._data.flush()
+            self._file.truncate(capacity * 4)
+            self._data = np.memmap(self._file, dtype=np.float32, mode="r+", shape=(capacity,))
+            return
+
+        if capacity > self.spill_after:
+            self._file = tempfile.TemporaryFile(prefix="recording_", suffix=".f32")
+            self._file.truncate(capacity * 4)
+            mapped = np.memmap(self._file, dtype=np.float32, mode="r+", shape=(capacity,))
+            mapped[:self._size] = self._data[:self._size]
+            self._data = mapped
+            return
+
+        grown = np.empty(capacity, dtype=np.float32)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def view(self):
+        """
+        Zero-copy float32 view of everything recorded so far.
+        """
+        return self._data[:self._size]
+
+    def to_pcm16(self):
+        """
+        16-bit PCM of the recording in one pass (scale and cast straight into
+        the int16 output), as a bytes-like memoryview for sr.AudioData.
+        """
+        out = np.empty(self._size, dtype=np.int16)
+        np.multiply(self.view(), 32767, out=out, casting="unsafe")
+        return memoryview(out).cast("B")
+
+    def clear(self):
+        self._size = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._data = np.empty(0, dtype=np.float32)
+        self._size = 0
+
+
+# --- BENCHMARK ---
+def benchmark(minutes=5, sample_rate=22050, chunk_duration=0.5, window_duration=3):
+    """
+    Old listen() buffering (np.roll + bytes list + join/frombuffer/astype/tobytes)
+    vs. RollingWindow + RecordingStore, measured with tracemalloc.
+    """
+    import tracemalloc
+
+    chunk_size = int(sample_rate * chunk_duration)
+    n_chunks = int(minutes * 60 / chunk_duration)
+    chunk = (0.1 * np.random.default_rng(0).standard_normal(chunk_size)).astype(np.float32)
+    data = chunk.tobytes()
+
+    def old_path():
+        rolling_buffer = np.zeros(sample_rate * window_duration, dtype=np.float32)
+        frames = []
+        per_chunk = []
+        for _ in range(n_chunks):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            new_audio = np.frombuffer(data, dtype=np.float32)
+            frames.append(data)
+            rolling_buffer = np.roll(rolling_buffer, -len(new_audio))
+            rolling_buffer[-len(new_audio):] = new_audio
+            per_chunk.append(tracemalloc.get_traced_memory()[1] - before)
+        audio_np = np.frombuffer(b''.join(frames), dtype=np.float32)
+        return (audio_np * 32767).astype(np.int16).tobytes(), per_chunk
+
+    def new_path():
+        window = RollingWindow(sample_rate * window_duration)
+        store = RecordingStore(sample_rate)
+        per_chunk = []
+        for _ in range(n_chunks):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            new_audio = np.frombuffer(data, dtype=np.float32)
+            store.append(new_audio)
+            window.append(new_audio)
+            window.view()
+            per_chunk.append(tracemalloc.get_traced_memory()[1] - before)
+        pcm = store.to_pcm16()
+        store.close()
+        return pcm, per_chunk
+
+    for name, path in (("np.roll + bytes list", old_path), ("RollingWindow + RecordingStore", new_path)):
+        tracemalloc.start()
+        t = time.perf_counter()
+        pcm, per_chunk = path()
+        elapsed = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del pcm
+
+        per_chunk = np.array(per_chunk)
+        print(f"📦 {name}")
+        print(f"   Peak traced memory: {peak / 1e6:.1f} MB for {minutes} min of audio")
+        print(f"   Per-chunk allocation: median {np.median(per_chunk) / 1e3:.1f} KB, "
+              f"chunks allocating >1 KB: {np.count_nonzero(per_chunk > 1024)}/{len(per_chunk)}")
+        print(f"   Wall time: {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
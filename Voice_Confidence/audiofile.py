@@ -0,0 +1,322 @@
+import os
+import mmap
+import struct
+import collections
+import numpy as np
+
+# --- CONFIGURATION ---
+DECODE_BLOCK_DURATION = 30      # Seconds converted to float at a time (bounds the temporaries)
+PRAAT_AT_NATIVE_RATE = True     # Praat analyzes a file at its own rate, as extract_features always did.
+                                # False gives Praat the resampled buffer (one copy less when the rate
+                                # differs, but Praat-based features move for those files)
+RAW_EXTENSIONS = (".pcm", ".raw")
+RAW_FORMAT = (22050, 1, "<i2")  # Headerless PCM: sample rate, channels, sample type
+
+# WAV format tag + bits per sample -> sample type that can be memory-mapped as-is
+WAV_TYPES = {(1, 16): "<i2", (1, 32): "<i4", (3, 32): "<f4", (3, 64): "<f8"}
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+PcmLayout = collections.namedtuple("PcmLayout", "offset frames channels sample_rate dtype")
+
+
+def wav_layout(path):
+    """
+    Where the samples of a PCM / float WAV file are and how they're stored,
+    from the RIFF chunks (the file is not read beyond its header). None for
+    anything that can't be memory-mapped (compressed, 24-bit, RF64, not a WAV).
+    """
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk, size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk == b"fmt ":
+                data = f.read(size)
+                tag, channels, rate = struct.unpack("<HHI", data[:8])
+                bits = struct.unpack("<H", data[14:16])[0]
+                if tag == WAVE_FORMAT_EXTENSIBLE and len(data) >= 26:
+                    tag = struct.unpack("<H", data[24:26])[0]     # First two bytes of the sub-format GUID
+                fmt = (tag, bits, channels, rate)
+                if size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk == b"data":
+                if fmt is None or (fmt[0], fmt[1]) not in WAV_TYPES:
+                    return None
+                tag, bits, channels, rate = fmt
+                frames = min(size, os.path.getsize(path) - f.tell()) // (bits // 8 * channels)
+                return PcmLayout(f.tell(), frames, channels, rate, WAV_TYPES[(tag, bits)])
+            else:
+                f.seek(size + size % 2, os.SEEK_CUR)
+
+
+def pcm_layout(path):
+    if path.lower().endswith(RAW_EXTENSIONS):
+        rate, channels, dtype = RAW_FORMAT
+        return PcmLayout(0, os.path.getsize(path) // (np.dtype(dtype).itemsize * channels), channels, rate, dtype)
+    return wav_layout(path)
+
+
+class AudioReader:
+    """
+    Random access to a file's samples at its own rate. PCM / float WAV and
+    raw PCM are memory-mapped, so nothing is read until a range is asked
+    for; everything else goes through soundfile.
+
+    read(start, stop) returns (frames, channels) float64 in [-1, 1], scaled
+    like Praat and soundfile do (int16 / 32768 ...). Mapped pages a read
+    has copied out are handed back to the OS, so reading a long file block
+    by block doesn't leave all of it resident.
+    """
+    def __init__(self, path):
+        self.path = path
+        layout = pcm_layout(path)
+        self._file = self._map = None
+        if layout is not None:
+            shape = (layout.frames, layout.channels)
+            if layout.frames:
+                with open(path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.pcm = np.ndarray(shape, dtype=layout.dtype, buffer=self._map, offset=layout.offset)
+            else:
+                self.pcm = np.zeros(shape, dtype=layout.dtype)
+            self._offset = layout.offset
+            self.frames, self.channels, self.sample_rate = layout.frames, layout.channels, layout.sample_rate
+            kind = np.dtype(layout.dtype)
+            self._scale = 1.0 / 2 ** (kind.itemsize * 8 - 1) if kind.kind == "i" else 1.0
+        else:
+            import soundfile as sf
+            self.pcm = None
+            self._file = sf.SoundFile(path)
+            self.frames, self.channels, self.sample_rate = self._file.frames, self._file.channels, self._file.samplerate
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def read(self, start, stop, dtype=np.float64):
+        stop = min(stop, self.frames)
+        if self.pcm is not None:
+            block = self.pcm[start:stop].astype(dtype)
+            if self._scale != 1.0:
+                block *= dtype(self._scale)
+            self._release(start, stop)
+            return block
+        self._file.seek(start)
+        return self._file.read(stop - start, dtype=np.dtype(dtype).name, always_2d=True)
+
+    def _release(self, start, stop):
+        if self._map is None or stop <= start:
+            return
+        frame_bytes = self.pcm.strides[0]
+        lo = (self._offset + start * frame_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+        hi = self._offset + stop * frame_bytes
+        # MADV_DONTNEED on a read-only file mapping only unmaps; the page cache keeps the data
+        self._map.madvise(mmap.MADV_DONTNEED, lo, hi - lo)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self.pcm = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load(path, sample_rate=22050):
+    """
+    Decodes `path` once for both libraries. Returns (y, sound): y is mono
+    audio at `sample_rate` for librosa, sound the parselmouth.Sound Praat
+    analyzes.
+
+    Samples are written block by block straight into Praat's own buffer.
+    For a mono file already at `sample_rate`, y is a view of that buffer,
+    so the whole file is in memory exactly once (as float64). Otherwise y
+    is computed like librosa.load (channel mean, soxr_hq resampling) and
+    Praat keeps the file at its own rate and channels, unless
+    PRAAT_AT_NATIVE_RATE is off.
+    """
+    import parselmouth
+
+    try:
+        reader = AudioReader(path)
+    except RuntimeError:
+        # Not something libsndfile decodes (e.g. MP3 on an older build): librosa's audioread fallback, as before
+        import librosa
+        return librosa.load(path, sr=sample_rate)[0], parselmouth.Sound(path)
+
+    with reader:
+        block = int(DECODE_BLOCK_DURATION * reader.sample_rate)
+        native = reader.sample_rate == sample_rate
+        to_praat = native or PRAAT_AT_NATIVE_RATE
+        shared = native and reader.channels == 1
+        if to_praat:
+            # np.zeros is lazily zeroed memory, so Praat's copy of it costs no extra RSS
+            sound = parselmouth.Sound(np.zeros((reader.channels, reader.frames)),
+                                      sampling_frequency=reader.sample_rate)
+            values = sound.values
+        if not native:
+            # Streamed soxr HQ gives the same samples as librosa.load's one-shot soxr_hq resample
+            import soxr
+            stream = soxr.ResampleStream(reader.sample_rate, sample_rate, 1, dtype="float32", quality="HQ")
+
+        pieces = []
+        for start in range(0, max(reader.frames, 1), block):
+            part = reader.read(start, start + block)
+            if to_praat:
+                values[:, start:start + len(part)] = part.T
+            if not shared:
+                mono = _mono(part.astype(np.float32))
+                pieces.append(mono if native else stream.resample_chunk(mono, last=start + block >= reader.frames))
+
+    if shared:
+        return values[0], sound
+    y = np.concatenate(pieces)
+    if not to_praat:
+        sound = parselmouth.Sound(y.astype(np.float64), sampling_frequency=sample_rate)
+    return y, sound
+
+
+def _mono(part):
+    # librosa.load's to_mono: the channel mean
+    return part[:, 0] if part.shape[1] == 1 else np.mean(part, axis=1)
+
+
+def iter_blocks(path, sample_rate=22050, block_samples=None, before=0, after=0):
+    """
+    A long file as consecutive blocks of mono float32 at `sample_rate`, for
+    processing in bounded memory. Block k covers samples
+    [k * block_samples - before, (k + 1) * block_samples + after), clipped
+    to the file, so neighbours overlap by before + after samples. Yields
+    (first sample index of the block, samples).
+
+    Memory-mappable files at `sample_rate` are sliced from the map and give
+    exactly the samples load() would; others are decoded and resampled as
+    a stream, which matches a one-shot resample to within float error.
+    """
+    block_samples = block_samples or int(DECODE_BLOCK_DURATION * sample_rate)
+    with AudioReader(path) as reader:
+        if reader.pcm is not None and reader.sample_rate == sample_rate:
+            for start in range(0, reader.frames, block_samples):
+                lo, hi = max(start - before, 0), min(start + block_samples + after, reader.frames)
+                yield lo, _mono(reader.read(lo, hi, np.float32))
+            return
+
+        # Stream: decode + resample piece by piece, keep only what the next block needs
+        import soxr
+        stream = None if reader.sample_rate == sample_rate else \
+            soxr.ResampleStream(reader.sample_rate, sample_rate, 1, dtype="float32", quality="HQ")
+        piece = int(DECODE_BLOCK_DURATION * reader.sample_rate)
+        buffered, buffer_start, start = np.zeros(0, np.float32), 0, 0
+        for pos in range(0, reader.frames + 1, piece):
+            last = pos + piece >= reader.frames
+            if pos < reader.frames:
+                mono = _mono(reader.read(pos, pos + piece, np.float32))
+            else:
+                mono = np.zeros(0, np.float32)
+            if stream is not None:
+                mono = stream.resample_chunk(mono, last=last)
+            buffered = np.concatenate((buffered, mono))
+            end = buffer_start + len(buffered)
+            while start < end and (start + block_samples + after <= end or last):
+                lo = max(start - before, 0)
+                yield lo, buffered[lo - buffer_start:start + block_samples + after - buffer_start].copy()
+                start += block_samples
+            # Everything before the next block's lead-in can go
+            drop = max(start - before, 0) - buffer_start
+            if drop > 0:
+                buffered, buffer_start = buffered[drop:], buffer_start + drop
+            if last:
+                return
+
+
+# --- BENCHMARK ---
+def _measure(code, setup=""):
+    # Runs `code` in a fresh interpreter (setup untimed); returns (wall seconds, MB the peak RSS rose by during it).
+    # Linux: writing 5 to clear_refs resets VmHWM, so the imports' own peak doesn't hide the one measured
+    import sys
+    import subprocess
+    script = (f"import time\n{setup}\n"
+              f"def kb(field):\n"
+              f"    return int([l for l in open('/proc/self/status') if l.startswith(field)][0].split()[1])\n"
+              f"open('/proc/self/clear_refs', 'w').write('5')\n"
+              f"rss = kb('VmRSS:')\nt = time.perf_counter()\n{code}\n"
+              f"print(time.perf_counter() - t, (kb('VmHWM:') - rss) / 1024)")
+    out = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[-2]), float(out[-1])
+
+
+def benchmark(minutes=10, timeline_minutes=4):
+    """
+    Wall time and rise in peak RSS (fresh process each) of getting a multi-minute
+    recording ready for analysis: librosa.load + parselmouth.Sound(path)
+    as extract_features did, vs. load(), for a mono 22050 Hz WAV and a
+    44.1 kHz stereo one; then the confidence timeline of a long file from
+    one big array vs. in blocks (timeline.window_features_file), and how
+    close the two scores are.
+    """
+    import tempfile
+    import soundfile as sf
+    from streaming import _speech_like
+
+    setup = "import numpy as np, librosa, parselmouth, audiofile"
+    with tempfile.TemporaryDirectory() as tmp:
+        speech = _speech_like(minutes * 60, 22050, seed=1)
+        mono = os.path.join(tmp, "session_22k_mono.wav")
+        sf.write(mono, speech, 22050, subtype="PCM_16")
+        stereo = os.path.join(tmp, "session_44k_stereo.wav")
+        up = np.repeat(speech, 2)
+        sf.write(stereo, np.column_stack([up, 0.8 * up]), 44100, subtype="PCM_16")
+        del speech, up
+
+        for label, path in (("22.05 kHz mono", mono), ("44.1 kHz stereo", stereo)):
+            old = _measure(setup=setup, code=f"y, sr = librosa.load({path!r}, sr=22050)\n"
+                                             f"sound = parselmouth.Sound({path!r})")
+            new = _measure(setup=setup, code=f"y, sound = audiofile.load({path!r})")
+            print(f"⏱️  {minutes} min {label:<16} librosa.load + Sound(path): {old[0]:5.2f} s, "
+                  f"+{old[1]:5.0f} MB peak RSS | audiofile.load: {new[0]:5.2f} s, +{new[1]:5.0f} MB peak RSS")
+
+        y, sound = load(mono)
+        y_old, _ = __import__("librosa").load(mono, sr=22050)
+        import parselmouth
+        same = np.array_equal(y, y_old) and np.array_equal(sound.values, parselmouth.Sound(mono).values)
+        print(f"📏 Same samples as librosa.load / Sound(path): {same}")
+        del y, sound, y_old
+
+        part = os.path.join(tmp, "session_part.wav")
+        with AudioReader(mono) as reader:
+            sf.write(part, reader.read(0, timeline_minutes * 60 * 22050)[:, 0], 22050, subtype="PCM_16")
+        setup_tl = "import numpy as np, librosa, timeline"
+        whole = _measure(setup=setup_tl, code=f"out = timeline.window_features(librosa.load({part!r}, sr=22050)[0])")
+        blocks = _measure(setup=setup_tl, code=f"out = timeline.window_features_file({part!r}, block_duration=60)")
+        print(f"⏱️  {timeline_minutes} min timeline  one array: {whole[0]:5.1f} s, +{whole[1]:5.0f} MB peak RSS | "
+              f"60 s blocks: {blocks[0]:5.1f} s, +{blocks[1]:5.0f} MB peak RSS")
+
+        import joblib
+        import librosa
+        import timeline
+        model = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "confidence_rf_model.pkl"))
+        t_a, s_a = timeline.score_timeline(model, librosa.load(part, sr=22050)[0])
+        t_b, s_b = timeline.score_file_timeline(model, part, block_duration=60)
+        both = ~np.isnan(s_a) & ~np.isnan(s_b)
+        print(f"📐 Blocked timeline (60 s blocks): {len(t_b)}/{len(t_a)} windows, same times {np.array_equal(t_a, t_b)}, "
+              f"mean |score difference| {np.mean(np.abs(s_a[both] - s_b[both])):.2f} points")
+
+if __name__ == "__main__":
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    benchmark()
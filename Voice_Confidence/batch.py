@@ -0,0 +1,254 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+from features import extract_features
+from forest import load_forest, SKLEARN_MIN_ROWS
+
+# --- CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, "confidence_rf_model.pkl")
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3", ".pcm", ".raw")   # .pcm / .raw: see audiofile.RAW_FORMAT
+BATCH_SIZE = 256            # Rows per predict_proba call / per output shard
+PROGRESS_FILE = "completed.txt"
+SHARD_EXTENSIONS = (".npz", ".parquet")
+FEATURE_NAMES = ["pitch_mean", "pitch_var", "energy_mean", "energy_var",
+                 "jitter", "shimmer", "hnr", "speaking_rate"]
+
+
+def collect_inputs(source):
+    """
+    A directory is searched recursively for audio files.
+    Anything else is read as a manifest with one audio path per line.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in lines if p and not p.startswith("#")]
+
+
+def _score_file(path):
+    # Runs in a worker process. A file that can't be analyzed gets NaN features,
+    # so predict_batch leaves it unscored instead of scoring a row of zeros
+    start = time.perf_counter()
+    feats = extract_features(audio_path=path, fallback=[np.nan] * len(FEATURE_NAMES))
+    return path, feats, time.perf_counter() - start
+
+
+def _shards(out_dir):
+    # Finished shards in write order; ".tmp" leftovers of an interrupted write don't count
+    return sorted(name for name in os.listdir(out_dir)
+                  if name.startswith("part-") and name.endswith(SHARD_EXTENSIONS))
+
+
+def _read_shard(path, columns=None):
+    """
+    {"path", "features", "confidence"} of one shard, NPZ or Parquet (only `columns`, when given).
+    """
+    columns = columns or ("path", "features", "confidence")
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        wanted = [c for c in columns if c != "features"] + (list(FEATURE_NAMES) if "features" in columns else [])
+        table = pq.read_table(path, columns=wanted)
+        out = {c: np.asarray(table.column(c).to_pylist() if c == "path" else table.column(c).to_numpy())
+               for c in columns if c != "features"}
+        if "features" in columns:
+            out["features"] = np.column_stack([table.column(c).to_numpy() for c in FEATURE_NAMES]).astype(np.float64)
+        return out
+    with np.load(path) as data:
+        return {c: data[c] for c in columns}
+
+
+class ResultWriter:
+    """
+    Writes one columnar shard per batch (path, 8 features, confidence) and only
+    then records the batch as completed, so a crash never loses acknowledged rows.
+    A crash between the two steps leaves a shard whose paths aren't in the
+    progress file yet; opening the writer again records them, so they aren't
+    scored (and written) a second time.
+    """
+    def __init__(self, out_dir, fmt="npz"):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        os.makedirs(out_dir, exist_ok=True)
+        self.progress_path = os.path.join(out_dir, PROGRESS_FILE)
+        shards = _shards(out_dir)
+        self.shard_index = int(shards[-1].split("-")[1].split(".")[0]) + 1 if shards else 0
+
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                print("⚠️ pyarrow not installed. Writing NPZ shards instead.")
+                self.fmt = "npz"
+
+        if shards:
+            self._recover(os.path.join(out_dir, shards[-1]))
+
+    def _recover(self, shard):
+        # Shards are written one at a time, so only the newest can be missing from the progress file
+        done = self.completed()
+        missing = [p for p in _read_shard(shard, ("path",))["path"].tolist() if p not in done]
+        if missing:
+            self._record(missing)
+
+    def completed(self):
+        if not os.path.exists(self.progress_path):
+            return set()
+        with open(self.progress_path) as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def write(self, paths, features, scores):
+        name = os.path.join(self.out_dir, f"part-{self.shard_index:05d}.{self.fmt}")
+        tmp = name + ".tmp"
+
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            columns = {"path": paths, "confidence": scores}
+            for i, col in enumerate(FEATURE_NAMES):
+                columns[col] = features[:, i]
+            pq.write_table(pa.table(columns), tmp)
+        else:
+            with open(tmp, "wb") as f:
+                np.savez(f, path=np.array(paths), features=features, confidence=scores)
+
+        os.replace(tmp, name)
+        self.shard_index += 1
+        self._record(paths)
+
+    def _record(self, paths):
+        with open(self.progress_path, "a") as f:
+            f.write("".join(p + "\n" for p in paths))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def load_model(model_path=MODEL_PATH, batch_size=BATCH_SIZE):
+    """
+    The compiled forest (same probabilities, faster on small batches), or the
+    sklearn model itself when each predict_proba call gets SKLEARN_MIN_ROWS rows or more.
+    """
+    if batch_size >= SKLEARN_MIN_ROWS:
+        import joblib
+        return joblib.load(model_path)
+    return load_forest(model_path)
+
+
+def predict_batch(model, features):
+    """
+    One predict_proba call for all rows that have valid features.
+    Rows with NaN features (e.g. no voiced frames) get a NaN score.
+    """
+    scores = np.full(len(features), np.nan)
+    valid = ~np.isnan(features).any(axis=1)
+    if valid.any():
+        scores[valid] = model.predict_proba(features[valid])[:, 1] * 100
+    return scores
+
+
+def run_batch(source, out_dir, workers=None, batch_size=BATCH_SIZE, fmt="npz", model_path=MODEL_PATH):
+    model = load_model(model_path, batch_size)
+    writer = ResultWriter(out_dir, fmt)
+
+    paths = collect_inputs(source)
+    done = writer.completed()
+    todo = [p for p in paths if p not in done]
+    print(f"📂 {len(paths)} files found, {len(paths) - len(todo)} already scored, {len(todo)} to go.")
+    if not todo:
+        return
+
+    timings = {"features": 0.0, "predict": 0.0, "write": 0.0}
+    pending_paths, pending_feats = [], []
+    n_done = failed = 0
+    start = time.perf_counter()
+
+    def flush():
+        t = time.perf_counter()
+        feats = np.array(pending_feats, dtype=np.float64)
+        scores = predict_batch(model, feats)
+        timings["predict"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        writer.write(list(pending_paths), feats, scores)
+        timings["write"] += time.perf_counter() - t
+
+        pending_paths.clear()
+        pending_feats.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_score_file, p) for p in todo]
+        for future in as_completed(futures):
+            path, feats, elapsed = future.result()
+            timings["features"] += elapsed
+            pending_paths.append(path)
+            pending_feats.append(feats)
+            failed += bool(np.isnan(feats).all())
+            n_done += 1
+
+            if len(pending_paths) >= batch_size:
+                flush()
+                rate = n_done / (time.perf_counter() - start)
+                print(f"\r⚙️  {n_done}/{len(todo)} files | {rate:.1f} files/sec", end="")
+
+        if pending_paths:
+            flush()
+
+    total = time.perf_counter() - start
+    print(f"\n✅ Scored {n_done} files in {total:.1f}s ({n_done / total:.1f} files/sec)")
+    if failed:
+        print(f"⚠️ {failed} files couldn't be analyzed (NaN features, no confidence)")
+    print(f"   Feature extraction: {timings['features']:.1f}s CPU across workers "
+          f"({timings['features'] / n_done * 1000:.0f} ms/file)")
+    print(f"   predict_proba:      {timings['predict']:.2f}s")
+    print(f"   Writing shards:     {timings['write']:.2f}s")
+    return timings
+
+
+def load_results(out_dir):
+    """
+    Concatenates all shards (NPZ or Parquet) into (paths, features, confidence).
+    Files whose features couldn't be extracted have NaN features and a NaN confidence.
+    """
+    paths, feats, scores = [], [], []
+    for name in _shards(out_dir):
+        data = _read_shard(os.path.join(out_dir, name))
+        paths.extend(data["path"].tolist())
+        feats.append(data["features"])
+        scores.append(data["confidence"])
+    if not paths:
+        return [], np.zeros((0, len(FEATURE_NAMES))), np.zeros(0)
+    return paths, np.concatenate(feats), np.concatenate(scores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score recorded answers with the confidence model.")
+    parser.add_argument("source", help="Directory of audio files or a manifest with one path per line")
+    parser.add_argument("out_dir", help="Where result shards and progress are written")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--format", choices=["npz", "parquet"], default="npz")
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ ERROR: {args.source} not found.")
+        sys.exit(1)
+
+    run_batch(args.source, args.out_dir, args.workers, args.batch_size, args.format, args.model)
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+# --- CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, "confidence_rf_model.pkl")
+ARRAYS = ("roots", "feature", "threshold", "children", "missing_left", "value")
+CHUNK_ROWS = 1024           # predict_proba walks larger inputs in pieces this big (working set stays in cache)
+SKLEARN_MIN_ROWS = 2048     # From about here on sklearn's own predict_proba is the faster one
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class CompiledForest:
+    """
+    A fitted sklearn RandomForestClassifier as flat node arrays, all trees
+    back to back:
+
+    - feature / threshold: the split of each node
+    - children[node] = (right, left); leaves point at themselves, so every
+      row can take exactly max_depth steps without checking for leaves
+    - missing_left: where a NaN goes, as sklearn decides
+    - value: the class fractions stored at each node
+
+    predict_proba() walks all trees for all rows at once, one depth level
+    per NumPy step, and returns exactly sklearn's floats: X is rounded to
+    float32 like sklearn does, and the per-tree probabilities are summed
+    from zero in estimator order before dividing by the number of trees.
+    It is built for small batches and single rows; large inputs are processed
+    CHUNK_ROWS at a time, but past SKLEARN_MIN_ROWS rows per call the sklearn
+    model is still faster.
+    """
+    def __init__(self, roots, feature, threshold, children, missing_left, value, classes, max_depth,
+                 n_features, source_digest=None):
+        # np.asarray drops the np.memmap subclass (still backed by the file), whose
+        # per-operation overhead would otherwise dominate single-row calls
+        self.roots = np.asarray(roots)
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.children = np.asarray(children)
+        self._flat_children = self.children.reshape(-1)
+        self.missing_left = np.asarray(missing_left)
+        self.value = np.asarray(value)
+        self.classes_ = np.asarray(classes)
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+        self.n_estimators = len(roots)
+        self.source_digest = source_digest
+
+    @classmethod
+    def from_sklearn(cls, model, source_digest=None):
+        trees = [e.tree_ for e in model.estimators_]
+        if any(t.n_outputs != 1 for t in trees):
+            raise ValueError("Only single-output forests can be compiled")
+
+        sizes = [t.node_count for t in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        feature, threshold, children, missing_left, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count) + offset
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            children.append(np.column_stack([np.where(leaf, nodes, tree.children_right + offset),
+                                             np.where(leaf, nodes, tree.children_left + offset)]))
+            missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, np.uint8)))
+            value.append(tree.value[:, 0, :model.n_classes_])
+
+        # Node indices are stored as intp so np.take never has to convert them
+        return cls(roots=offsets.astype(np.intp),
+                   feature=np.concatenate(feature).astype(np.intp),
+                   threshold=np.concatenate(threshold).astype(np.float64),
+                   children=np.concatenate(children).astype(np.intp),
+                   missing_left=np.concatenate(missing_left).astype(bool),
+                   value=np.concatenate(value).astype(np.float64),
+                   classes=model.classes_, max_depth=max(t.max_depth for t in trees),
+                   n_features=model.n_features_in_, source_digest=source_digest)
+
+    def save(self, path):
+        # Written next to `path` and renamed into place, so readers never see half an export
+        tmp = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"classes": self.classes_.tolist(), "max_depth": int(self.max_depth),
+                       "n_features": int(self.n_features_in_), "source_digest": self.source_digest}, f)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.rename(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        return cls(**arrays, classes=meta["classes"], max_depth=meta["max_depth"],
+                   n_features=meta["n_features"], source_digest=meta["source_digest"])
+
+    def apply(self, X):
+        """
+        Leaf node (global index) reached by every row in every tree, shape (n_rows, n_trees).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}")
+
+        # Flat gathers (np.take) are much cheaper than 2-D fancy indexing
+        flat_X = X.ravel()
+        row_start = np.arange(0, X.size, X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators))
+        has_nan = np.isnan(X).any()
+        for _ in range(self.max_depth):
+            x = np.take(flat_X, row_start + np.take(self.feature, nodes))
+            go_left = x <= np.take(self.threshold, nodes)
+            if has_nan:
+                go_left |= np.isnan(x) & np.take(self.missing_left, nodes)
+            nodes = np.take(self._flat_children, 2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) > CHUNK_ROWS and X.ndim == 2:
+            # (n_rows, n_trees, n_classes) temporaries of a whole large batch fall out of cache
+            proba = np.empty((len(X), self.value.shape[1]))
+            for start in range(0, len(X), CHUNK_ROWS):
+                proba[start:start + CHUNK_ROWS] = self._predict_proba(X[start:start + CHUNK_ROWS])
+            return proba
+        return self._predict_proba(X)
+
+    def _predict_proba(self, X):
+        values = np.take(self.value, self.apply(X), axis=0)    # (n_rows, n_trees, n_classes)
+        # cumsum adds strictly in tree order, like sklearn's accumulation (np.sum would go pairwise)
+        proba = np.cumsum(values, axis=1)[:, -1]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def load_forest(model_path=MODEL_PATH, export_path=None):
+    """
+    The compiled forest for a pickled sklearn model. The export lives next to
+    the pickle (<name>.forest/) and is memory-mapped; it is rebuilt, which
+    needs sklearn, whenever it's missing or the pickle changed.
+    """
+    export_path = export_path or os.path.splitext(model_path)[0] + ".forest"
+    digest = _file_digest(model_path)
+    try:
+        forest = CompiledForest.load(export_path)
+        if forest.source_digest == digest:
+            return forest
+    except (OSError, ValueError, KeyError):
+        pass
+
+    import joblib
+    forest = CompiledForest.from_sklearn(joblib.load(model_path), source_digest=digest)
+    try:
+        forest.save(export_path)
+        return CompiledForest.load(export_path)
+    except OSError as e:
+        print(f"⚠️ Could not write {export_path} ({e}), using the forest from memory.")
+        return forest
+
+
+# --- BENCHMARK ---
+def _probe_rows(forest, n, seed=0):
+    # Rows spread over each feature's split range, a quarter of them sitting exactly on a threshold
+    rng = np.random.default_rng(seed)
+    internal = forest.children[:, 0] != np.arange(len(forest.children))
+    X = np.zeros((n, forest.n_features_in_))
+    for f in range(forest.n_features_in_):
+        cuts = forest.threshold[internal & (forest.feature == f)]
+        lo, hi = cuts.min(), cuts.max()
+        X[:, f] = rng.uniform(lo - 0.1 * (hi - lo), hi + 0.1 * (hi - lo), n)
+        on_cut = rng.random(n) < 0.25
+        X[on_cut, f] = rng.choice(cuts, on_cut.sum())
+    return X
+
+
+def benchmark(rows=20000, single_calls=300):
+    """
+    Load time, single-row latency and batch throughput of the compiled
+    forest vs. the sklearn model, and an exact equality check of
+    predict_proba on probe rows (including values sitting on split thresholds).
+    """
+    import joblib
+    import warnings
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    t = time.perf_counter()
+    model = joblib.load(MODEL_PATH)
+    sk_load = time.perf_counter() - t
+    load_forest(MODEL_PATH)                     # Make sure the export exists
+    t = time.perf_counter()
+    forest = load_forest(MODEL_PATH)
+    forest_load = time.perf_counter() - t
+    print(f"⏱️  Load: joblib {sk_load * 1000:.1f} ms | memory-mapped forest {forest_load * 1000:.1f} ms "
+          f"({forest.n_estimators} trees, {len(forest.feature)} nodes, depth {forest.max_depth})")
+
+    X = _probe_rows(forest, rows)
+    X[:50, 3] = np.nan                          # NaN routing too
+    expected = model.predict_proba(X)
+    got = forest.predict_proba(X)
+    single = all(np.array_equal(model.predict_proba([x]), forest.predict_proba([x])) for x in X[:200])
+    print(f"📏 Bit-identical to predict_proba: batch {np.array_equal(expected, got)} "
+          f"(max diff {np.abs(expected - got).max():.1e}), single rows {single}")
+
+    for label, predict in (("sklearn", model.predict_proba), ("compiled", forest.predict_proba)):
+        timings = []
+        for x in X[:single_calls]:
+            t = time.perf_counter()
+            predict([x])
+            timings.append(time.perf_counter() - t)
+        throughput = []
+        for size in (256, rows):
+            t = time.perf_counter()
+            for start in range(0, rows, size):
+                predict(X[start:start + size])
+            throughput.append(rows / (time.perf_counter() - t))
+        print(f"⏱️  {label:<8} single row p50 {np.median(timings) * 1e6:6.0f} µs, p99 "
+              f"{np.percentile(timings, 99) * 1e6:6.0f} µs | batches of 256: {throughput[0]:7.0f} rows/sec, "
+              f"of {rows}: {throughput[1]:7.0f} rows/sec")
+
+if __name__ == "__main__":
+    benchmark()
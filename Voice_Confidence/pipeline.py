@@ -0,0 +1,260 @@
+import time
+import threading
+from collections import deque
+import numpy as np
+
+from audiobuffer import RollingWindow
+
+# --- CONFIGURATION ---
+CAPTURE_BUFFER_DURATION = 10    # Seconds of audio the capture ring can hold before samples are lost
+CAPTURE_STAMPS = 1024           # Writes whose capture time a ring remembers (see AudioRing.capture_time)
+
+
+class AudioRing:
+    """
+    Fixed-capacity single-producer ring of float32 samples.
+
+    The producer copies samples in and only then advances `write_pos` (total
+    samples ever written), so readers never need a lock: they keep their own
+    read position and anything older than `capacity` samples has been overwritten.
+
+    Each write is stamped with the time its newest sample was captured: now for
+    a source, or the `capture_time` of the same audio in an upstream ring, so
+    latency can be measured from capture rather than from the last hand-off.
+    """
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.write_pos = 0
+        self._stamps = deque(maxlen=CAPTURE_STAMPS)   # (write_pos after the write, capture time)
+        self.data_ready = threading.Event()
+
+    def write(self, samples, capture_time=None):
+        samples = np.asarray(samples, dtype=np.float32)
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest samples fit; the rest count as written-and-overwritten
+            self.write_pos += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+
+        # Stamped before write_pos moves, so a reader that sees the samples also sees their time
+        self._stamps.append((self.write_pos + n, time.monotonic() if capture_time is None else capture_time))
+        self.write_pos += n
+        self.data_ready.set()
+
+    def read(self, start, end):
+        """
+        Copy of samples [start, end) in stream positions.
+        Returns (samples, lost) where lost is how many requested samples were
+        already overwritten (those are skipped, not zero-filled).
+        """
+        end = min(end, self.write_pos)
+        oldest = self.write_pos - self.capacity
+        lost = max(0, min(oldest, end) - start)
+        start = max(start, oldest, 0)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32), lost
+
+        i = start % self.capacity
+        n = end - start
+        if i + n <= self.capacity:
+            return self.buffer[i:i + n].copy(), lost
+        return np.concatenate((self.buffer[i:], self.buffer[:n - (self.capacity - i)])), lost
+
+    def capture_time(self, pos):
+        """
+        When the sample just before stream position `pos` was captured,
+        None if nothing was written yet or that write is too old to remember.
+        """
+        found = None
+        for end, t in reversed(list(self._stamps)):   # list(): the producer may append meanwhile
+            if end < pos:
+                break
+            found = t
+        return found
+
+
+class PipelineStats:
+    """
+    Counters shared by the capture loop and the analysis worker.
+    """
+    def __init__(self):
+        self.chunks_captured = 0
+        self.dropped_samples = 0       # Overwritten in the capture ring before being read
+        self.windows_analyzed = 0
+        self.windows_coalesced = 0     # Chunks folded into a later analysis under backpressure
+        self.windows_skipped = 0       # Backlog longer than a whole window; only the newest was kept
+        self.latencies = []            # Capture of newest sample -> score ready (seconds)
+
+    def summary(self):
+        lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "chunks_captured": self.chunks_captured,
+            "dropped_samples": self.dropped_samples,
+            "windows_analyzed": self.windows_analyzed,
+            "windows_coalesced": self.windows_coalesced,
+            "windows_skipped": self.windows_skipped,
+            "latency_p50_ms": float(np.percentile(lat, 50)),
+            "latency_p95_ms": float(np.percentile(lat, 95)),
+            "latency_max_ms": float(np.max(lat)),
+        }
+
+
+# --- AUDIO SOURCES ---
+class MicrophoneSource:
+    """
+    PyAudio in callback mode: PortAudio's thread writes straight into the ring,
+    so a slow analysis step can no longer overflow the input stream.
+    """
+    finished = False
+
+    def __init__(self, sample_rate, chunk_size):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+
+    def start(self, ring):
+        import pyaudio
+
+        def callback(in_data, frame_count, time_info, status):
+            ring.write(np.frombuffer(in_data, dtype=np.float32))
+            return (None, pyaudio.paContinue)
+
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paFloat32,
+                                     channels=1,
+                                     rate=self.sample_rate,
+                                     input=True,
+                                     frames_per_buffer=self.chunk_size,
+                                     stream_callback=callback)
+        self._stream.start_stream()
+
+    def stop(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pa.terminate()
+
+
+class FakeAudioSource:
+    """
+    Plays a numpy array (or audio file) into the ring from a background thread,
+    in real time by default, so the pipeline can run without a microphone.
+    `speed` > 1 plays faster than real time; 0 writes as fast as possible.
+    """
+    def __init__(self, audio, sample_rate=22050, chunk_size=11025, speed=1.0):
+        if isinstance(audio, str):
+            import librosa
+            audio, _ = librosa.load(audio, sr=sample_rate)
+        self.audio = np.asarray(audio, dtype=np.float32)
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.speed = speed
+        self.finished = False
+        self._stop = threading.Event()
+
+    def start(self, ring):
+        self._thread = threading.Thread(target=self._run, args=(ring,), daemon=True)
+        self._thread.start()
+
+    def _run(self, ring):
+        period = self.chunk_size / self.sample_rate / self.speed if self.speed else 0
+        next_time = time.monotonic()
+        for start in range(0, len(self.audio), self.chunk_size):
+            if self._stop.is_set():
+                break
+            if period:
+                next_time += period
+                time.sleep(max(0, next_time - time.monotonic()))
+            ring.write(self.audio[start:start + self.chunk_size])
+        self.finished = True
+        ring.data_ready.set()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# --- ANALYSIS WORKER ---
+class AnalysisWorker(threading.Thread):
+    """
+    Consumes the speech ring on its own thread.
+
+    Each wake-up analyzes everything written since the previous analysis as one
+    hop, so when analysis is slower than real time several chunks are coalesced
+    into a single score instead of queueing up. If the backlog is longer than
+    a whole window, the worker resets and only keeps the newest window.
+
+    analyze(new_samples, window, reset) is called with the new audio, the latest
+    `window_samples` of speech and whether earlier state must be discarded.
+    """
+    def __init__(self, ring, analyze, window_samples, chunk_size, stats):
+        super().__init__(daemon=True)
+        self.ring = ring
+        self.analyze = analyze
+        self.window_samples = window_samples
+        self.chunk_size = chunk_size
+        self.stats = stats
+        self._read_pos = 0
+        self._window = RollingWindow(window_samples)
+        self._stopping = threading.Event()
+
+    def run(self):
+        while True:
+            self.ring.data_ready.clear()
+            write_pos = self.ring.write_pos
+            if write_pos <= self._read_pos:
+                if self._stopping.is_set():
+                    break
+                self.ring.data_ready.wait(timeout=0.1)
+                continue
+
+            pending = write_pos - self._read_pos
+            reset = pending > self.window_samples
+            if reset:
+                self.stats.windows_skipped += 1
+                self._read_pos = write_pos - self.window_samples
+            elif pending > self.chunk_size:
+                self.stats.windows_coalesced += int(np.ceil(pending / self.chunk_size)) - 1
+
+            new_samples, _ = self.ring.read(self._read_pos, write_pos)
+            capture_time = self.ring.capture_time(write_pos)
+            self._read_pos = write_pos
+            self._window.append(new_samples)
+
+            self.analyze(new_samples, self._window.view(), reset)
+            self.stats.windows_analyzed += 1
+            if capture_time is not None:
+                self.stats.latencies.append(time.monotonic() - capture_time)
+
+    def stop(self):
+        # Finishes whatever is still pending before the thread exits
+        self._stopping.set()
+        self.ring.data_ready.set()
+        self.join()
+
+
+if __name__ == "__main__":
+    # Demo: a deliberately slow analyzer against a fake source shows coalescing
+    sr = 22050
+    chunk = sr // 2
+    audio = (0.1 * np.sin(2 * np.pi * 150 * np.arange(sr * 6) / sr)).astype(np.float32)
+
+    capture = AudioRing(sr * CAPTURE_BUFFER_DURATION)
+    stats = PipelineStats()
+    worker = AnalysisWorker(capture, lambda new, window, reset: time.sleep(0.8), sr * 3, chunk, stats)
+    source = FakeAudioSource(audio, sr, chunk, speed=2.0)
+
+    worker.start()
+    source.start(capture)
+    while not source.finished:
+        time.sleep(0.05)
+    source.stop()
+    worker.stop()
+    print(f"📈 {stats.summary()}")
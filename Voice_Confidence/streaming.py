@@ -0,0 +1,388 @@
+import time
+import numpy as np
+import librosa
+import parselmouth
+from parselmouth.praat import call
+
+# --- CONFIGURATION ---
+# Praat / librosa settings mirrored from features.extract_features
+PITCH_FLOOR = 75
+PITCH_CEILING = 500
+PERIOD_FLOOR = 0.0001
+PERIOD_CEILING = 0.02
+MAX_PERIOD_FACTOR = 1.3
+MAX_AMPLITUDE_FACTOR = 1.6
+HNR_UNDEFINED = -200
+RMS_FRAME_LENGTH = 2048
+RMS_HOP_LENGTH = 512
+
+# Extra audio in front of every hop so Praat's analysis windows are fully
+# covered at the hop boundary and pulse trains can be re-aligned (see _update_praat).
+CONTEXT_DURATION = 0.2
+# Praat frames / pulses this close to the newest sample are only accepted on
+# the next hop, once they have audio on both sides.
+SETTLE_DURATION = 0.05
+
+
+def jitter_local(pulse_times):
+    """
+    Praat's "Get jitter (local)" (0, 0, 0.0001, 0.02, 1.3) on raw pulse times.
+    """
+    t = np.asarray(pulse_times, dtype=np.float64)
+    if len(t) < 3:
+        return np.nan
+
+    periods = np.diff(t)
+    in_range = (periods >= PERIOD_FLOOR) & (periods <= PERIOD_CEILING)
+    p1, p2 = periods[:-1], periods[1:]
+    factor = np.maximum(p1, p2) / np.minimum(p1, p2)
+    valid = in_range[:-1] & in_range[1:] & (factor <= MAX_PERIOD_FACTOR)
+
+    n_periods = len(periods) - np.count_nonzero(~valid)
+    if n_periods < 2 or not in_range.any():
+        return np.nan
+
+    absolute = np.sum(np.abs(p1 - p2)[valid]) / (n_periods - 1)
+    return absolute / np.mean(periods[in_range])
+
+
+def shimmer_local(peak_times, peak_amplitudes):
+    """
+    Praat's "Get shimmer (local)" (0, 0, 0.0001, 0.02, 1.3, 1.6) on the
+    per-period peak amplitudes (see pulse_amplitudes).
+    """
+    t = np.asarray(peak_times, dtype=np.float64)
+    a = np.asarray(peak_amplitudes, dtype=np.float64)
+    if len(a) < 3:
+        return np.nan
+
+    periods = np.diff(t)
+    a1, a2 = a[:-1], a[1:]
+    factor = np.maximum(a1, a2) / np.minimum(a1, a2)
+    valid = (periods >= PERIOD_FLOOR) & (periods <= PERIOD_CEILING) & (factor <= MAX_AMPLITUDE_FACTOR)
+
+    n_pairs = np.count_nonzero(valid)
+    if n_pairs < 1:
+        return np.nan
+    return (np.sum(np.abs(a1 - a2)[valid]) / n_pairs) / np.mean(a)
+
+
+def pulse_amplitudes(y, start_time, sr, pulse_times):
+    """
+    Hann-windowed RMS around each pulse (0.2 of the neighbouring periods),
+    which is what Praat's shimmer uses as the period amplitude.
+    Pulses without two valid neighbouring periods get NaN.
+    The last pulse reuses its left period because the next one is not known yet.
+    """
+    t = np.asarray(pulse_times, dtype=np.float64)
+    amps = np.full(len(t), np.nan)
+    if len(t) < 2:
+        return amps
+
+    periods = np.diff(t)
+    left = np.concatenate(([np.nan], periods))
+    right = np.concatenate((periods, [periods[-1]]))
+
+    for i in range(len(t)):
+        p1, p2 = left[i], right[i]
+        if not (PERIOD_FLOOR <= p1 <= PERIOD_CEILING and PERIOD_FLOOR <= p2 <= PERIOD_CEILING):
+            continue
+        if max(p1, p2) / min(p1, p2) > MAX_PERIOD_FACTOR:
+            continue
+
+        tmid = t[i]
+        i0 = max(int(np.ceil((tmid - 0.2 * p1 - start_time) * sr)), 0)
+        i1 = min(int(np.floor((tmid + 0.2 * p2 - start_time) * sr)), len(y) - 1)
+        if i1 < i0:
+            continue
+
+        tt = start_time + np.arange(i0, i1 + 1) / sr
+        w = np.where(tt < tmid,
+                     0.5 - 0.5 * np.cos(np.pi * (tt - (tmid - 0.2 * p1)) / (0.2 * p1)),
+                     0.5 + 0.5 * np.cos(np.pi * (tt - tmid) / (0.2 * p2)))
+        w = np.clip(w, 0, None)
+        x = y[i0:i1 + 1]
+        if np.sum(w) > 0:
+            rms = np.sqrt(np.sum(w * x * x) / np.sum(w))
+            if rms > 0:
+                amps[i] = rms
+    return amps
+
+
+class FrameRing:
+    """
+    Fixed-capacity store of timestamped analysis frames for the current window.
+    Frames older than the window are dropped from the front.
+    """
+    def __init__(self, capacity, n_values=1):
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((capacity, n_values))
+        self.size = 0
+
+    def extend(self, times, values):
+        n = len(times)
+        if n == 0:
+            return
+        capacity = len(self.times)
+        if n >= capacity:
+            times, values = times[-capacity:], values[-capacity:]
+            n = capacity
+            self.size = 0
+        elif self.size + n > capacity:
+            self._drop(self.size + n - capacity)
+
+        self.times[self.size:self.size + n] = times
+        self.values[self.size:self.size + n] = np.asarray(values).reshape(n, -1)
+        self.size += n
+
+    def prune(self, t_min):
+        k = np.searchsorted(self.times[:self.size], t_min)
+        if k:
+            self._drop(k)
+
+    def _drop(self, k):
+        keep = self.size - k
+        self.times[:keep] = self.times[k:self.size]
+        self.values[:keep] = self.values[k:self.size]
+        self.size = keep
+
+    def column(self, i=0):
+        return self.values[:self.size, i]
+
+    def timestamps(self):
+        return self.times[:self.size]
+
+
+class StreamingFeatureExtractor:
+    """
+    Stateful version of extract_features for the live rolling window.
+
+    push() analyzes only the new hop (plus a short context) and keeps per-frame
+    pitch, HNR, glottal pulses / amplitudes and RMS for the last `window_duration`
+    seconds, then aggregates them into the same 8-feature vector.
+    The window starts as silence, like the zero-filled rolling_buffer in listen().
+
+    Tolerance vs. extract_features on the same 3 s window (speech-like audio,
+    0.5 s hops, see benchmark()): pitch mean/var, jitter and HNR within ~1%
+    relative, energy mean/var and shimmer within ~4%, speaking rate within
+    +-1 peak per window. Differences come from RMS frames being aligned to the
+    stream instead of the window (and lagging it by half a frame), and from
+    hop-edge effects in Praat's pitch path finding.
+    """
+    def __init__(self, sample_rate=22050, window_duration=3, context_duration=CONTEXT_DURATION):
+        self.sample_rate = sample_rate
+        self.window_samples = int(sample_rate * window_duration)
+        self.context_samples = int(sample_rate * context_duration)
+        self.reset()
+
+    def reset(self):
+        sr = self.sample_rate
+        window = self.window_samples / sr
+        self.total_samples = 0
+
+        # Enough history for the Praat context and for one full RMS frame
+        self._tail = np.zeros(max(self.context_samples, RMS_FRAME_LENGTH))
+        self._next_rms_frame = 0
+        self._settled_until = 0.0
+
+        self.rms = np.zeros(1 + self.window_samples // RMS_HOP_LENGTH)
+        self.pitch = FrameRing(int(window * 100 * 1.5) + 16)
+        self.hnr = FrameRing(int(window * 100 * 1.5) + 16)
+        self.pulses = FrameRing(int(window * PITCH_CEILING * 1.5) + 16, n_values=1)
+        self.pulse_amps = FrameRing(int(window * PITCH_CEILING * 1.5) + 16, n_values=1)
+
+    # --- PER-HOP ANALYSIS ---
+    def _update_rms(self, segment, segment_start):
+        half = RMS_FRAME_LENGTH // 2
+        first = self._next_rms_frame
+        last = (self.total_samples - half) // RMS_HOP_LENGTH
+        if last < first:
+            return
+
+        offset = first * RMS_HOP_LENGTH - half - segment_start
+        frames = np.lib.stride_tricks.sliding_window_view(segment[offset:], RMS_FRAME_LENGTH)[::RMS_HOP_LENGTH]
+        frames = frames[:last - first + 1]
+        new = np.sqrt(np.mean(frames ** 2, axis=1))
+        self._next_rms_frame = last + 1
+
+        n = min(len(new), len(self.rms))
+        self.rms[:-n] = self.rms[n:]
+        self.rms[-n:] = new[-n:]
+
+    def _update_praat(self, segment, segment_start):
+        sr = self.sample_rate
+        t0 = self._settled_until
+        t1 = self.total_samples / sr - SETTLE_DURATION
+        self._settled_until = t1
+        sound = parselmouth.Sound(segment, sampling_frequency=sr, start_time=segment_start / sr)
+
+        pitch = sound.to_pitch()
+        xs = pitch.xs()
+        keep = (xs >= t0) & (xs < t1)
+        self.pitch.extend(xs[keep], pitch.selected_array['frequency'][keep])
+
+        harmonicity = call(sound, "To Harmonicity (cc)", 0.01, PITCH_FLOOR, 0.1, 1.0)
+        xs = harmonicity.xs()
+        keep = (xs >= t0) & (xs < t1)
+        self.hnr.extend(xs[keep], harmonicity.values[0][keep])
+
+        point_process = call(sound, "To PointProcess (periodic, cc)", PITCH_FLOOR, PITCH_CEILING)
+        if call(point_process, "Get number of points") == 0:
+            return
+        times = call(point_process, "To Matrix").values[0]
+
+        # Praat may lock onto a different phase of the same glottal cycle in a
+        # new analysis; re-align to the pulses already accepted in the overlap
+        # so a voiced stretch crossing the hop boundary doesn't fake a jitter jump.
+        previous = self.pulses.timestamps()
+        previous = previous[previous >= segment_start / sr]
+        overlap = times[times < t0]
+        if len(previous) > 0 and len(overlap) > 0:
+            nearest = np.abs(overlap[None, :] - previous[:, None]).argmin(axis=1)
+            shift = np.median(previous - overlap[nearest])
+            if abs(shift) < 0.5 / PITCH_CEILING:
+                times = times + shift
+
+        # Neighbours from the previous hop are needed for the first new pulse
+        times = np.concatenate((previous[-1:], times[times >= t0]))
+        times = times[times < t1]
+        amps = pulse_amplitudes(segment, segment_start / sr, sr, times)
+
+        new = times >= t0
+        self.pulses.extend(times[new], times[new])
+        self.pulse_amps.extend(times[new], amps[new])
+
+    def push(self, chunk):
+        """
+        Feed the next hop of audio and return the 8 features for the current window.
+        [PitchMean, PitchVar, EnergyMean, EnergyVar, Jitter, Shimmer, HNR, SpeakingRate]
+        """
+        try:
+            chunk = np.asarray(chunk, dtype=np.float64)
+            self.total_samples += len(chunk)
+
+            segment = np.concatenate((self._tail, chunk))
+            segment_start = self.total_samples - len(segment)
+            self._tail = segment[-len(self._tail):]
+
+            self._update_rms(segment, segment_start)
+
+            praat_segment = segment[-(len(chunk) + self.context_samples):]
+            self._update_praat(praat_segment, self.total_samples - len(praat_segment))
+
+            window_start = (self.total_samples - self.window_samples) / self.sample_rate
+            for ring in (self.pitch, self.hnr, self.pulses, self.pulse_amps):
+                ring.prune(window_start)
+
+            return self.features()
+
+        except Exception as e:
+            print(f"Streaming Feature Error: {e}")
+            return [0]*8
+
+    # --- WINDOW AGGREGATION ---
+    def features(self):
+        f0 = self.pitch.column()
+        f0 = f0[f0 != 0]
+        if len(f0) > 0:
+            pitch_mean = np.mean(f0)
+            pitch_var = np.var(f0)
+        else:
+            pitch_mean = 0
+            pitch_var = 0
+
+        jitter = jitter_local(self.pulses.timestamps())
+
+        energy_mean = np.mean(self.rms)
+        energy_var = np.var(self.rms)
+
+        amps = self.pulse_amps.column()
+        voiced = ~np.isnan(amps)
+        shimmer = shimmer_local(self.pulse_amps.timestamps()[voiced], amps[voiced])
+
+        hnr_values = self.hnr.column()
+        hnr_values = hnr_values[hnr_values != HNR_UNDEFINED]
+        hnr = np.mean(hnr_values) if len(hnr_values) > 0 else np.nan
+
+        peaks = librosa.util.peak_pick(self.rms, pre_max=5, post_max=5, pre_avg=5, post_avg=5, delta=0.1, wait=10)
+        speaking_rate = len(peaks) / (self.window_samples / self.sample_rate)
+
+        return [pitch_mean, pitch_var, energy_mean, energy_var, jitter, shimmer, hnr, speaking_rate]
+
+    def segments(self, top_db=20):
+        """
+        Non-silent intervals of the current window (same rule as librosa.effects.split),
+        as (start, end) sample offsets from the window start.
+        """
+        power = self.rms ** 2
+        non_silent = librosa.power_to_db(power, ref=np.max(power), top_db=None) > -top_db if power.max() > 0 \
+            else np.zeros(len(power), dtype=bool)
+
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], non_silent.astype(np.int8), [0]))))
+        bounds = edges.reshape(-1, 2) * RMS_HOP_LENGTH
+        return np.clip(bounds, 0, self.window_samples)
+
+
+# --- BENCHMARK ---
+def _speech_like(seconds, sr, seed=0):
+    # Harmonic voice with slow pitch drift, syllable envelope, pauses and a noise floor
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 130 + 25 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) ** 0.6
+    gate = np.sin(2 * np.pi * 0.45 * t + 1) > -0.6
+    return (0.25 * voice * envelope * gate + 0.004 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def benchmark(seconds=20, sample_rate=22050, chunk_duration=0.5, window_duration=3):
+    from features import extract_features
+
+    chunk_size = int(sample_rate * chunk_duration)
+    audio = _speech_like(seconds, sample_rate)
+    rolling_buffer = np.zeros(sample_rate * window_duration, dtype=np.float32)
+    extractor = StreamingFeatureExtractor(sample_rate, window_duration)
+
+    # Warm up numba-compiled librosa helpers so the first tick isn't counted
+    extract_features(audio_array=audio[:len(rolling_buffer)], sample_rate=sample_rate)
+    StreamingFeatureExtractor(sample_rate, window_duration).push(audio[:chunk_size])
+
+    full_times, stream_times, rel_err = [], [], []
+    for start in range(0, len(audio) - chunk_size + 1, chunk_size):
+        chunk = audio[start:start + chunk_size]
+        rolling_buffer = np.roll(rolling_buffer, -len(chunk))
+        rolling_buffer[-len(chunk):] = chunk
+
+        t = time.perf_counter()
+        full = extract_features(audio_array=rolling_buffer, sample_rate=sample_rate)
+        full_times.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        live = extractor.push(chunk)
+        stream_times.append(time.perf_counter() - t)
+
+        full, live = np.array(full, dtype=float), np.array(live, dtype=float)
+        if start >= len(rolling_buffer) and not np.isnan(full).any():
+            rel_err.append(np.abs(live - full) / np.maximum(np.abs(full), 1e-9))
+
+    names = ["PitchMean", "PitchVar", "EnergyMean", "EnergyVar", "Jitter", "Shimmer", "HNR", "SpeakingRate"]
+    full_ms, stream_ms = np.array(full_times) * 1000, np.array(stream_times) * 1000
+    print(f"⏱️  Full window : mean {full_ms.mean():.1f} ms | p95 {np.percentile(full_ms, 95):.1f} ms")
+    print(f"⏱️  Streaming   : mean {stream_ms.mean():.1f} ms | p95 {np.percentile(stream_ms, 95):.1f} ms")
+    print(f"🚀 Speedup: {full_ms.mean() / stream_ms.mean():.1f}x")
+    if rel_err:
+        errs = np.median(rel_err, axis=0)
+        print("📐 Median relative error per feature:")
+        for name, err in zip(names, errs):
+            print(f"   {name:<13} {err * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    benchmark()
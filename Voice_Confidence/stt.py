@@ -0,0 +1,185 @@
+import io
+import time
+import contextlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+STT_WORKERS = 4                 # Segments transcribed at the same time
+SEGMENT_PAUSE = 0.4             # Seconds of VAD silence that close a segment ...
+MIN_SEGMENT_DURATION = 2.0      # ... once it's this long (shorter ones lose too much context)
+MAX_SEGMENT_DURATION = 30.0     # Cut even mid-speech past this (web APIs reject long uploads)
+
+
+class STTError(Exception):
+    """
+    The recognizer couldn't be reached or refused the request (not "no speech").
+    """
+
+
+def to_pcm16(samples):
+    # Same conversion as RecordingStore.to_pcm16, for any float32 array
+    out = np.empty(len(samples), dtype=np.int16)
+    np.multiply(samples, 32767, out=out, casting="unsafe")
+    return memoryview(out).cast("B")
+
+
+# --- BACKENDS ---
+# Anything with transcribe(pcm16_bytes, sample_rate) -> str works; return ""
+# when nothing was understood and raise STTError when the service failed.
+class SpeechRecognitionBackend:
+    """
+    speech_recognition's recognizers: "google" (the web API listen() always
+    used) or "sphinx" (offline, needs pocketsphinx). The recognizer only
+    holds settings, so one instance serves all worker threads.
+    """
+    def __init__(self, engine="google"):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        self._recognize = getattr(self.recognizer, "recognize_" + engine)
+
+    def transcribe(self, pcm, sample_rate):
+        try:
+            return self._recognize(self._sr.AudioData(pcm, sample_rate, 2))
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            raise STTError(str(e)) from e
+
+
+class FakeBackend:
+    """
+    Offline stand-in: waits like a web STT call would (latency plus
+    per_second of processing per second of audio, divided by `speed`) and
+    returns a placeholder with the length of audio it was given.
+    """
+    def __init__(self, latency=0.5, per_second=0.2, speed=1.0):
+        self.latency = latency
+        self.per_second = per_second
+        self.speed = speed
+        self.calls = 0
+
+    def transcribe(self, pcm, sample_rate):
+        seconds = len(pcm) / 2 / sample_rate
+        time.sleep((self.latency + self.per_second * seconds) / self.speed)
+        self.calls += 1
+        return f"<{seconds:.1f}s>"
+
+
+def make_backend(name="google"):
+    if name == "fake":
+        return FakeBackend()
+    return SpeechRecognitionBackend(name)
+
+
+class StreamingTranscriber:
+    """
+    Transcribes an answer in segments while it is still being recorded.
+
+    add() collects audio with the VAD's verdict; a segment is closed at the
+    first pause of SEGMENT_PAUSE once it is at least MIN_SEGMENT_DURATION long
+    (or at MAX_SEGMENT_DURATION) and sent to the worker pool right away.
+    finish() sends whatever speech is left, waits and joins the segment
+    transcripts in order, so after the last word only the last segment is
+    still in flight.
+    """
+    def __init__(self, backend, sample_rate=22050, workers=STT_WORKERS, pause=SEGMENT_PAUSE,
+                 min_duration=MIN_SEGMENT_DURATION, max_duration=MAX_SEGMENT_DURATION):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.pause = pause
+        self.min_samples = int(min_duration * sample_rate)
+        self.max_samples = int(max_duration * sample_rate)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt")
+        self._futures = []
+        self._parts = []
+        self._size = 0
+        self._has_speech = False
+        self.failed = 0             # Segments lost to STTError
+
+    def add(self, samples, speech, trailing_silence):
+        self._parts.append(samples)
+        self._size += len(samples)
+        self._has_speech |= bool(speech)
+        if self._size >= self.max_samples or (
+                self._has_speech and self._size >= self.min_samples and trailing_silence >= self.pause):
+            self._cut()
+
+    def _cut(self):
+        if self._has_speech:
+            pcm = to_pcm16(np.concatenate(self._parts))
+            self._futures.append(self._pool.submit(self.backend.transcribe, pcm, self.sample_rate))
+        self._parts = []
+        self._size = 0
+        self._has_speech = False
+
+    @property
+    def segments(self):
+        return len(self._futures)
+
+    def finish(self):
+        self._cut()
+        texts = []
+        for future in self._futures:
+            try:
+                texts.append(future.result())
+            except STTError:
+                self.failed += 1
+        self._pool.shutdown()
+        return " ".join(t for t in texts if t)
+
+
+# --- BENCHMARK ---
+def benchmark(n=6, speed=4.0):
+    """
+    Time from the last word to the final transcript, in real-time seconds,
+    for synthetic answers played through VoiceAnalyzer.listen() at `speed`x
+    with the fake backend: the old rule (3 s silence, one upload), the VAD
+    with one upload, and the VAD with streaming segments.
+    """
+    import tempfile
+    import librosa
+    import vad
+    import voice
+    from pipeline import FakeAudioSource
+
+    settings = [("Legacy rule + one upload", False, False), ("VAD + one upload", True, False),
+                ("VAD + streaming", True, True)]
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = [(librosa.load(path, sr=voice.SAMPLE_RATE)[0], end)
+                 for path, end in vad.read_labels(vad.make_synthetic_set(tmp, n=n))]
+        voice.load_model()
+
+        for label, use_vad, streaming in settings:
+            voice.USE_ADAPTIVE_VAD, voice.STREAMING_STT = use_vad, streaming
+            latencies, calls, missing = [], 0, 0
+            for audio, speech_end in clips:
+                backend = FakeBackend(speed=speed)
+                bot = voice.VoiceAnalyzer(stt_backend=backend)
+                source = FakeAudioSource(audio, voice.SAMPLE_RATE, int(voice.SAMPLE_RATE * vad.READ_DURATION), speed)
+                t = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    bot.listen(source)
+                done = (time.perf_counter() - t) * speed
+                ends = vad.vad_end_of_turn(audio, voice.SAMPLE_RATE) if use_vad else \
+                    vad.legacy_end_of_turn(audio, voice.SAMPLE_RATE)
+                if ends is None:
+                    missing += 1        # Turn never ended (noisy room), listen() ran to the end of the clip
+                    continue
+                latencies.append(done - speech_end)
+                calls += backend.calls
+            print(f"⏱️  {label:<26} last word -> transcript p50 {np.median(latencies):.2f} s, "
+                  f"max {np.max(latencies):.2f} s | {calls / max(len(latencies), 1):.1f} STT calls per answer"
+                  + (f" | {missing}/{len(clips)} never ended" if missing else ""))
+        voice.USE_ADAPTIVE_VAD, voice.STREAMING_STT = True, True
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    benchmark()
@@ -0,0 +1,251 @@
+import time
+import numpy as np
+import librosa
+from parselmouth.praat import call
+
+from streaming import (PERIOD_FLOOR, PERIOD_CEILING, MAX_PERIOD_FACTOR, MAX_AMPLITUDE_FACTOR, HNR_UNDEFINED,
+                       RMS_HOP_LENGTH, pulse_amplitudes)
+from analysis import WindowAnalysis
+
+# --- CONFIGURATION ---
+WINDOW_DURATION = 3     # Same window the live score uses (CONFIDENCE_WINDOW)
+HOP_DURATION = 0.5
+BLOCK_DURATION = 240    # Seconds of a long file analyzed at a time by window_features_file
+BLOCK_CONTEXT = 1.0     # Seconds of audio kept on each side of a block so its edge windows see what they would
+FLATNESS_THRESHOLD = 0.01
+FLATNESS_PENALTY = 0.5
+
+
+def _prefix(values):
+    # Prefix sums with a leading 0 so sum(values[a:b]) == p[b] - p[a]
+    return np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+
+def _range_sum(prefix, start, end):
+    return prefix[end] - prefix[start]
+
+
+def window_features(audio, sample_rate=22050, window_duration=WINDOW_DURATION, hop_duration=HOP_DURATION,
+                    first_start=0):
+    """
+    8-feature matrix for every window of `window_duration` seconds, `hop_duration` apart
+    (the first one `first_start` samples in).
+
+    Pitch, harmonicity, glottal pulses and RMS are analyzed once over the whole
+    signal; each window then only aggregates its frames through prefix sums.
+    Returns (window start times in seconds, features of shape [n_windows, 8],
+    mean spectral flatness per window).
+    """
+    y = np.asarray(audio, dtype=np.float64)
+    sr = sample_rate
+    window_samples = int(window_duration * sr)
+    hop_samples = int(hop_duration * sr)
+    if len(y) < window_samples:
+        y = np.concatenate((y, np.zeros(window_samples - len(y))))
+
+    starts = np.arange(first_start, len(y) - window_samples + 1, hop_samples)
+    t_start = starts / sr
+    t_end = t_start + window_duration
+
+    # --- A. ONE ANALYSIS PASS OVER THE WHOLE ANSWER ---
+    analysis = WindowAnalysis(y, sr)
+    f0_times, f0 = analysis.pitch.xs(), analysis.pitch.selected_array['frequency']
+    hnr_times, hnr = analysis.harmonicity.xs(), analysis.harmonicity.values[0]
+
+    if call(analysis.pulses, "Get number of points") > 0:
+        pulses = call(analysis.pulses, "To Matrix").values[0]
+    else:
+        pulses = np.zeros(0)
+    amps = pulse_amplitudes(y, 0.0, sr, pulses)
+
+    rms = analysis.rms
+    flatness = analysis.flatness
+
+    # --- B. PITCH & HNR (frame ranges per window) ---
+    f0_lo, f0_hi = np.searchsorted(f0_times, t_start), np.searchsorted(f0_times, t_end)
+    voiced = f0 != 0
+    n_voiced = _range_sum(_prefix(voiced), f0_lo, f0_hi)
+    f0_sum = _range_sum(_prefix(np.where(voiced, f0, 0)), f0_lo, f0_hi)
+    f0_sq = _range_sum(_prefix(np.where(voiced, f0 * f0, 0)), f0_lo, f0_hi)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pitch_mean = np.where(n_voiced > 0, f0_sum / n_voiced, 0)
+        pitch_var = np.where(n_voiced > 0, np.maximum(f0_sq / n_voiced - pitch_mean ** 2, 0), 0)
+
+    hnr_lo, hnr_hi = np.searchsorted(hnr_times, t_start), np.searchsorted(hnr_times, t_end)
+    defined = hnr != HNR_UNDEFINED
+    n_defined = _range_sum(_prefix(defined), hnr_lo, hnr_hi)
+    hnr_sum = _range_sum(_prefix(np.where(defined, hnr, 0)), hnr_lo, hnr_hi)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hnr_mean = np.where(n_defined > 0, hnr_sum / n_defined, np.nan)
+
+    # --- C. JITTER (pulse ranges per window) ---
+    p_lo, p_hi = np.searchsorted(pulses, t_start), np.searchsorted(pulses, t_end)
+    periods = np.diff(pulses)
+    in_range = (periods >= PERIOD_FLOOR) & (periods <= PERIOD_CEILING)
+    p1, p2 = periods[:-1], periods[1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = np.maximum(p1, p2) / np.minimum(p1, p2)
+    pair_ok = in_range[:-1] & in_range[1:] & (factor <= MAX_PERIOD_FACTOR)
+
+    # Pulses [lo, hi) -> periods [lo, hi - 1) -> period pairs [lo, hi - 2)
+    period_hi = np.maximum(p_hi - 1, p_lo)
+    pair_hi = np.maximum(p_hi - 2, p_lo)
+    n_points = p_hi - p_lo
+    n_periods = (n_points - 1) - _range_sum(_prefix(~pair_ok), p_lo, pair_hi)
+    abs_sum = _range_sum(_prefix(np.where(pair_ok, np.abs(p1 - p2), 0)), p_lo, pair_hi)
+    n_in_range = _range_sum(_prefix(in_range), p_lo, period_hi)
+    period_sum = _range_sum(_prefix(np.where(in_range, periods, 0)), p_lo, period_hi)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jitter = (abs_sum / (n_periods - 1)) / (period_sum / n_in_range)
+    jitter = np.where((n_points >= 3) & (n_periods >= 2) & (n_in_range > 0), jitter, np.nan)
+
+    # --- D. SHIMMER (amplitude points per window) ---
+    has_amp = ~np.isnan(amps)
+    a_times, a = pulses[has_amp], amps[has_amp]
+    a_lo, a_hi = np.searchsorted(a_times, t_start), np.searchsorted(a_times, t_end)
+    a_gap = np.diff(a_times)
+    a1, a2 = a[:-1], a[1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a_factor = np.maximum(a1, a2) / np.minimum(a1, a2)
+    a_ok = (a_gap >= PERIOD_FLOOR) & (a_gap <= PERIOD_CEILING) & (a_factor <= MAX_AMPLITUDE_FACTOR)
+    a_pair_hi = np.maximum(a_hi - 1, a_lo)
+    n_pairs = _range_sum(_prefix(a_ok), a_lo, a_pair_hi)
+    diff_sum = _range_sum(_prefix(np.where(a_ok, np.abs(a1 - a2), 0)), a_lo, a_pair_hi)
+    n_amps = a_hi - a_lo
+    amp_sum = _range_sum(_prefix(a), a_lo, a_hi)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shimmer = (diff_sum / n_pairs) / (amp_sum / n_amps)
+    shimmer = np.where((n_amps >= 3) & (n_pairs >= 1), shimmer, np.nan)
+
+    # --- E. ENERGY, SPEAKING RATE & FLATNESS (RMS frame ranges per window) ---
+    n_frames = 1 + window_samples // RMS_HOP_LENGTH
+    frame_lo = np.minimum(np.round(starts / RMS_HOP_LENGTH).astype(int), len(rms) - n_frames)
+    rms_windows = np.lib.stride_tricks.sliding_window_view(rms, n_frames)[frame_lo]
+    energy_mean = rms_windows.mean(axis=1)
+    energy_var = rms_windows.var(axis=1)
+    flat_windows = np.lib.stride_tricks.sliding_window_view(flatness, n_frames)[frame_lo]
+    flatness_mean = flat_windows.mean(axis=1)
+
+    speaking_rate = np.array([
+        len(librosa.util.peak_pick(w, pre_max=5, post_max=5, pre_avg=5, post_avg=5, delta=0.1, wait=10))
+        for w in rms_windows
+    ]) / window_duration
+
+    features = np.column_stack([pitch_mean, pitch_var, energy_mean, energy_var,
+                                jitter, shimmer, hnr_mean, speaking_rate])
+    return t_start, features, flatness_mean
+
+
+def window_features_file(path, sample_rate=22050, window_duration=WINDOW_DURATION, hop_duration=HOP_DURATION,
+                         block_duration=BLOCK_DURATION):
+    """
+    window_features() of a whole recording in bounded memory: the file is
+    read (memory-mapped where possible) and analyzed `block_duration`
+    seconds at a time, each block with BLOCK_CONTEXT of audio around it, and
+    keeps the windows that start inside it. Memory follows the block size,
+    not the recording length.
+
+    Window start times are exactly those of window_features(); features
+    match to within Praat's frame placement, which depends on where the
+    analyzed audio begins.
+    """
+    from audiofile import iter_blocks
+
+    sr = sample_rate
+    window_samples = int(window_duration * sr)
+    hop_samples = int(hop_duration * sr)
+    block_samples = max(int(block_duration * sr) // hop_samples, 1) * hop_samples
+    context = int(BLOCK_CONTEXT * sr)
+    # One extra frame of lead-in so the block can start on an RMS frame boundary (same frames as one big array)
+    before = context + RMS_HOP_LENGTH
+    after = window_samples - hop_samples + context
+
+    times, features, flatness = [], [], []
+    blocks = iter_blocks(path, sr, block_samples, before=before, after=after)
+    for block_start, (lo, y) in zip(range(0, 2 ** 62, block_samples), blocks):
+        skip = lo % RMS_HOP_LENGTH and RMS_HOP_LENGTH - lo % RMS_HOP_LENGTH
+        lo, y = lo + skip, y[skip:]
+        first = block_start - lo
+        _, f, flat = window_features(y, sr, window_duration, hop_duration, first_start=first)
+        keep = min(len(f), -(-block_samples // hop_samples))
+        times.append((block_start + hop_samples * np.arange(keep)) / sr)
+        features.append(f[:keep])
+        flatness.append(flat[:keep])
+    return np.concatenate(times), np.concatenate(features), np.concatenate(flatness)
+
+
+def score_timeline(model, audio, sample_rate=22050, window_duration=WINDOW_DURATION, hop_duration=HOP_DURATION):
+    """
+    Confidence (0-100) for every window of a finished answer from a single
+    predict_proba call, with the same flatness penalty as the live score.
+    Windows without valid features (e.g. silence) get NaN.
+    Returns (window end times in seconds, scores).
+    """
+    return _score(model, *window_features(audio, sample_rate, window_duration, hop_duration), window_duration)
+
+
+def score_file_timeline(model, path, sample_rate=22050, window_duration=WINDOW_DURATION, hop_duration=HOP_DURATION,
+                        block_duration=BLOCK_DURATION):
+    """
+    score_timeline() of a recording on disk, analyzed in blocks (see window_features_file).
+    """
+    return _score(model, *window_features_file(path, sample_rate, window_duration, hop_duration, block_duration),
+                  window_duration)
+
+
+def _score(model, starts, features, flatness, window_duration):
+    scores = np.full(len(features), np.nan)
+    valid = ~np.isnan(features).any(axis=1)
+    if valid.any():
+        scores[valid] = model.predict_proba(features[valid])[:, 1] * 100
+    scores = scores * np.where(flatness < FLATNESS_THRESHOLD, FLATNESS_PENALTY, 1.0)
+    return starts + window_duration, scores
+
+
+# --- BENCHMARK ---
+def benchmark(seconds=60, sample_rate=22050):
+    import os
+    import joblib
+    from features import extract_features
+    from streaming import _speech_like
+
+    model = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "confidence_rf_model.pkl"))
+    audio = _speech_like(seconds, sample_rate)
+    window_samples = WINDOW_DURATION * sample_rate
+    hop_samples = int(HOP_DURATION * sample_rate)
+    window_features(audio[:window_samples], sample_rate)  # warm-up
+
+    t = time.perf_counter()
+    per_window = []
+    for start in range(0, len(audio) - window_samples + 1, hop_samples):
+        feats = extract_features(audio_array=audio[start:start + window_samples], sample_rate=sample_rate)
+        per_window.append(model.predict_proba([feats])[0][1] * 100 if not np.isnan(feats).any() else np.nan)
+    loop_time = time.perf_counter() - t
+
+    t = time.perf_counter()
+    score_timeline(model, audio, sample_rate)
+    vector_time = time.perf_counter() - t
+
+    # Compare without the flatness penalty, which the per-window loop doesn't apply
+    _, features, _ = window_features(audio, sample_rate)
+    raw = np.full(len(features), np.nan)
+    valid = ~np.isnan(features).any(axis=1)
+    raw[valid] = model.predict_proba(features[valid])[:, 1] * 100
+    per_window = np.array(per_window)
+
+    print(f"⏱️  Per-window pipeline: {loop_time:.2f}s for {len(per_window)} windows")
+    print(f"⏱️  Vectorized timeline: {vector_time:.2f}s")
+    print(f"🚀 Speedup: {loop_time / vector_time:.1f}x")
+    both = ~np.isnan(per_window) & ~np.isnan(raw)
+    if both.any():
+        print(f"📐 Mean |score difference|: {np.mean(np.abs(per_window[both] - raw[both])):.2f} points")
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    benchmark()
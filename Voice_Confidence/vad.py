@@ -0,0 +1,301 @@
+import os
+import csv
+import time
+import argparse
+import numpy as np
+
+# --- CONFIGURATION ---
+FRAME_DURATION = 0.02           # Seconds per VAD frame
+READ_DURATION = 0.1             # Seconds of audio listen() hands over per push (end-of-turn granularity)
+SPEECH_BAND = (100, 4000)       # Hz; flatness is measured where voices have their harmonics
+ON_MARGIN_DB = 9.0              # Above the noise floor to start speech ...
+OFF_MARGIN_DB = 5.0             # ... and to stay in it (hysteresis)
+FLATNESS_MAX = 0.3              # Voiced frames are peaky; fans, hiss and crowd noise are flat (white noise ~0.56)
+ONSET_FRAMES = 3                # Consecutive speech-like frames before speech starts (ignores clicks)
+INITIAL_FLOOR_DB = -60.0
+MIN_FLOOR_DB = -70.0            # Digital silence mustn't drag the floor down to -100 dB
+FLOOR_DOWN = 0.2                # Noise-floor tracking per frame: quickly down ...
+FLOOR_UP = 0.02                 # ... slowly up outside speech (~1 s)
+FLOOR_UP_IN_SPEECH = 0.001      # ... and very slowly inside it, so rising room noise can't hold a turn open
+MIN_SPEECH = 0.3                # Seconds of speech before the turn can end at all
+LONG_ANSWER = 5.0               # Answers shorter than this wait up to SHORT_ANSWER_EXTRA longer
+SHORT_ANSWER_EXTRA = 0.5        # Share of end_silence added for a very short answer ("Um, so..." is rarely the end)
+
+# Trailing silence that ends a turn: the latency / false-cut trade-off
+MODES = {"fast": 0.6, "balanced": 1.0, "patient": 1.8}
+VAD_MODE = "balanced"
+
+# The rule listen() used before
+LEGACY_CHUNK_DURATION = 0.5
+LEGACY_SILENCE_THRESHOLD = 0.01
+LEGACY_SILENCE_DURATION = 3.0
+
+
+class VoiceActivityDetector:
+    """
+    Speech / non-speech on short frames from energy above an adaptive noise
+    floor plus spectral flatness, with an end-of-turn decision.
+
+    A frame is speech when it is ON_MARGIN_DB above the noise floor (OFF_MARGIN_DB
+    once speech has started) and its spectrum is peaky (flatness below
+    FLATNESS_MAX); speech only starts after ONSET_FRAMES such frames in a row.
+    The floor follows the quietest recent frames, so a loud but steady room
+    becomes the new silence instead of an endless answer.
+
+    The turn ends once there has been MIN_SPEECH of speech and the trailing
+    silence reaches end_silence (from `mode`), stretched for short answers.
+    """
+    def __init__(self, sample_rate=22050, mode=VAD_MODE, end_silence=None, frame_duration=FRAME_DURATION):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_duration)
+        self.frame_duration = self.frame_size / sample_rate
+        self.end_silence = end_silence if end_silence is not None else MODES[mode]
+
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_size, 1 / sample_rate)
+        self._band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.float32)
+        self.noise_floor_db = INITIAL_FLOOR_DB
+        self.is_speech = False
+        self._run = 0                   # Consecutive speech-like frames
+        self.speech_frames = 0
+        self.silent_frames = 0          # Since the last speech frame
+        self.frames = 0
+
+    @property
+    def speech_seconds(self):
+        return self.speech_frames * self.frame_duration
+
+    @property
+    def trailing_silence(self):
+        return self.silent_frames * self.frame_duration if self.speech_frames else 0.0
+
+    @property
+    def required_silence(self):
+        shortness = max(0.0, 1.0 - self.speech_seconds / LONG_ANSWER)
+        return self.end_silence * (1 + SHORT_ANSWER_EXTRA * shortness)
+
+    @property
+    def end_of_turn(self):
+        return self.speech_seconds >= MIN_SPEECH and self.trailing_silence >= self.required_silence
+
+    def frame_features(self, frames):
+        # (energy dB, in-band spectral flatness) for every row of `frames`
+        energy_db = 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1))[:, self._band] ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    def push(self, samples):
+        """
+        Feeds new audio; returns how many of its complete frames were speech.
+        Leftover samples wait for the next push.
+        """
+        return int(self.label(samples).sum())
+
+    def label(self, samples):
+        """
+        push(), but returns the speech flag of each complete frame.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        n = len(samples) // self.frame_size
+        self._pending = samples[n * self.frame_size:]
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+
+        energy_db, flatness = self.frame_features(samples[:n * self.frame_size].reshape(n, self.frame_size))
+        flags = np.zeros(n, dtype=bool)
+        # The frame features are vectorized; the state machine is a handful of float ops per frame
+        for i, (e, flat) in enumerate(zip(energy_db.tolist(), flatness.tolist())):
+            floor = self.noise_floor_db
+            margin = OFF_MARGIN_DB if self.is_speech else ON_MARGIN_DB
+            if e > floor + margin and flat < FLATNESS_MAX:
+                self._run += 1
+                if self._run >= ONSET_FRAMES:
+                    self.is_speech = True
+            else:
+                self._run = 0
+                self.is_speech = False
+
+            if e < floor:
+                floor += FLOOR_DOWN * (e - floor)
+            else:
+                floor += (FLOOR_UP_IN_SPEECH if self.is_speech else FLOOR_UP) * (e - floor)
+            self.noise_floor_db = max(floor, MIN_FLOOR_DB)
+
+            if self.is_speech:
+                self.speech_frames += 1
+                self.silent_frames = 0
+                flags[i] = True
+            else:
+                self.silent_frames += 1
+            self.frames += 1
+        return flags
+
+
+# --- EVALUATION ---
+def vad_end_of_turn(audio, sample_rate, mode=VAD_MODE, end_silence=None, read_duration=READ_DURATION):
+    """
+    When the detector ends the turn on `audio`, fed in read_duration pieces
+    like listen() does (seconds from the start), or None if it never does.
+    """
+    vad = VoiceActivityDetector(sample_rate, mode, end_silence)
+    read = int(sample_rate * read_duration)
+    for start in range(0, len(audio), read):
+        vad.push(audio[start:start + read])
+        if vad.end_of_turn:
+            return min(start + read, len(audio)) / sample_rate
+    return None
+
+
+def speech_share(audio, sample_rate, window_ends, window_duration, mode=VAD_MODE):
+    """
+    Share of VAD speech frames (0-1) in each window [end - window_duration, end)
+    of a finished recording, e.g. to drop silent windows of a confidence timeline.
+    """
+    vad = VoiceActivityDetector(sample_rate, mode)
+    flags = vad.label(audio)
+    prefix = np.concatenate(([0], np.cumsum(flags)))
+    ends = np.clip(np.round(np.asarray(window_ends) / vad.frame_duration).astype(int), 0, len(flags))
+    starts = np.clip(ends - int(round(window_duration / vad.frame_duration)), 0, None)
+    return (prefix[ends] - prefix[starts]) / np.maximum(ends - starts, 1)
+
+
+def legacy_end_of_turn(audio, sample_rate):
+    # The old rule: mean |x| of 0.5 s chunks under 0.01 is silence; 3 s of it after any speech ends the turn
+    chunk = int(sample_rate * LEGACY_CHUNK_DURATION)
+    speaking = False
+    silence = 0
+    for start in range(0, len(audio) - chunk + 1, chunk):
+        if np.mean(np.abs(audio[start:start + chunk])) < LEGACY_SILENCE_THRESHOLD:
+            if speaking:
+                silence += chunk
+                if silence / sample_rate >= LEGACY_SILENCE_DURATION:
+                    return (start + chunk) / sample_rate
+        else:
+            speaking = True
+            silence = 0
+    return None
+
+
+def read_labels(path):
+    """
+    labels.csv with columns file,speech_end (seconds where the answer's last
+    word ends). Paths are relative to the CSV.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="") as f:
+        return [(os.path.join(base, row["file"]), float(row["speech_end"])) for row in csv.DictReader(f)]
+
+
+def evaluate(labels_path, modes=tuple(MODES), sample_rate=22050):
+    """
+    End-of-turn latency (decision time - labeled speech end) and false-cut
+    rate (decision before the speech end) of the legacy rule and each VAD
+    mode over the labeled files. Files where a rule never ends the turn are
+    counted separately.
+    """
+    import librosa
+
+    clips = [(librosa.load(path, sr=sample_rate)[0], end) for path, end in read_labels(labels_path)]
+    rules = [("legacy 3 s", lambda audio: legacy_end_of_turn(audio, sample_rate))]
+    rules += [(f"vad {mode} ({MODES[mode]} s)", lambda audio, m=mode: vad_end_of_turn(audio, sample_rate, m))
+              for mode in modes]
+
+    results = {}
+    for label, rule in rules:
+        t = time.perf_counter()
+        decisions = [(rule(audio), end) for audio, end in clips]
+        elapsed = time.perf_counter() - t
+        latencies = [d - end for d, end in decisions if d is not None and d >= end]
+        cuts = sum(d is not None and d < end for d, end in decisions)
+        never = sum(d is None for d, _ in decisions)
+        lat = np.array(latencies) if latencies else np.full(1, np.nan)
+        results[label] = {"latency_p50": float(np.median(lat)), "latency_p90": float(np.percentile(lat, 90)),
+                          "false_cut_rate": cuts / len(clips), "never_ended_rate": never / len(clips)}
+        audio_seconds = sum(len(a) for a, _ in clips) / sample_rate
+        print(f"⏱️  {label:<22} end-of-turn latency p50 {results[label]['latency_p50']:.2f} s, "
+              f"p90 {results[label]['latency_p90']:.2f} s | false cuts {cuts}/{len(clips)} | "
+              f"never ended {never}/{len(clips)} | {audio_seconds / elapsed:.0f}x real time")
+    return results
+
+
+def _frame_rms(audio, sample_rate):
+    # RMS of consecutive 10 ms frames
+    frame = sample_rate // 100
+    return np.sqrt(np.mean(audio[:len(audio) // frame * frame].reshape(-1, frame) ** 2, axis=1))
+
+
+def make_synthetic_set(out_dir, n=24, sample_rate=22050, seed=0):
+    """
+    Labeled answers for when no recordings are at hand: speech-like bursts
+    with hesitation pauses, 6 s of room tone after the last word, in quiet,
+    office (hum + hiss) and noisy (hiss louder than the old 0.01 threshold)
+    rooms. Writes the WAVs and labels.csv; returns the CSV path.
+    """
+    import soundfile as sf
+    from streaming import _speech_like
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    for i in range(n):
+        room = ("quiet", "office", "noisy")[i % 3]
+        parts = [np.zeros(int(rng.uniform(0.3, 1.0) * sample_rate), np.float32)]
+        for k in range(int(rng.integers(2, 7))):
+            if k:
+                # Mostly short breaths, sometimes a longer think
+                pause = rng.uniform(0.15, 0.6) if rng.random() < 0.8 else rng.uniform(0.6, 1.2)
+                parts.append(np.zeros(int(pause * sample_rate), np.float32))
+            burst = _speech_like(rng.uniform(0.6, 3.0), sample_rate, seed=int(rng.integers(1 << 30)))
+            active = np.flatnonzero(_frame_rms(burst, sample_rate) > 0.02)
+            if len(active) == 0:
+                continue
+            # Trimmed to its first / last loud frame, so the pause above is the real gap
+            frame = sample_rate // 100
+            burst = burst[active[0] * frame:(active[-1] + 1) * frame]
+            parts.append(burst * np.float32(rng.uniform(0.4, 1.2)))
+        parts.append(np.zeros(6 * sample_rate, np.float32))
+        audio = np.concatenate(parts)
+        # Label = end of the last 10 ms frame clearly above the generator's own noise
+        speech_end = (np.flatnonzero(_frame_rms(audio, sample_rate) > 0.02)[-1] + 1) / 100
+
+        t = np.arange(len(audio)) / sample_rate
+        noise = {"quiet": 0.002, "office": 0.006, "noisy": 0.03}[room] * rng.standard_normal(len(audio))
+        if room == "office":
+            noise += 0.004 * np.sin(2 * np.pi * 50 * t)
+        audio = np.clip(audio + noise, -1, 1).astype(np.float32)
+
+        name = f"answer_{i:02d}_{room}.wav"
+        sf.write(os.path.join(out_dir, name), audio, sample_rate)
+        rows.append({"file": name, "speech_end": f"{speech_end:.3f}"})
+
+    path = os.path.join(out_dir, "labels.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["file", "speech_end"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+if __name__ == "__main__":
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Voice_Confidence  # noqa: F401
+
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="End-of-turn latency and false cuts: adaptive VAD vs. the old rule.")
+    parser.add_argument("labels", nargs="?", help="labels.csv (file,speech_end); default: a synthetic set")
+    args = parser.parse_args()
+    if args.labels:
+        evaluate(args.labels)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            evaluate(make_synthetic_set(tmp))
@@ -1,11 +1,13 @@
-import pyaudio
+import os
+import sys
+import threading
 import numpy as np
-import joblib
-import librosa
-import speech_recognition as sr
-import time
+
+# librosa, speech_recognition and the model are loaded on first use:
+# importing this module stays cheap, VoiceAnalyzer.init() does the heavy lifting.
 
 # --- CONFIGURATION ---
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "confidence_rf_model.pkl")
 SAMPLE_RATE = 22050
 CHUNK_DURATION = 0.5    
 CONFIDENCE_WINDOW = 3   
@@ -15,51 +17,275 @@ CHUNK_SIZE = int(SAMPLE_RATE * CHUNK_DURATION)
 SILENCE_THRESHOLD = 0.01
 SILENCE_DURATION_TO_STOP = 3.0 
 
+# End the turn with vad.VoiceActivityDetector (adaptive noise floor, ~1 s of
+# trailing silence) instead of the fixed threshold + 3 s rule above
+USE_ADAPTIVE_VAD = True
+VAD_MODE = "balanced"           # "fast" / "balanced" / "patient", see vad.MODES
+
+# Transcribe at VAD pauses while the candidate is still talking (needs USE_ADAPTIVE_VAD)
+STREAMING_STT = True
+STT_BACKEND = "google"          # see stt.make_backend
+
+# Analyze only each new chunk instead of re-running Praat on the whole window
+USE_STREAMING_FEATURES = True
+
+# False = no scoring while recording; the whole answer is scored afterwards
+# as a per-window timeline (see confidence_timeline)
+LIVE_CONFIDENCE = True
+TIMELINE_HOP = 0.5
+TIMELINE_MIN_SPEECH = 0.5       # Share of VAD speech a timeline window needs to count (live mode only scores speech)
+
+# Score with forest.CompiledForest: same probabilities as the sklearn model,
+# memory-mapped in milliseconds and ~30x faster per single-row call
+USE_COMPILED_FOREST = True
+
+_model_lock = threading.Lock()
+_model_loaded = False
+_model = None
+
+# Shared metrics / tracing (telemetry/instrument.py)
+import instrument   # telemetry/, on sys.path via the package __init__
+
+def load_model(path=MODEL_PATH):
+    """
+    The confidence model, loaded once per process (thread-safe). None when
+    it can't be loaded, which puts the analyzer in text-only mode.
+    """
+    global _model, _model_loaded
+    with _model_lock:
+        if not _model_loaded:
+            print("🎧 Initializing Voice & Confidence Model...")
+            try:
+                if USE_COMPILED_FOREST:
+                    from forest import load_forest
+                    _model = load_forest(path)
+                else:
+                    import joblib
+                    _model = joblib.load(path)
+                print("✅ Confidence Model Loaded.")
+            except Exception as e:
+                _model = None
+                print(f"⚠️ Model not found ({e}). Running in Text-Only mode.")
+            _model_loaded = True
+        return _model
+
+@instrument.on_terminal("voice.confidence")
+def render_score(score):
+    # The live confidence bar, drawn by the terminal sink for every "voice.confidence" event
+    label = "CONFIDENT" if score > 50 else "NERVOUS  "
+    color = "\033[92m" if score > 50 else "\033[91m"
+    bar_length = int(score / 5)
+    bar = "█" * bar_length
+    space = " " * (20 - bar_length)
+
+    print(f"\r{color}Score: {score:.1f}% | {bar}{space} | {label}\033[0m", end="")
+
 class VoiceAnalyzer:
-    def __init__(self):
-        print("🎧 Initializing Voice & Confidence Model...")
-        self.recognizer = sr.Recognizer()
-        try:
-            self.model = joblib.load("Voice_Confidence\confidence_rf_model.pkl")
-            self.has_model = True
-            print("✅ Confidence Model Loaded.")
-        except:
-            self.has_model = False
-            print("⚠️ Model not found. Running in Text-Only mode.")
+    """
+    Cheap to construct: the model and the audio libraries load on first use,
+    or up front with init() (e.g. at server start-up). Every analyzer in the
+    process shares the same model.
+    """
+    def __init__(self, stt_backend=None):
+        self._stt = stt_backend
+        self.last_timeline = None
+
+    def init(self):
+        # Load everything listen() needs now instead of on the first answer
+        load_model()
+        import librosa  # noqa: F401
+        self.stt  # noqa: B018
+        if USE_STREAMING_FEATURES:
+            import streaming  # noqa: F401
+        return self
+
+    @property
+    def model(self):
+        return load_model()
+
+    @property
+    def has_model(self):
+        return self.model is not None
+
+    @property
+    def stt(self):
+        if self._stt is None:
+            from stt import make_backend
+            self._stt = make_backend(STT_BACKEND)
+        return self._stt
 
     def get_linguistic_penalty(self, audio_chunk):
+        """
+        0.5 for flat, noise-like audio, else 1.0. audio_chunk can also be the
+        analysis.WindowAnalysis of the window, whose spectrogram is then reused.
+        """
+        from analysis import WindowAnalysis
         try:
-            flatness = librosa.feature.spectral_flatness(y=audio_chunk)
-            avg_flatness = np.mean(flatness)
+            if not isinstance(audio_chunk, WindowAnalysis):
+                audio_chunk = WindowAnalysis(audio_chunk, SAMPLE_RATE)
+            avg_flatness = np.mean(audio_chunk.flatness)
             if avg_flatness < 0.01:
                 return 0.5
         except:
             pass
         return 1.0
 
-    def listen(self):
-        p = pyaudio.PyAudio()
-        stream = p.open(format=pyaudio.paFloat32,
-                        channels=1,
-                        rate=SAMPLE_RATE,
-                        input=True,
-                        frames_per_buffer=CHUNK_SIZE)
+    def confidence_timeline(self, audio_np, hop_duration=TIMELINE_HOP):
+        """
+        Scores every overlapping CONFIDENCE_WINDOW of a finished recording with one
+        predict_proba call. Returns (window end times in seconds, scores 0-100).
+        """
+        from timeline import score_timeline
+        return score_timeline(self.model, audio_np, SAMPLE_RATE, CONFIDENCE_WINDOW, hop_duration)
+
+    def live_scorer(self):
+        """
+        Builds score(new_audio, rolling_buffer, reset) -> confidence 0-100 (None
+        while the features aren't valid yet) for one stream of speech.
+        """
+        model = self.model
+        extractor = None
+        if USE_STREAMING_FEATURES:
+            from streaming import StreamingFeatureExtractor
+            extractor = StreamingFeatureExtractor(SAMPLE_RATE, CONFIDENCE_WINDOW)
+        else:
+            # Extract features strictly from your local `features.py` (ensure it's present)
+            from features import analyze, extract_features
+
+        def score(new_audio, rolling_buffer, reset):
+            window = rolling_buffer
+            if extractor is not None:
+                if reset:
+                    extractor.reset()
+                # Same features, but only the new audio is analyzed
+                with instrument.span("voice.streaming_features"):
+                    feats = extractor.push(new_audio)
+            else:
+                # One analysis of the window for the features and the penalty
+                window = analyze(audio_array=rolling_buffer, sample_rate=SAMPLE_RATE)
+                feats = extract_features(analysis=window)
+
+            if np.isnan(feats).any():
+                instrument.counter("voice_windows_total", "Confidence windows analyzed").inc(result="invalid")
+                return None
+            with instrument.span("voice.predict_proba"):
+                raw_score = model.predict_proba([feats])[0][1] * 100
+            instrument.counter("voice_windows_total", "Confidence windows analyzed").inc(result="scored")
+            penalty = self.get_linguistic_penalty(window)
+            return raw_score * penalty
 
-        rolling_buffer = np.zeros(SAMPLE_RATE * CONFIDENCE_WINDOW, dtype=np.float32)
-        full_audio_frames = []
+        return score
+
+    def _live_analyzer(self, confidence_scores, session_log=None):
+        """
+        Builds the analysis callback run by the pipeline's worker thread.
+        """
+        score = self.live_scorer()
+
+        def analyze(new_audio, rolling_buffer, reset):
+            final_score = score(new_audio, rolling_buffer, reset)
+            if final_score is not None:
+                confidence_scores.append(final_score)
+                if session_log is not None:
+                    session_log.append(confidence=final_score, speaking=True)
+                instrument.gauge("voice_confidence", "Latest live confidence score (0-100)").set(final_score)
+                instrument.emit("voice.confidence", score=final_score)
+
+        return analyze
+
+    def listen(self, source=None, session_log=None):
+        """
+        Records one answer and returns its transcript.
+        `source` defaults to the microphone; pass a pipeline.FakeAudioSource to run without one.
+        Pass session_log (a telemetry/sessionlog.SessionLog) to keep every
+        confidence score of the answer, not just its average.
+        """
+        from stt import STTError
+        from pipeline import AudioRing, AnalysisWorker, PipelineStats, MicrophoneSource, CAPTURE_BUFFER_DURATION
+        from audiobuffer import RecordingStore
+
+        # With the VAD, audio is read in short pieces so the turn can end between chunks
+        vad = None
+        read_size = CHUNK_SIZE
+        if USE_ADAPTIVE_VAD:
+            from vad import VoiceActivityDetector, READ_DURATION
+            vad = VoiceActivityDetector(SAMPLE_RATE, VAD_MODE)
+            read_size = int(SAMPLE_RATE * READ_DURATION)
+        speech_pending = []
+
+        transcriber = None
+        if vad is not None and STREAMING_STT:
+            from stt import StreamingTranscriber
+            transcriber = StreamingTranscriber(self.stt, SAMPLE_RATE)
+
+        if source is None:
+            source = MicrophoneSource(SAMPLE_RATE, read_size)
+
+        # Capture thread -> capture ring -> this loop (silence logic) -> speech ring -> analysis worker
+        capture_ring = AudioRing(SAMPLE_RATE * CAPTURE_BUFFER_DURATION)
+        speech_ring = AudioRing(SAMPLE_RATE * CONFIDENCE_WINDOW * 2)
+        self.stats = PipelineStats()
+
+        recording = RecordingStore(SAMPLE_RATE)
         confidence_scores = [] # To calculate average later
+        self.last_timeline = None
+
+        worker = None
+        if self.has_model and LIVE_CONFIDENCE:
+            worker = AnalysisWorker(speech_ring, self._live_analyzer(confidence_scores, session_log),
+                                    SAMPLE_RATE * CONFIDENCE_WINDOW, CHUNK_SIZE, self.stats)
+            worker.start()
 
         print(f"\n🎤 LISTENING... (Speak now)")
         
-        silence_start = None
+        silence_samples = 0
         is_speaking = False
+        read_pos = 0
 
+        source.start(capture_ring)
         try:
             while True:
-                # 1. Read Audio
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                new_audio = np.frombuffer(data, dtype=np.float32)
-                full_audio_frames.append(data)
+                # 1. Read Audio (wait until a full chunk has been captured)
+                capture_ring.data_ready.clear()
+                if capture_ring.write_pos - read_pos < read_size:
+                    if source.finished:
+                        break
+                    capture_ring.data_ready.wait(timeout=0.1)
+                    continue
+
+                new_audio, lost = capture_ring.read(read_pos, read_pos + read_size)
+                self.stats.dropped_samples += lost
+                read_pos += lost + len(new_audio)
+                # Carried into the speech ring, so the worker's latency counts from the microphone
+                capture_time = capture_ring.capture_time(read_pos)
+                if len(new_audio) == 0:
+                    continue
+                self.stats.chunks_captured += 1
+                recording.append(new_audio)
+
+                if vad is not None:
+                    # --- ADAPTIVE VAD ---
+                    speech_frames = vad.push(new_audio)
+                    if transcriber is not None:
+                        transcriber.add(new_audio, speech_frames, vad.trailing_silence)
+                    if speech_frames:
+                        is_speaking = True
+                        # Speech still reaches the worker in CHUNK_SIZE pieces
+                        speech_pending.append(new_audio)
+                        if sum(len(a) for a in speech_pending) >= CHUNK_SIZE:
+                            speech_ring.write(np.concatenate(speech_pending), capture_time)
+                            speech_pending = []
+
+                    if vad.end_of_turn:
+                        print("\n🛑 End of answer detected. Processing...")
+                        break
+                    if not is_speaking:
+                        print(f"\rWaiting for speech...", end="")
+                    elif vad.trailing_silence >= CHUNK_DURATION:
+                        # Not on every gap between syllables, only once it looks like a pause
+                        remaining = vad.required_silence - vad.trailing_silence
+                        print(f"\r⏳ Waiting for silence... ({remaining:.1f}s)   ", end="")
+                    continue
                 
                 # 2. Check Volume
                 volume = np.mean(np.abs(new_audio))
@@ -67,13 +293,10 @@ class VoiceAnalyzer:
                 if volume < SILENCE_THRESHOLD:
                     # --- SILENCE LOGIC ---
                     if is_speaking:
-                        # Only start counting silence if we have previously spoken
-                        if silence_start is None:
-                            silence_start = time.time()
-                        
-                        # Check if 3 seconds have passed
-                        elapsed = time.time() - silence_start
-                        remaining = SILENCE_DURATION_TO_STOP - elapsed
+                        # Only start counting silence if we have previously spoken.
+                        # Counted in audio time, so it also holds when analysis lags behind.
+                        silence_samples += len(new_audio)
+                        remaining = SILENCE_DURATION_TO_STOP - silence_samples / SAMPLE_RATE
                         
                         if remaining <= 0:
                             print("\n🛑 Silence limit reached. Processing...")
@@ -84,67 +307,77 @@ class VoiceAnalyzer:
                         print(f"\r⏳ Waiting for silence... ({remaining:.1f}s)   ", end="")
                     else:
                         print(f"\rWaiting for speech...", end="")
-                    
-                    continue # Skip the confidence update below
 
                 else:
                     # --- SPEAKING LOGIC ---
                     is_speaking = True
-                    silence_start = None # Reset timer
-                    
-                    # Update Rolling Buffer
-                    rolling_buffer = np.roll(rolling_buffer, -len(new_audio))
-                    rolling_buffer[-len(new_audio):] = new_audio
-
-                    # 3. CONFIDENCE VISUALIZATION (Only runs when speaking)
-                    if self.has_model:
-                        # Extract features strictly from your local `features.py` (ensure it's present)
-                        from features import extract_features 
-                        feats = extract_features(audio_array=rolling_buffer, sample_rate=SAMPLE_RATE)
-                        
-                        if not np.isnan(feats).any():
-                            raw_score = self.model.predict_proba([feats])[0][1] * 100
-                            penalty = self.get_linguistic_penalty(rolling_buffer)
-                            final_score = raw_score * penalty
-                            
-                            confidence_scores.append(final_score)
-
-                            # Visualization
-                            label = "CONFIDENT" if final_score > 50 else "NERVOUS  "
-                            color = "\033[92m" if final_score > 50 else "\033[91m"
-                            bar_length = int(final_score / 5)
-                            bar = "█" * bar_length
-                            space = " " * (20 - bar_length)
-                            
-                            print(f"\r{color}Score: {final_score:.1f}% | {bar}{space} | {label}\033[0m", end="")
+                    silence_samples = 0 # Reset timer
+
+                    # 3. CONFIDENCE (scored on the worker thread, only from speech)
+                    speech_ring.write(new_audio, capture_time)
 
         except KeyboardInterrupt:
             print("\nStopped.")
         
         finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            source.stop()
+            if speech_pending:
+                # The end of the answer, shorter than a chunk: still scored (the transcriber has it already)
+                speech_ring.write(np.concatenate(speech_pending), capture_time)
+                speech_pending = []
+            if worker is not None:
+                worker.stop()
+
+        audio_np = recording.view()
+
+        # --- POST-HOC TIMELINE (when live scoring is off) ---
+        if self.has_model and not LIVE_CONFIDENCE and is_speaking:
+            from vad import speech_share
+            times, scores = self.confidence_timeline(audio_np)
+            # The recording also holds the pauses and the silence that ended the turn
+            speech = speech_share(audio_np, SAMPLE_RATE, times, CONFIDENCE_WINDOW, VAD_MODE)
+            scores = np.where(speech >= TIMELINE_MIN_SPEECH, scores, np.nan)
+            self.last_timeline = (times, scores)
+            confidence_scores = [s for s in scores if not np.isnan(s)]
+            if session_log is not None:
+                # Window end times are relative to the recording, which ended just now
+                start = session_log.now() - len(audio_np) / SAMPLE_RATE
+                for t, s in zip(times, scores):
+                    if not np.isnan(s):
+                        session_log.append(start + t, confidence=s, speaking=True)
 
         # --- FINAL SUMMARY ---
         if confidence_scores:
             avg_conf = sum(confidence_scores) / len(confidence_scores)
             print(f"\n📊 Average Confidence for this answer: {avg_conf:.1f}%")
+        stats = self.stats.summary()
+        for name in ("chunks_captured", "dropped_samples", "windows_coalesced", "windows_skipped"):
+            instrument.counter(f"voice_{name}_total", "Audio pipeline counters, summed over answers").inc(stats[name])
+        if stats["dropped_samples"] or stats["windows_coalesced"] or stats["windows_skipped"]:
+            print(f"⚠️ Analysis fell behind: {stats['windows_coalesced']} chunks coalesced, "
+                  f"{stats['windows_skipped']} windows skipped, {stats['dropped_samples']} samples dropped.")
 
         # --- CONVERT TO TEXT ---
-        print("📝 Converting speech to text...")
-        raw_data = b''.join(full_audio_frames)
-        audio_np = np.frombuffer(raw_data, dtype=np.float32)
-        audio_int16 = (audio_np * 32767).astype(np.int16)
-        audio_data = sr.AudioData(audio_int16.tobytes(), SAMPLE_RATE, 2)
+        if transcriber is not None:
+            # Earlier segments were transcribed while the candidate was still talking
+            print(f"📝 Finishing transcript ({transcriber.segments} segments sent so far)...")
+            recording.close()
+            text = transcriber.finish()
+            if not text and transcriber.failed:
+                print("❌ Internet error for STT.")
+                return ""
+        else:
+            print("📝 Converting speech to text...")
+            pcm = recording.to_pcm16()
+            recording.close()
+            try:
+                text = self.stt.transcribe(pcm, SAMPLE_RATE)
+            except STTError:
+                print("❌ Internet error for STT.")
+                return ""
 
-        try:
-            text = self.recognizer.recognize_google(audio_data)
-            print(f"🗣️  YOU SAID: \"{text}\"")
-            return text
-        except sr.UnknownValueError:
+        if not text:
             print("❌ Could not understand audio.")
             return ""
-        except sr.RequestError:
-            print("❌ Internet error for STT.")
-            return ""
\ No newline at end of file
+        print(f"🗣️  YOU SAID: \"{text}\"")
+        return text
\ No newline at end of file
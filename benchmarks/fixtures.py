@@ -0,0 +1,253 @@
+import os
+import sys
+import random
+import numpy as np
+
+# --- CONFIGURATION ---
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 22050             # Same rate as voice.SAMPLE_RATE
+AUDIO_KINDS = ("tone", "noise", "speech")
+VIDEO_SIZE = (640, 480)
+VIDEO_FPS = 30
+PDF_LINES_PER_PAGE = 45
+
+for _folder in ("Voice_Confidence", "realProj", "Brain", "telemetry"):
+    _path = os.path.join(REPO_DIR, _folder)
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+# Words the resume pages are written from (skills first, so the topic prompt sees some)
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "React", "TypeScript", "PostgreSQL", "AWS", "Pandas",
+          "FastAPI", "Redis", "Terraform", "Go", "Spark", "Airflow", "GraphQL"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Shipped"]
+THINGS = ["a billing service", "the data pipeline", "an internal dashboard", "CI for 40 repositories",
+          "the search backend", "a recommendation model", "the mobile API", "nightly ETL jobs"]
+RESULTS = ["cutting latency by 35%", "for 2M monthly users", "saving $120k a year", "with zero downtime",
+           "across three teams", "ahead of schedule", "reducing on-call pages by half"]
+
+
+# --- AUDIO ---
+def audio(kind="speech", seconds=3.0, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Float32 mono audio at `sample_rate`, the same for the same arguments:
+
+    - "tone": a steady 220 Hz voice-like harmonic stack (pitch is found, no pauses)
+    - "noise": white noise at room-mic level (no pitch at all)
+    - "speech": streaming._speech_like, drifting pitch with syllables and pauses
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    if kind == "tone":
+        y = sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 5)) * 0.2
+        y += 0.002 * rng.standard_normal(n)
+    elif kind == "noise":
+        y = 0.05 * rng.standard_normal(n)
+    elif kind == "speech":
+        from streaming import _speech_like
+        return _speech_like(seconds, sample_rate, seed=seed)
+    else:
+        raise ValueError(f"Unknown audio kind {kind!r}, expected one of {AUDIO_KINDS}")
+    return y.astype(np.float32)
+
+
+# --- VIDEO ---
+def pose_track(frames, fps=VIDEO_FPS, seed=0):
+    """
+    Normalized (x, y) per frame for the landmarks metrics_from_pose reads:
+    a head swaying with a slow random drift and a few glances away, and
+    hands gesturing in front of the chest. Returns {PoseLandmark: (frames, 2)}.
+    """
+    from landmarks import PoseLandmark
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / fps
+    drift = np.cumsum(rng.normal(0, 0.0008, (frames, 2)), axis=0)
+    head = np.column_stack([0.5 + 0.02 * np.sin(2 * np.pi * 0.3 * t), 0.3 + 0.01 * np.sin(2 * np.pi * 0.5 * t)]) + drift
+    # Nose offset from the ear midpoint: small while facing the camera, large during a glance
+    glance = (np.sin(2 * np.pi * 0.12 * t + 1.0) > 0.85) * 0.05
+    yaw = 0.015 * np.sin(2 * np.pi * 0.2 * t) + glance
+    gesture = np.column_stack([np.sin(2 * np.pi * 0.8 * t), np.sin(2 * np.pi * 1.1 * t + 0.5)])
+    # Shoulders follow the head a little
+    chest = np.column_stack([0.35 + 0.3 * head[:, 0], head[:, 1] + 0.22])
+
+    track = {
+        PoseLandmark.LEFT_EAR: head + (-0.06, 0),
+        PoseLandmark.RIGHT_EAR: head + (0.06, 0),
+        PoseLandmark.NOSE: head + np.column_stack([yaw, np.full(frames, 0.02)]),
+        PoseLandmark.LEFT_SHOULDER: chest + (-0.15, 0),
+        PoseLandmark.RIGHT_SHOULDER: chest + (0.15, 0),
+    }
+    for side, sign in ((PoseLandmark.LEFT_WRIST, -1), (PoseLandmark.RIGHT_WRIST, 1)):
+        jitter = rng.normal(0, 0.003, (frames, 2))
+        track[side] = (0.5 + sign * 0.12, 0.75) + 0.05 * gesture * (sign, 1) + jitter
+    return track
+
+
+class _Point:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def track_samples(track):
+    """
+    The (wrist_x, wrist_y, nose_x, nose_y, attention) row of every frame,
+    through the same metrics_from_pose the landmark backends use (the
+    layout video_batch.py stores per frame).
+    """
+    from landmarks import metrics_from_pose
+
+    frames = len(next(iter(track.values())))
+    rows = np.zeros((frames, 5))
+    for i in range(frames):
+        m = metrics_from_pose({name: _Point(*xy[i]) for name, xy in track.items()})
+        rows[i] = (*m["wrist"], *m["stability"], m["attention"])
+    return rows
+
+
+def render_video(path, frames=300, fps=VIDEO_FPS, size=VIDEO_SIZE, seed=0):
+    """
+    Writes a clip of a flat-shaded figure following pose_track (head, ears,
+    nose, shoulders, arms and hands on a lit backdrop) and returns the
+    ground-truth samples from track_samples.
+    """
+    import cv2
+    from landmarks import PoseLandmark as L
+
+    track = pose_track(frames, fps, seed)
+    w, h = size
+    backdrop = np.zeros((h, w, 3), np.uint8)
+    backdrop[:] = np.linspace(170, 110, h, dtype=np.uint8)[:, None, None]
+    skin, shirt = (150, 180, 225), (120, 80, 40)
+
+    def px(p):
+        return int(p[0] * w), int(p[1] * h)
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(frames):
+        frame = backdrop.copy()
+        pt = {name: px(xy[i]) for name, xy in track.items()}
+        ls, rs = pt[L.LEFT_SHOULDER], pt[L.RIGHT_SHOULDER]
+        torso = np.array([ls, rs, (rs[0] + 20, h), (ls[0] - 20, h)], np.int32)
+        cv2.fillConvexPoly(frame, torso, shirt)
+        for shoulder, wrist in ((ls, pt[L.LEFT_WRIST]), (rs, pt[L.RIGHT_WRIST])):
+            elbow = ((shoulder[0] + wrist[0]) // 2 + (shoulder[0] - w // 2) // 3, (shoulder[1] + wrist[1]) // 2 + 30)
+            cv2.line(frame, shoulder, elbow, shirt, 22)
+            cv2.line(frame, elbow, wrist, skin, 16)
+            cv2.circle(frame, wrist, 14, skin, -1)
+        le, re = pt[L.LEFT_EAR], pt[L.RIGHT_EAR]
+        centre = ((le[0] + re[0]) // 2, (le[1] + re[1]) // 2)
+        cv2.ellipse(frame, centre, (int(0.075 * w), int(0.13 * h)), 0, 0, 360, skin, -1)
+        for ear in (le, re):
+            cv2.circle(frame, ear, 9, (130, 160, 205), -1)
+        cv2.circle(frame, pt[L.NOSE], 7, (110, 130, 190), -1)
+        for dx in (-0.025, 0.025):
+            eye = (pt[L.NOSE][0] + int(dx * w), pt[L.NOSE][1] - int(0.04 * h))
+            cv2.circle(frame, eye, 5, (40, 30, 30), -1)
+        writer.write(frame)
+    writer.release()
+    return track_samples(track)
+
+
+def read_frames(path):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+# --- PDF ---
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def resume_lines(pages, lines_per_page=PDF_LINES_PER_PAGE, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for p in range(pages):
+        lines = [f"Alex Taylor - Software Engineer (page {p + 1})", "Skills: " + ", ".join(rng.sample(SKILLS, 6))]
+        while len(lines) < lines_per_page:
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(THINGS)} in {rng.choice(SKILLS)}, {rng.choice(RESULTS)}.")
+        out.append(lines)
+    return out
+
+
+def write_pdf(path, pages=4, lines_per_page=PDF_LINES_PER_PAGE, seed=0):
+    """
+    A plain-text resume PDF (Helvetica, one text stream per page) written
+    by hand, so no PDF library is needed to make one. Returns the page lines.
+    """
+    content = resume_lines(pages, lines_per_page, seed)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    bodies = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+              3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    for i, lines in enumerate(content):
+        page_id, stream_id = 4 + 2 * i, 5 + 2 * i
+        text = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        stream = text.encode("latin-1")
+        bodies[stream_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        bodies[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {stream_id} 0 R >>").encode()
+        page_ids.append(page_id)
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    bodies[2] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for obj in range(1, len(bodies) + 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj, bodies[obj])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(bodies) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(bodies) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return content
+
+
+# --- BENCHMARK ---
+def benchmark():
+    """
+    Writes one of each fixture to a temporary folder and checks them
+    against what the repo reads back: extract_features on each audio kind,
+    frame count of the clip, and PyPDF2's text vs. the lines written.
+    """
+    import time
+    import tempfile
+    from features import extract_features
+    from resume import extract_pdf_text
+
+    for kind in AUDIO_KINDS:
+        y = audio(kind)
+        same = np.array_equal(y, audio(kind))
+        features = extract_features(audio_array=y, sample_rate=SAMPLE_RATE)
+        print(f"📏 audio {kind:<6} {len(y) / SAMPLE_RATE:.1f} s, deterministic {same}, "
+              f"pitch {features[0]:.0f} Hz, energy {features[2]:.3f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        samples = render_video(os.path.join(tmp, "clip.mp4"), frames=150)
+        elapsed = time.perf_counter() - t
+        frames = read_frames(os.path.join(tmp, "clip.mp4"))
+        print(f"📏 video {len(frames)} frames {frames[0].shape[1]}x{frames[0].shape[0]} in {elapsed:.2f} s, "
+              f"attention {samples[:, 4].min():.2f}-{samples[:, 4].max():.2f}")
+
+        lines = write_pdf(os.path.join(tmp, "resume.pdf"), pages=3)
+        text = extract_pdf_text(os.path.join(tmp, "resume.pdf"))
+        found = sum(line in text for page in lines for line in page)
+        print(f"📏 pdf   3 pages, {found}/{sum(map(len, lines))} lines extracted verbatim")
+
+
+if __name__ == "__main__":
+    benchmark()
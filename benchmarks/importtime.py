@@ -0,0 +1,77 @@
+import os
+import re
+import sys
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+# --- CONFIGURATION ---
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_MODULES = [("Brain", "Brain"), ("Voice_Confidence", "voice"), ("realProj", "file")]
+RUNS = 5
+# Brain used to exit() at import without keys; fake ones keep both trees comparable
+ENV = {"GEMINI_KEY_TOPICS": "x", "GEMINI_KEY_ASKER": "x", "GEMINI_KEY_GRADER": "x", "WEBHOOK_URL": ""}
+
+
+def import_time(tree, folder, module):
+    """
+    Median cumulative import time (ms) of `module` in a fresh interpreter, as
+    reported by `python -X importtime`, run from the module's folder like the
+    scripts are. Returns (ms, error line or None).
+    """
+    env = dict(os.environ, **ENV)
+    samples = []
+    error = None
+    for _ in range(RUNS):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=os.path.join(tree, folder), env=env, capture_output=True, text=True)
+        cumulative = None
+        for line in proc.stderr.splitlines():
+            match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", line)
+            if match and match.group(2) == module:
+                cumulative = int(match.group(1)) / 1000
+        if cumulative is None:
+            # Failed or exited before finishing: count everything that did get imported
+            cumulative = sum(int(m.group(1)) / 1000 for m in
+                             (re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", l) for l in proc.stderr.splitlines())
+                             if m)
+            tail = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+            error = tail[-1] if tail else f"exit code {proc.returncode}"
+        samples.append(cumulative)
+    return statistics.median(samples), error
+
+
+def export_tree(ref, dest):
+    archive = subprocess.run(["git", "-C", REPO_DIR, "archive", ref], capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", dest], input=archive.stdout, check=True)
+
+
+def benchmark(baseline=None):
+    trees = [("current", REPO_DIR)]
+    tmp = None
+    if baseline:
+        tmp = tempfile.TemporaryDirectory()
+        export_tree(baseline, tmp.name)
+        trees.insert(0, (baseline, tmp.name))
+
+    results = {}
+    for label, tree in trees:
+        for folder, module in ENTRY_MODULES:
+            ms, error = import_time(tree, folder, module)
+            results[(label, module)] = ms
+            note = f"  (stopped: {error})" if error else ""
+            print(f"⏱️  {label:>10} import {module:<6} {ms:8.1f} ms{note}")
+
+    if baseline:
+        for _, module in ENTRY_MODULES:
+            before, after = results[(baseline, module)], results[("current", module)]
+            print(f"📉 {module:<6} {before:8.1f} -> {after:7.1f} ms ({before / after:.1f}x)")
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold import time of the three entry modules.")
+    parser.add_argument("--baseline", help="git ref to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+    benchmark(args.baseline)
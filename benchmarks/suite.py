@@ -0,0 +1,339 @@
+import os
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+import numpy as np
+
+import fixtures
+
+# --- CONFIGURATION ---
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+REGRESSION_THRESHOLD = 0.20     # Flag a p50 latency or peak memory this much above the baseline ...
+NOISE_FLOOR_MS = 0.05           # ... by more than this much (timer noise on µs-scale cases)
+NOISE_FLOOR_MB = 0.5
+VIDEO_FRAMES = 300              # 10 s @ 30fps
+PDF_PAGES = (2, 40)             # Below and above resume.PARALLEL_MIN_PAGES
+LLM_LATENCY = 0.05              # Seconds per fake Gemini call
+ANSWER = "I would use a dictionary."
+
+
+class Bench:
+    """
+    Runs and records the cases. run() times `repeat` calls of fn (after
+    `warmup` untimed ones; `setup` runs untimed before each call) and then
+    makes one more call under tracemalloc for the peak memory it allocates,
+    so tracing never slows down the timed calls.
+    """
+    def __init__(self):
+        self.results = {}
+
+    def run(self, name, fn, repeat=20, warmup=1, items=1, unit="calls", setup=None):
+        for _ in range(warmup):
+            if setup:
+                setup()
+            fn()
+        gc.collect()
+        timings = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            t = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - t)
+
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        ms = np.array(timings) * 1000
+        result = {
+            "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)), "mean_ms": float(ms.mean()), "n": repeat,
+            "throughput": items * repeat / (ms.sum() / 1000), "unit": unit + "/sec",
+            "peak_mb": peak / 1e6,
+        }
+        self.results[name] = result
+        print(f"⏱️  {name:<42} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+              f"p99 {result['p99_ms']:9.3f} ms | {result['throughput']:10.1f} {result['unit']:<14} "
+              f"| peak {result['peak_mb']:7.2f} MB")
+        return result
+
+    def skip(self, name, reason):
+        self.results[name] = {"skipped": reason}
+        print(f"⚠️  {name:<42} skipped: {reason}")
+
+
+# --- CASES ---
+# Each takes (bench, tmp folder) and registers one or more named results.
+def audio_cases(bench, tmp):
+    import voice
+    from features import extract_features
+
+    windows = {kind: fixtures.audio(kind, voice.CONFIDENCE_WINDOW) for kind in fixtures.AUDIO_KINDS}
+    for kind, y in windows.items():
+        bench.run(f"extract_features[{kind} {voice.CONFIDENCE_WINDOW}s]",
+                  lambda y=y: extract_features(audio_array=y, sample_rate=voice.SAMPLE_RATE),
+                  repeat=15, items=len(y) / voice.SAMPLE_RATE, unit="audio s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = voice.load_model()
+    if model is None:
+        bench.skip("predict_proba", "confidence model could not be loaded")
+        return
+    # Real feature rows, spread out a little so the batch takes many paths through the trees
+    rows = np.array([extract_features(audio_array=y, sample_rate=voice.SAMPLE_RATE) for y in windows.values()])
+    rng = np.random.default_rng(0)
+    batch = np.repeat(rows, 86, axis=0)[:256] * rng.uniform(0.8, 1.2, (256, rows.shape[1]))
+    kind = type(model).__name__
+    bench.run(f"predict_proba[{kind}, 1 row]", lambda: model.predict_proba(batch[:1]), repeat=300, items=1,
+              unit="rows")
+    bench.run(f"predict_proba[{kind}, 256 rows]", lambda: model.predict_proba(batch), repeat=50, items=256,
+              unit="rows")
+
+
+def video_cases(bench, tmp):
+    from motion import MotionWindow, BUFFER_SIZE, batch_scores, window_features
+    from landmarks import BACKENDS
+
+    path = os.path.join(tmp, "clip.mp4")
+    samples = fixtures.render_video(path, frames=VIDEO_FRAMES)
+    frames = fixtures.read_frames(path)
+
+    from file import BodyLanguageProcessor
+    for backend in BACKENDS:
+        try:
+            processor = BodyLanguageProcessor(backend)
+            processor.process(frames[0])
+        except Exception as e:
+            bench.skip(f"BodyLanguageProcessor.process[{backend}]", f"{type(e).__name__}: {e}")
+            continue
+        it = iter(range(10 ** 9))
+        bench.run(f"BodyLanguageProcessor.process[{backend}]",
+                  lambda: processor.process(frames[next(it) % len(frames)]),
+                  repeat=min(len(frames), 120), warmup=5, unit="frames")
+
+    # Window math on the clip's true landmarks: main()'s per-frame path, the
+    # old recompute-everything path it replaced, and the batch scorer's one pass
+    window = MotionWindow(update_every=1)
+    wrist, stab, attn = samples[:, 0:2], samples[:, 2:4], samples[:, 4]
+
+    def feed():
+        window.clear()
+        for i in range(len(samples)):
+            if window.append(wrist[i], stab[i], attn[i]):
+                window.scores()
+
+    bench.run("MotionWindow.append+scores[per frame]", feed, repeat=10, items=len(samples), unit="frames")
+    last = slice(len(samples) - BUFFER_SIZE, len(samples))
+    bench.run(f"batch_scores[{BUFFER_SIZE}-frame window]",
+              lambda: batch_scores(wrist[last].tolist(), stab[last].tolist(), attn[last].tolist()),
+              repeat=200, unit="windows")
+    bench.run(f"window_features[{len(samples)} frames, hop 1]",
+              lambda: window_features(wrist, stab, attn, hop=1), repeat=50, items=len(samples), unit="frames")
+
+
+def resume_cases(bench, tmp):
+    from Brain import extract_text_from_pdf
+
+    for pages in PDF_PAGES:
+        path = os.path.join(tmp, f"resume_{pages}.pdf")
+        fixtures.write_pdf(path, pages=pages)
+        bench.run(f"extract_text_from_pdf[{pages} pages]", lambda path=path: extract_text_from_pdf(path),
+                  repeat=5 if pages > 10 else 20, items=pages, unit="pages")
+
+
+def interview_cases(bench, tmp):
+    from fake_llm import FakeModelServer
+
+    with FakeModelServer(latency=LLM_LATENCY, grade=0.6) as server:
+        for name in ("GEMINI_KEY_TOPICS", "GEMINI_KEY_ASKER", "GEMINI_KEY_GRADER"):
+            os.environ.setdefault(name, "fake-" + name.lower())
+        os.environ["GEMINI_BASE_URL"] = server.url
+        os.environ["WEBHOOK_URL"] = ""
+        import Brain
+        from llm import LLMClient
+        Brain.USE_RESPONSE_CACHE = False    # Every turn goes to the (fake) model
+
+        for label, llm in (("blocking", None),
+                           ("async + prefetch", LLMClient(Brain.role_keys(), base_url=server.url,
+                                                          requests_per_minute=60000))):
+            state = {"bot": None}
+
+            def next_interview():
+                # Untimed: start a new interview once the last one has run out of topics
+                bot = state["bot"]
+                if bot is None or bot.current_topic_index >= len(bot.topics):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        bot = state["bot"] = Brain.AdaptiveInterviewer("Python Skills", "File clerk", llm=llm)
+                        bot.generate_question()
+
+            def turn():
+                # Answer -> grade -> next question, what the candidate waits for
+                bot = state["bot"]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    bot.evaluate_answer(ANSWER)
+                    if bot.current_topic_index < len(bot.topics):
+                        bot.generate_question()
+
+            bench.run(f"AdaptiveInterviewer turn[{label}]", turn, repeat=30, warmup=2, unit="turns",
+                      setup=next_interview)
+            if llm is not None:
+                llm.close()
+
+
+def telemetry_cases(bench, tmp):
+    from instrument import Registry
+
+    calls = 1000
+    for enabled in (False, True):
+        registry = Registry(enabled=enabled)
+        counter = registry.counter("bench_calls_total")
+        state = "enabled" if enabled else "disabled"
+
+        def spans():
+            for _ in range(calls):
+                with registry.span("bench.call", stage="x"):
+                    pass
+
+        def increments():
+            for _ in range(calls):
+                counter.inc(stage="x")
+
+        bench.run(f"instrument span[{state}, {calls}]", spans, repeat=30, items=calls, unit="spans")
+        bench.run(f"instrument counter.inc[{state}, {calls}]", increments, repeat=30, items=calls, unit="calls")
+
+    from sessionlog import SessionLog, _synthetic
+
+    log = SessionLog(os.path.join(tmp, "session.bwsl"))
+    bench.run(f"SessionLog.append[file, {calls}]", lambda: [log.append(i * 0.5, 70.0, 80.0, 75.0, 60.0, True)
+                                                           for i in range(calls)],
+              repeat=30, items=calls, unit="records")
+    log.close()
+    session = SessionLog()
+    _synthetic(session, 30)
+    bench.run("SessionLog.summary[30 min]", lambda: session.summary("bench"), repeat=30)
+
+
+CASES = {"audio": audio_cases, "video": video_cases, "resume": resume_cases, "interview": interview_cases,
+         "telemetry": telemetry_cases}
+
+
+# --- RESULTS ---
+def environment():
+    try:
+        commit = subprocess.run(["git", "-C", BENCH_DIR, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "machine": platform.machine(), "system": platform.system(),
+            "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Prints each case against the baseline run and returns the names that
+    regressed: p50 latency or peak memory more than `threshold` above the
+    baseline (and past the noise floors). Baselines are per machine.
+    """
+    regressions = []
+    print(f"\n📊 vs. baseline {baseline['environment'].get('commit') or '?'} "
+          f"({baseline['environment'].get('time', '?')})")
+    for name, now in results.items():
+        before = baseline["results"].get(name)
+        if "skipped" in now or not before or "skipped" in before:
+            continue
+        d_ms = now["p50_ms"] - before["p50_ms"]
+        d_mb = now["peak_mb"] - before["peak_mb"]
+        slower = d_ms > NOISE_FLOOR_MS and now["p50_ms"] > before["p50_ms"] * (1 + threshold)
+        bigger = d_mb > NOISE_FLOOR_MB and now["peak_mb"] > before["peak_mb"] * (1 + threshold)
+        flag = "❌ REGRESSION" if slower or bigger else "✅"
+        print(f"{flag} {name:<42} p50 {before['p50_ms']:9.3f} -> {now['p50_ms']:9.3f} ms "
+              f"({now['p50_ms'] / before['p50_ms']:5.2f}x) | peak {before['peak_mb']:6.2f} -> {now['peak_mb']:6.2f} MB")
+        if slower or bigger:
+            regressions.append(name)
+    return regressions
+
+
+def benchmark(only=None, out=None, baseline=BASELINE_PATH, save_baseline=False, threshold=REGRESSION_THRESHOLD):
+    """
+    Runs the cases (all, or the groups in `only`) on fixtures written to a
+    temporary folder, saves the results as JSON and compares them with the
+    baseline when there is one. Returns the names of regressed cases.
+    """
+    bench = Bench()
+    with tempfile.TemporaryDirectory() as tmp:
+        for group, cases in CASES.items():
+            if only and group not in only:
+                continue
+            print(f"\n--- {group} ---")
+            try:
+                cases(bench, tmp)
+            except ImportError as e:
+                bench.skip(group, f"missing dependency ({e})")
+
+    report = {"environment": environment(), "results": bench.results}
+    out = out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\n✅ Results written to {out}")
+
+    if save_baseline:
+        save_as_baseline(report, baseline or BASELINE_PATH)
+        return []
+    if not baseline or not os.path.exists(baseline):
+        print(f"\n⚠️ No baseline at {baseline}, nothing to compare against. "
+              f"Run once with --save-baseline on this machine to create it.")
+        return []
+    with open(baseline) as f:
+        regressions = compare(bench.results, json.load(f), threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+    return regressions
+
+
+def save_as_baseline(report, path=BASELINE_PATH):
+    """
+    Writes `report` as the baseline. Cases that weren't run this time (e.g.
+    with --only) keep their earlier baseline results.
+    """
+    merged = {"environment": report["environment"], "results": {}}
+    if os.path.exists(path):
+        with open(path) as f:
+            merged["results"] = json.load(f)["results"]
+    merged["results"].update(report["results"])
+    with open(path, "w") as f:
+        json.dump(merged, f, indent=1)
+    kept = len(merged["results"]) - len(report["results"])
+    print(f"✅ Saved as the baseline ({path})" + (f", kept {kept} earlier cases" if kept else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency, throughput and peak memory of the hot paths "
+                                                 "on deterministic synthetic inputs.")
+    parser.add_argument("--only", help=f"Comma-separated groups out of {','.join(CASES)}")
+    parser.add_argument("--out", help="Results JSON (default: results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline (merged into it with --only)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown / memory growth that counts as a regression")
+    args = parser.parse_args()
+    regressed = benchmark(args.only.split(",") if args.only else None, args.out, args.baseline,
+                          args.save_baseline, args.threshold)
+    sys.exit(1 if regressed else 0)
@@ -1,14 +1,20 @@
+import os
+import sys
+import threading
 import cv2
-import mediapipe as mp
 import numpy as np
-import pandas as pd
-import xgboost as xgb
 import time
-from collections import deque
 
-# --- CONFIGURATION ---
+if __name__ == "__main__":
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import realProj  # noqa: F401
 
-import os
+from motion import MotionWindow
+from landmarks import make_backend, BACKENDS
+from video_pipeline import run_pipeline, pipeline_report, INFERENCE_SCALE, PROCESS_EVERY_N
+
+# --- CONFIGURATION ---
 
 # 1. Get the directory where THIS script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,91 +23,91 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Make sure the filename here matches your file EXACTLY
 MODEL_PATH = os.path.join(script_dir, "temp_100_video_model.json")
 
-print(f"📂 Looking for model at: {MODEL_PATH}")
-
-# 3. Double check if it exists before crashing
-if not os.path.exists(MODEL_PATH):
-    print("❌ ERROR: File not found at the path above.")
-    print("Files actually in this folder:")
-    print(os.listdir(script_dir)) # Lists what Python can actually see
-    exit()
-
-
 BUFFER_SIZE = 150  # Number of frames to analyze (approx 5 seconds @ 30fps)
-
-# --- 1. SETUP MEDIAPIPE ---
-mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
-
-# --- 2. LOAD YOUR TRAINED MODEL ---
-print("Loading AI Model...")
-model = xgb.XGBRegressor()
-model.load_model(MODEL_PATH)
-print("✅ Model Loaded!")
+UPDATE_EVERY = 30  # Frames between dashboard refreshes
+LANDMARK_BACKEND = "holistic"  # "holistic", "pose" or "roi" (see landmarks.py)
+
+# MediaPipe is imported by the landmark backend that needs it (landmarks.py)
+
+# Shared metrics / tracing (telemetry/instrument.py)
+import instrument   # telemetry/, on sys.path via the package __init__
+from sessionlog import SessionLog
+
+# --- 2. LOAD YOUR TRAINED MODEL (on first use) ---
+_model = None
+_model_lock = threading.Lock()
+
+def load_model(path=MODEL_PATH):
+    """
+    The XGBoost body-language model, loaded once per process (thread-safe).
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            # Double check if it exists before crashing
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Model not found at {path}. "
+                                        f"Files actually in this folder: {os.listdir(os.path.dirname(path))}")
+            import xgboost as xgb
+            print("Loading AI Model...")
+            _model = xgb.XGBRegressor()
+            _model.load_model(path)
+            print("✅ Model Loaded!")
+        return _model
 
 # --- 3. HELPER CLASS (Same as Kaggle) ---
 class BodyLanguageProcessor:
-    def __init__(self):
-        self.holistic = mp_holistic.Holistic(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    """
+    Frame -> {"wrist", "stability", "attention"} (or None when nobody is found).
+    The landmark model is pluggable (see landmarks.py): "holistic" is the
+    original full model, "pose" skips the face mesh and hands, "roi" runs pose
+    on a small crop that follows the upper body.
+    """
+    def __init__(self, backend=LANDMARK_BACKEND, **kwargs):
+        self.backend_name = backend
+        self.backend = make_backend(backend, **kwargs)
     
     def process(self, frame):
-        # Convert to RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.holistic.process(image)
-        
-        # Extract features if available
-        if results.pose_landmarks and results.face_landmarks:
-            # 1. Wrist (Left + Right avg)
-            left_wrist = results.pose_landmarks.landmark[mp_holistic.PoseLandmark.LEFT_WRIST]
-            right_wrist = results.pose_landmarks.landmark[mp_holistic.PoseLandmark.RIGHT_WRIST]
-            wrist_x = (left_wrist.x + right_wrist.x) / 2
-            wrist_y = (left_wrist.y + right_wrist.y) / 2
-            
-            # 2. Stability (Nose)
-            nose = results.pose_landmarks.landmark[mp_holistic.PoseLandmark.NOSE]
-            stab_x, stab_y = nose.x, nose.y
-            
-            # --- 3. UPGRADED ATTENTION LOGIC (Yaw & Pitch) ---
-            left_ear = results.pose_landmarks.landmark[mp_holistic.PoseLandmark.LEFT_EAR]
-            right_ear = results.pose_landmarks.landmark[mp_holistic.PoseLandmark.RIGHT_EAR]
-            
-            # Calculate the midpoint between ears (The geometric center of the head)
-            ear_mid_x = (left_ear.x + right_ear.x) / 2
-            ear_mid_y = (left_ear.y + right_ear.y) / 2
-            
-            # Calculate how far the nose is from that midpoint
-            # If you look straight, nose is close to mid_x. 
-            # If you turn head left/right, nose moves away from mid_x.
-            offset_x = abs(nose.x - ear_mid_x)
-            offset_y = abs(nose.y - ear_mid_y)
-            
-            # Euclidean distance from center (How "off-center" is your face?)
-            dist_from_center = (offset_x**2 + offset_y**2)**0.5
-            
-            # Logic: If distance > 0.1, you are looking away.
-            # We map this to a score: 0.0 (Looking Side) to 1.0 (Looking Front)
-            # The multiplier 5.0 makes it sensitive enough to catch small turns.
-            attn_score = max(0, 1.0 - (dist_from_center * 5.0))
-            
-            return {
-                "wrist": [wrist_x, wrist_y],
-                "stability": [stab_x, stab_y],
-                "attention": attn_score
-            }
-        return None
-
-# --- 4. MAIN APPLICATION LOOP ---
-def main():
-    cap = cv2.VideoCapture(0) # 0 = Your Default Webcam
-    processor = BodyLanguageProcessor()
+        with instrument.span("video.process", backend=self.backend_name):
+            metrics = self.backend.process(frame)
+        instrument.counter("video_frames_total", "Frames through the landmark model").inc(
+            person="found" if metrics else "missing")
+        return metrics
+
+
+def publish_scores(attention, stability, smoothness):
+    # Latest window scores as gauges + a "video.scores" event for the exporters (the dashboard draws its own)
+    for name, value in (("attention", attention), ("stability", stability), ("smoothness", smoothness)):
+        instrument.gauge(f"video_{name}", f"Latest {name} score (0-100)").set(value)
+    instrument.emit("video.scores", attention=attention, stability=stability, smoothness=smoothness)
+
+# --- 4. DASHBOARD DRAWING ---
+def draw_dashboard(frame, disp_attention, disp_stability, disp_smoothness):
+    # Draw a semi-transparent black box for readability
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (10, 10), (350, 130), (0, 0, 0), -1)
+    frame = cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
+
+    # Line 1: Attention
+    cv2.putText(frame, f"ATTENTION:  {disp_attention:.1f}/100", (20, 40), 
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2) # Yellow
+
+    # Line 2: Stability
+    cv2.putText(frame, f"STABILITY:  {disp_stability:.1f}/100", (20, 80), 
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)   # Green
+
+    # Line 3: Smoothness
+    cv2.putText(frame, f"SMOOTHNESS: {disp_smoothness:.1f}/100", (20, 120), 
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 100, 255), 2) # Pink
+    return frame
+
+# --- 5. MAIN APPLICATION LOOP ---
+def main(source=0, backend=LANDMARK_BACKEND, session_log=None):
+    cap = cv2.VideoCapture(source) # 0 = Your Default Webcam, or a video file path
+    processor = BodyLanguageProcessor(backend)
     
-    # Buffers to store the last 5 seconds of data
-    wrist_buffer = deque(maxlen=BUFFER_SIZE)
-    stab_buffer = deque(maxlen=BUFFER_SIZE)
-    attn_buffer = deque(maxlen=BUFFER_SIZE)
+    # Rolling window over the last 5 seconds of data (stats updated per frame in O(1))
+    window = MotionWindow(BUFFER_SIZE, UPDATE_EVERY)
     
     current_score = 0.0
     feedback_text = "Analyzing..."
@@ -121,48 +127,15 @@ def main():
         # Process Frame
         metrics = processor.process(frame)
         
-        if metrics:
-            wrist_buffer.append(metrics['wrist'])
-            stab_buffer.append(metrics['stability'])
-            attn_buffer.append(metrics['attention'])
-
-        # --- UPDATE NUMBERS EVERY 30 FRAMES ---
-        if len(wrist_buffer) == BUFFER_SIZE and len(wrist_buffer) % 30 == 0:
-            
-            # 1. Calculate Raw Physics
-            stab_arr = np.array(stab_buffer)
-            var_stab = np.std(stab_arr, axis=0).mean()
-            
-            wrist_arr = np.array(wrist_buffer)
-            velocity = np.diff(wrist_arr, axis=0)
-            accel = np.diff(velocity, axis=0)
-            jerk = np.diff(accel, axis=0)
-            jerk_score = np.linalg.norm(jerk, axis=1).mean()
-            
-            attn_mean = np.mean(attn_buffer)
-            
-            # 2. Convert to 0-100 Scale (Using our calibrated math)
-            disp_stability = max(0, min(100, 100 - (var_stab * 1000))) 
-            disp_smoothness = max(0, min(100, 100 - (jerk_score * 100)))
-            disp_attention = min(100, attn_mean * 100)
+        # --- UPDATE NUMBERS EVERY 30 FRAMES (once the window is full) ---
+        if metrics and window.append(metrics['wrist'], metrics['stability'], metrics['attention']):
+            disp_attention, disp_stability, disp_smoothness = window.scores()
+            publish_scores(disp_attention, disp_stability, disp_smoothness)
+            if session_log is not None:
+                session_log.append(attention=disp_attention, stability=disp_stability, smoothness=disp_smoothness)
 
         # --- DRAW THE DASHBOARD ---
-        # Draw a semi-transparent black box for readability
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (350, 130), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
-
-        # Line 1: Attention
-        cv2.putText(frame, f"ATTENTION:  {disp_attention:.1f}/100", (20, 40), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2) # Yellow
-
-        # Line 2: Stability
-        cv2.putText(frame, f"STABILITY:  {disp_stability:.1f}/100", (20, 80), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)   # Green
-
-        # Line 3: Smoothness
-        cv2.putText(frame, f"SMOOTHNESS: {disp_smoothness:.1f}/100", (20, 120), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 100, 255), 2) # Pink
+        frame = draw_dashboard(frame, disp_attention, disp_stability, disp_smoothness)
 
         cv2.imshow('AI Interview Coach', frame)
 
@@ -172,5 +145,65 @@ def main():
     cap.release()
     cv2.destroyAllWindows()
 
+def main_pipelined(source=0, scale=INFERENCE_SCALE, every_n=PROCESS_EVERY_N, show=True, backend=LANDMARK_BACKEND,
+                   session_log=None):
+    """
+    Same dashboard, but capture, Holistic and drawing run on separate threads
+    (see video_pipeline.py): the window follows the camera's FPS whatever Holistic costs.
+    Pass session_log (a sessionlog.SessionLog) to keep every window's scores.
+    """
+    processor = BodyLanguageProcessor(backend)
+    window = MotionWindow(BUFFER_SIZE, UPDATE_EVERY)
+    display = {"scores": (0.0, 0.0, 0.0)}
+
+    def on_sample(metrics):
+        # Inference thread: one sample per captured frame (some interpolated)
+        if window.append(metrics['wrist'], metrics['stability'], metrics['attention']):
+            display["scores"] = window.scores()
+            publish_scores(*display["scores"])
+            if session_log is not None:
+                session_log.append(None, None, *display["scores"])
+
+    def render(frame):
+        # Main thread: draw the newest scores, never wait for inference
+        frame = draw_dashboard(frame, *display["scores"])
+        if not show:
+            return True
+        cv2.imshow('AI Interview Coach', frame)
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
+    capture, worker, render_stats = run_pipeline(source, processor.process, on_sample, render, scale, every_n)
+    print(pipeline_report(capture, worker, render_stats))
+    if show:
+        cv2.destroyAllWindows()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Live body-language dashboard.")
+    parser.add_argument("--video", help="Video file to use instead of the webcam")
+    parser.add_argument("--serial", action="store_true", help="Old single-threaded loop")
+    parser.add_argument("--scale", type=float, default=INFERENCE_SCALE, help="Holistic input downscale")
+    parser.add_argument("--every", type=int, default=PROCESS_EVERY_N, help="Run Holistic on every Nth frame")
+    parser.add_argument("--backend", choices=BACKENDS, default=LANDMARK_BACKEND, help="Landmark model tier")
+    parser.add_argument("--no-window", action="store_true", help="Don't open a window (benchmarks)")
+    parser.add_argument("--record", help="Append the scores to this session log file (telemetry/sessionlog.py)")
+    args = parser.parse_args()
+    instrument.configure()
+
+    print(f"📂 Looking for model at: {MODEL_PATH}")
+    try:
+        load_model()
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: {e}")
+        raise SystemExit(1)
+
+    source = args.video if args.video else 0
+    session_log = SessionLog(args.record) if args.record else None
+    if args.serial:
+        main(source, args.backend, session_log)
+    else:
+        main_pipelined(source, args.scale, args.every, show=not args.no_window, backend=args.backend,
+                       session_log=session_log)
+    if session_log is not None:
+        session_log.close()
+        print(f"📦 {len(session_log)} score updates saved to {args.record}")
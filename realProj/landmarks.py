@@ -0,0 +1,245 @@
+import cv2
+import time
+import enum
+import numpy as np
+
+# --- CONFIGURATION ---
+BACKENDS = ("holistic", "pose", "roi")
+POSE_COMPLEXITY = 1             # 0 = lite, 1 = full, 2 = heavy
+ROI_INPUT_SIZE = 256            # Longest side of the crop handed to the pose model
+ROI_MARGIN = 0.35               # Box padding, as a share of the tracked box size
+ROI_SMOOTHING = 0.5             # EMA weight of the new box (0 = frozen, 1 = jump every frame)
+
+
+class PoseLandmark(enum.IntEnum):
+    # BlazePose indices (same as mp.solutions.pose.PoseLandmark), so importing
+    # this module doesn't import MediaPipe
+    NOSE = 0
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+
+
+# Landmarks the dashboard reads, plus shoulders so the ROI keeps the upper body in view
+TRACKED = (PoseLandmark.NOSE, PoseLandmark.LEFT_EAR, PoseLandmark.RIGHT_EAR,
+           PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
+           PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER)
+
+
+def metrics_from_pose(landmarks):
+    """
+    The dashboard metrics from pose landmarks (anything indexable by
+    PoseLandmark with .x / .y in full-frame normalized coordinates).
+    Every backend goes through this, so they only differ in the landmarks.
+    """
+    # 1. Wrist (Left + Right avg)
+    left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
+    right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
+    wrist_x = (left_wrist.x + right_wrist.x) / 2
+    wrist_y = (left_wrist.y + right_wrist.y) / 2
+
+    # 2. Stability (Nose)
+    nose = landmarks[PoseLandmark.NOSE]
+    stab_x, stab_y = nose.x, nose.y
+
+    # --- 3. UPGRADED ATTENTION LOGIC (Yaw & Pitch) ---
+    left_ear = landmarks[PoseLandmark.LEFT_EAR]
+    right_ear = landmarks[PoseLandmark.RIGHT_EAR]
+
+    # Calculate the midpoint between ears (The geometric center of the head)
+    ear_mid_x = (left_ear.x + right_ear.x) / 2
+    ear_mid_y = (left_ear.y + right_ear.y) / 2
+
+    # Calculate how far the nose is from that midpoint
+    # If you look straight, nose is close to mid_x.
+    # If you turn head left/right, nose moves away from mid_x.
+    offset_x = abs(nose.x - ear_mid_x)
+    offset_y = abs(nose.y - ear_mid_y)
+
+    # Euclidean distance from center (How "off-center" is your face?)
+    dist_from_center = (offset_x**2 + offset_y**2)**0.5
+
+    # Logic: If distance > 0.1, you are looking away.
+    # We map this to a score: 0.0 (Looking Side) to 1.0 (Looking Front)
+    # The multiplier 5.0 makes it sensitive enough to catch small turns.
+    attn_score = max(0, 1.0 - (dist_from_center * 5.0))
+
+    return {
+        "wrist": [wrist_x, wrist_y],
+        "stability": [stab_x, stab_y],
+        "attention": attn_score
+    }
+
+
+class HolisticBackend:
+    """
+    The original tier: full Holistic (pose + face mesh + hands). With
+    require_face=True a frame only counts when the face mesh was found too,
+    as before, even though the metrics never read it.
+    """
+    name = "holistic"
+
+    def __init__(self, require_face=True, model_complexity=POSE_COMPLEXITY):
+        import mediapipe as mp
+        self.require_face = require_face
+        self.model = mp.solutions.holistic.Holistic(model_complexity=model_complexity,
+                                          min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def process(self, frame):
+        results = self.model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.pose_landmarks and (results.face_landmarks or not self.require_face):
+            return metrics_from_pose(results.pose_landmarks.landmark)
+        return None
+
+    def close(self):
+        self.model.close()
+
+
+class PoseBackend:
+    """
+    Pose only: the same body landmarks without the face mesh and hand models.
+    """
+    name = "pose"
+
+    def __init__(self, model_complexity=POSE_COMPLEXITY):
+        import mediapipe as mp
+        self.model = mp.solutions.pose.Pose(model_complexity=model_complexity,
+                                  min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def landmarks(self, frame):
+        results = self.model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        return results.pose_landmarks.landmark if results.pose_landmarks else None
+
+    def process(self, frame):
+        landmarks = self.landmarks(frame)
+        return metrics_from_pose(landmarks) if landmarks is not None else None
+
+    def close(self):
+        self.model.close()
+
+
+class _Point:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class RoiPoseBackend(PoseBackend):
+    """
+    Pose on a small crop around the upper body. The box comes from the
+    previous frame's landmarks (padded, smoothed), the crop is resized to
+    ROI_INPUT_SIZE and the landmarks are mapped back to full-frame
+    coordinates. With no box yet, or after losing the person, the whole
+    frame is used at the same reduced size.
+    """
+    name = "roi"
+
+    def __init__(self, model_complexity=0, input_size=ROI_INPUT_SIZE, margin=ROI_MARGIN):
+        super().__init__(model_complexity)
+        self.input_size = input_size
+        self.margin = margin
+        self.box = None             # (x0, y0, x1, y1) normalized to the full frame
+
+    def process(self, frame):
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.box or (0.0, 0.0, 1.0, 1.0)
+        px0, py0 = int(x0 * w), int(y0 * h)
+        px1, py1 = max(int(x1 * w), px0 + 2), max(int(y1 * h), py0 + 2)
+        crop = frame[py0:py1, px0:px1]
+        scale = self.input_size / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        landmarks = self.landmarks(crop)
+        if landmarks is None:
+            self.box = None
+            return None
+
+        # Crop-normalized -> full-frame-normalized
+        ox, oy, cw, ch = px0 / w, py0 / h, (px1 - px0) / w, (py1 - py0) / h
+        mapped = {i: _Point(ox + landmarks[i].x * cw, oy + landmarks[i].y * ch) for i in TRACKED}
+        self._track(mapped)
+        return metrics_from_pose(mapped)
+
+    def _track(self, points):
+        xs = [points[i].x for i in TRACKED]
+        ys = [points[i].y for i in TRACKED]
+        bw, bh = max(xs) - min(xs), max(ys) - min(ys)
+        size = max(bw, bh) * (1 + 2 * self.margin)
+        cx, cy = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+        new = np.clip([cx - size / 2, cy - size / 2, cx + size / 2, cy + size / 2], 0.0, 1.0)
+        if self.box is not None:
+            new = ROI_SMOOTHING * new + (1 - ROI_SMOOTHING) * np.array(self.box)
+        self.box = tuple(new.tolist())
+
+
+def make_backend(name="holistic", **kwargs):
+    if name == "holistic":
+        return HolisticBackend(**kwargs)
+    if name == "pose":
+        return PoseBackend(**kwargs)
+    if name == "roi":
+        return RoiPoseBackend(**kwargs)
+    raise ValueError(f"Unknown landmark backend '{name}', expected one of {BACKENDS}")
+
+
+# --- BENCHMARK ---
+def benchmark(video_path, frames=600):
+    """
+    Frames/sec and agreement with the Holistic tier on the same clip:
+    detection rate, and mean |difference| of the dashboard scores over the
+    150-frame windows (frames where both tiers saw the person).
+    """
+    from motion import window_features, to_display
+
+    cap = cv2.VideoCapture(video_path)
+    clip = []
+    while len(clip) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip.append(frame)
+    cap.release()
+
+    tiers = [("holistic", {}), ("holistic", {"require_face": False}),
+             ("pose", {"model_complexity": 0}), ("pose", {"model_complexity": 1}),
+             ("roi", {"model_complexity": 0}), ("roi", {"model_complexity": 1})]
+    samples = {}
+    for name, kwargs in tiers:
+        label = name + "".join(f" {k}={v}" for k, v in kwargs.items())
+        backend = make_backend(name, **kwargs)
+        rows = np.full((len(clip), 5), np.nan)
+        t = time.perf_counter()
+        for i, frame in enumerate(clip):
+            metrics = backend.process(frame)
+            if metrics:
+                rows[i] = (*metrics["wrist"], *metrics["stability"], metrics["attention"])
+        fps = len(clip) / (time.perf_counter() - t)
+        backend.close()
+        samples[label] = rows
+        print(f"⏱️  {label:<28} {fps:6.1f} fps | detected {np.mean(~np.isnan(rows[:, 0])):.0%} of frames")
+
+    def scores(rows):
+        _, features = window_features(rows[:, 0:2], rows[:, 2:4], rows[:, 4])
+        return np.array([to_display(*f) for f in features])
+
+    reference = samples["holistic"]
+    for label, rows in samples.items():
+        both = ~np.isnan(reference[:, 0]) & ~np.isnan(rows[:, 0])
+        ref_scores, tier_scores = scores(reference[both]), scores(rows[both])
+        if len(ref_scores) == 0:
+            print(f"📏 {label:<28} not enough common frames for a 150-frame window")
+            continue
+        diff = np.abs(ref_scores - tier_scores).mean(axis=0)
+        print(f"📏 {label:<28} vs holistic: attention {diff[0]:.1f}, stability {diff[1]:.1f}, "
+              f"smoothness {diff[2]:.1f} points")
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else 0)
@@ -0,0 +1,248 @@
+import time
+import numpy as np
+
+# --- CONFIGURATION ---
+BUFFER_SIZE = 150               # Frames in the window (approx 5 seconds @ 30fps)
+UPDATE_EVERY = 30               # Frames between dashboard refreshes once the window is full
+RESYNC_EVERY = 10 * BUFFER_SIZE # Recompute the running sums exactly this often to stop float drift
+
+
+def to_display(var_stab, jerk_score, attn_mean):
+    # Convert to 0-100 Scale (Using our calibrated math)
+    disp_stability = max(0, min(100, 100 - (var_stab * 1000)))
+    disp_smoothness = max(0, min(100, 100 - (jerk_score * 100)))
+    disp_attention = min(100, attn_mean * 100)
+    return disp_attention, disp_stability, disp_smoothness
+
+
+def batch_scores(wrist_buffer, stab_buffer, attn_buffer):
+    """
+    (attention, stability, smoothness) on the 0-100 display scale, recomputed
+    from the whole window. This is the reference MotionWindow has to match.
+    """
+    # 1. Calculate Raw Physics
+    stab_arr = np.array(stab_buffer)
+    var_stab = np.std(stab_arr, axis=0).mean()
+
+    wrist_arr = np.array(wrist_buffer)
+    velocity = np.diff(wrist_arr, axis=0)
+    accel = np.diff(velocity, axis=0)
+    jerk = np.diff(accel, axis=0)
+    jerk_score = np.linalg.norm(jerk, axis=1).mean()
+
+    attn_mean = np.mean(attn_buffer)
+
+    # 2. Convert to 0-100 Scale
+    return to_display(var_stab, jerk_score, attn_mean)
+
+
+def _window_sums(values, size, starts):
+    # Sum of values[s:s + size] for every s, from one prefix sum
+    prefix = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    return prefix[starts + size] - prefix[starts]
+
+
+def window_features(wrist, stab, attn, size=BUFFER_SIZE, hop=UPDATE_EVERY):
+    """
+    Model features (stability_variance, smoothness_jerk, attention_mean) for
+    every full `size`-sample window, one every `hop` samples, in one
+    vectorized pass. These are MotionWindow.raw() at each refresh of a
+    window fed the same samples.
+
+    Returns (end, features) where end[i] is the index of window i's last sample.
+    """
+    wrist = np.asarray(wrist, dtype=np.float64)
+    stab = np.asarray(stab, dtype=np.float64)
+    attn = np.asarray(attn, dtype=np.float64)
+    n = len(stab)
+    if n < size:
+        return np.zeros(0, dtype=int), np.zeros((0, 3))
+
+    starts = np.arange(0, n - size + 1, hop)
+
+    # Centre first so the prefix sums of squares don't cancel catastrophically
+    centred = stab - stab.mean(axis=0)
+    mean = _window_sums(centred, size, starts) / size
+    var = _window_sums(centred ** 2, size, starts) / size - mean ** 2
+    var_stab = np.sqrt(np.maximum(var, 0)).mean(axis=1)
+
+    jerk = np.linalg.norm(np.diff(wrist, n=3, axis=0), axis=1)
+    jerk_score = _window_sums(jerk, size - 3, starts) / (size - 3)
+
+    attn_mean = _window_sums(attn, size, starts) / size
+    return starts + size - 1, np.column_stack([var_stab, jerk_score, attn_mean])
+
+
+class MotionWindow:
+    """
+    The last `size` body-language samples with their window statistics kept
+    up to date in O(1) per frame:
+
+    - stability: per-axis mean / M2 of the nose position, Welford-style
+      add + remove as a sample enters and the oldest leaves
+    - smoothness: each new wrist sample makes one new third difference
+      (x[i] - 3x[i-1] + 3x[i-2] - x[i-3]); its norm goes into a ring of
+      size - 3 jerk norms with a running sum
+    - attention: running sum
+
+    Samples live in preallocated ring arrays. append() returns True when the
+    window is full and `update_every` frames have passed since the last
+    refresh, which is when callers should redraw with scores().
+    """
+    def __init__(self, size=BUFFER_SIZE, update_every=UPDATE_EVERY):
+        self.size = size
+        self.update_every = update_every
+        self._wrist = np.zeros((size, 2))
+        self._stab = np.zeros((size, 2))
+        self._attn = np.zeros(size)
+        self._jerk = np.zeros(max(1, size - 3))
+        self.clear()
+
+    def clear(self):
+        self.count = 0              # Samples in the window (<= size)
+        self._head = 0              # Next slot to write
+        self._total = 0             # Samples ever appended
+        self._since_update = 0
+        # Scalar state as Python floats: numpy scalar math costs more than it saves here
+        self._mx = self._my = 0.0   # Nose mean
+        self._m2x = self._m2y = 0.0 # Nose sum of squared deviations
+        self._recent = []           # Last 3 wrist samples, newest last
+        self._jerk_sum = 0.0
+        self._jerk_count = 0
+        self._attn_sum = 0.0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def append(self, wrist, stability, attention):
+        size = self.size
+        head = self._head
+        wx, wy = float(wrist[0]), float(wrist[1])
+        sx, sy = float(stability[0]), float(stability[1])
+        attention = float(attention)
+
+        # --- Stability: Welford add (growing) or replace (full window) ---
+        mx, my = self._mx, self._my
+        if self.count < size:
+            self.count += 1
+            n = self.count
+            self._mx = mx + (sx - mx) / n
+            self._my = my + (sy - my) / n
+            self._m2x += (sx - mx) * (sx - self._mx)
+            self._m2y += (sy - my) * (sy - self._my)
+        else:
+            ox, oy = self._stab[head].tolist()
+            self._mx = mx + (sx - ox) / size
+            self._my = my + (sy - oy) / size
+            self._m2x += (sx - ox) * (sx - self._mx + ox - mx)
+            self._m2y += (sy - oy) * (sy - self._my + oy - my)
+            self._attn_sum -= float(self._attn[head])
+
+        # --- Smoothness: one new jerk value per sample once there are 4 ---
+        recent = self._recent
+        if len(recent) == 3:
+            (p3x, p3y), (p2x, p2y), (p1x, p1y) = recent
+            jx = wx - 3 * p1x + 3 * p2x - p3x
+            jy = wy - 3 * p1y + 3 * p2y - p3y
+            norm = (jx * jx + jy * jy) ** 0.5
+            slot = (self._total - 3) % len(self._jerk)
+            if self._jerk_count == len(self._jerk):
+                self._jerk_sum -= float(self._jerk[slot])
+            else:
+                self._jerk_count += 1
+            self._jerk[slot] = norm
+            self._jerk_sum += norm
+            recent.pop(0)
+        recent.append((wx, wy))
+
+        self._wrist[head] = (wx, wy)
+        self._stab[head] = (sx, sy)
+        self._attn[head] = attention
+        self._attn_sum += attention
+        self._head = (head + 1) % size
+        self._total += 1
+        self._since_update += 1
+
+        if self._total % RESYNC_EVERY == 0:
+            self._resync()
+
+        if self.count == size and self._since_update >= self.update_every:
+            self._since_update = 0
+            return True
+        return False
+
+    def _resync(self):
+        # Exact recomputation of the running sums (float error only ever accumulates)
+        stab = self._stab[:self.count]
+        self._mx, self._my = stab.mean(axis=0).tolist()
+        self._m2x, self._m2y = ((stab - (self._mx, self._my)) ** 2).sum(axis=0).tolist()
+        self._attn_sum = float(self._attn[:self.count].sum())
+        self._jerk_sum = float(self._jerk[:self._jerk_count].sum())
+
+    def raw(self):
+        """
+        (stability std averaged over x/y, mean jerk norm, mean attention) of the current window.
+        """
+        if self.count == 0:
+            return 0.0, 0.0, 0.0
+        var_stab = (max(self._m2x, 0.0) ** 0.5 + max(self._m2y, 0.0) ** 0.5) / 2 / self.count ** 0.5
+        jerk_score = self._jerk_sum / self._jerk_count if self._jerk_count else 0.0
+        return var_stab, jerk_score, self._attn_sum / self.count
+
+    def scores(self):
+        # Same (attention, stability, smoothness) as batch_scores on the same window
+        return to_display(*self.raw())
+
+    def arrays(self):
+        # Oldest-first copies of the window (wrist, stability, attention)
+        order = np.arange(self._head - self.count, self._head) % self.size
+        return self._wrist[order], self._stab[order], self._attn[order]
+
+
+# --- BENCHMARK ---
+def benchmark(frames=3000, seed=0):
+    """
+    Per-frame cost of main()'s old path (deques -> arrays -> std / diffs
+    every frame) vs. MotionWindow.append + scores(), and the largest
+    difference between the two on a random walk.
+    """
+    from collections import deque
+
+    rng = np.random.default_rng(seed)
+    wrist = 0.5 + np.cumsum(rng.normal(0, 0.01, (frames, 2)), axis=0)
+    stab = 0.5 + np.cumsum(rng.normal(0, 0.002, (frames, 2)), axis=0)
+    attn = rng.uniform(0.6, 1.0, frames)
+
+    wrist_buffer = deque(maxlen=BUFFER_SIZE)
+    stab_buffer = deque(maxlen=BUFFER_SIZE)
+    attn_buffer = deque(maxlen=BUFFER_SIZE)
+    batch = []
+    t = time.perf_counter()
+    for i in range(frames):
+        wrist_buffer.append(list(wrist[i]))
+        stab_buffer.append(list(stab[i]))
+        attn_buffer.append(attn[i])
+        if len(wrist_buffer) == BUFFER_SIZE:
+            batch.append(batch_scores(wrist_buffer, stab_buffer, attn_buffer))
+    old = (time.perf_counter() - t) / frames
+
+    window = MotionWindow(update_every=1)
+    incremental = []
+    t = time.perf_counter()
+    for i in range(frames):
+        if window.append(wrist[i], stab[i], attn[i]):
+            incremental.append(window.scores())
+    new = (time.perf_counter() - t) / frames
+
+    diff = np.abs(np.array(batch) - np.array(incremental)).max()
+    print(f"⏱️  Batch every frame:   {old * 1e6:.1f} µs/frame")
+    print(f"⏱️  MotionWindow:        {new * 1e6:.1f} µs/frame ({old / new:.1f}x)")
+    print(f"📏 Max score difference over {len(batch)} windows: {diff:.2e} points")
+
+
+if __name__ == "__main__":
+    benchmark()
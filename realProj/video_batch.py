@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from motion import BUFFER_SIZE, UPDATE_EVERY, window_features
+
+# --- CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, "temp_100_video_model.json")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+SEGMENT_FRAMES = 900            # Frames per worker task (30 s @ 30fps), so long videos spread over the pool
+FEATURE_NAMES = ["stability_variance", "smoothness_jerk", "attention_mean"]
+
+# One landmark model per worker process, created by _init_worker
+_processor = None
+_scale = 1.0
+
+
+def collect_inputs(source):
+    """
+    A directory is searched recursively for video files.
+    Anything else is read as a manifest with one video path per line.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in lines if p and not p.startswith("#")]
+
+
+def video_info(path):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return n_frames, fps
+
+
+def _init_worker(scale, processor_factory=None):
+    global _processor, _scale
+    if processor_factory is None:
+        from file import BodyLanguageProcessor
+        processor_factory = BodyLanguageProcessor
+    _processor = processor_factory()
+    _scale = scale
+
+
+def _landmark_segment(path, start, end):
+    """
+    Runs in a worker process: decodes frames [start, end) and runs the landmark
+    model on each. Returns (path, start, samples[n, 5]) with NaN rows where
+    nobody was detected, plus decode / landmark seconds.
+    """
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    samples = np.full((end - start, 5), np.nan)
+    decode = landmarks = 0.0
+    n = 0
+    while n < end - start:
+        t = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if _scale != 1.0:
+            frame = cv2.resize(frame, None, fx=_scale, fy=_scale, interpolation=cv2.INTER_AREA)
+        t2 = time.perf_counter()
+        metrics = _processor.process(frame)
+        landmarks += time.perf_counter() - t2
+        decode += t2 - t
+        if metrics:
+            samples[n] = (*metrics["wrist"], *metrics["stability"], metrics["attention"])
+        n += 1
+    cap.release()
+    return path, start, samples[:n], decode, landmarks
+
+
+def score_samples(model, samples, fps, hop=UPDATE_EVERY):
+    """
+    Per-window timeline for one video. samples[i] belongs to frame i (NaN
+    row = no detection); like the live loop, frames without a detection are
+    left out of the window. Returns (times in s, scores, features).
+    """
+    import pandas as pd
+
+    detected = ~np.isnan(samples[:, 0])
+    frame_index = np.flatnonzero(detected)
+    kept = samples[detected]
+    end, features = window_features(kept[:, 0:2], kept[:, 2:4], kept[:, 4], BUFFER_SIZE, hop)
+    if len(end) == 0:
+        return np.zeros(0), np.zeros(0), features
+
+    # One predict call for the whole file
+    scores = model.predict(pd.DataFrame(features, columns=FEATURE_NAMES))
+    return (frame_index[end] + 1) / fps, scores, features
+
+
+def run_batch(source, out_dir, workers=None, scale=1.0, hop=UPDATE_EVERY, model_path=MODEL_PATH,
+              processor_factory=None):
+    """
+    Scores every video under `source` and writes <name>.json per video to
+    out_dir with the window end times, scores and features. Prints
+    throughput and time per stage.
+    """
+    from file import load_model
+
+    paths = collect_inputs(source)
+    os.makedirs(out_dir, exist_ok=True)
+    model = load_model(model_path)
+
+    start = time.perf_counter()
+    timing = {"decode": 0.0, "landmarks": 0.0, "features + predict": 0.0}
+    infos = {path: video_info(path) for path in paths}
+    infos = {path: info for path, info in infos.items() if info[0] > 0}
+    segments = {path: {} for path in infos}
+    pending = {path: -(-n // SEGMENT_FRAMES) for path, (n, _) in infos.items()}
+    total_frames = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scale, processor_factory)) as pool:
+        futures = [pool.submit(_landmark_segment, path, s, min(s + SEGMENT_FRAMES, n))
+                   for path, (n, _) in infos.items() for s in range(0, n, SEGMENT_FRAMES)]
+
+        for future in as_completed(futures):
+            path, seg_start, samples, decode, landmarks = future.result()
+            timing["decode"] += decode
+            timing["landmarks"] += landmarks
+            total_frames += len(samples)
+            segments[path][seg_start] = samples
+            pending[path] -= 1
+            if pending[path]:
+                continue
+
+            # Last segment of this video is in: stitch, window, predict, write
+            t = time.perf_counter()
+            parts = segments.pop(path)
+            all_samples = np.concatenate([parts[s] for s in sorted(parts)])
+            times, scores, features = score_samples(model, all_samples, infos[path][1], hop)
+            timing["features + predict"] += time.perf_counter() - t
+
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(os.path.join(out_dir, name + ".json"), "w") as f:
+                json.dump({"video": path, "fps": infos[path][1], "frames": len(all_samples),
+                           "detected": int((~np.isnan(all_samples[:, 0])).sum()) if len(all_samples) else 0,
+                           "times": times.tolist(), "scores": np.asarray(scores).tolist(),
+                           "features": features.tolist()}, f)
+            print(f"✅ {name}: {len(scores)} windows, mean score {np.mean(scores) if len(scores) else 0:.3f}")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n⏱️  {len(paths)} videos, {total_frames} frames in {elapsed:.1f} s "
+          f"({total_frames / elapsed:.1f} frames/sec)")
+    for stage, seconds in timing.items():
+        # decode / landmarks are summed over workers (CPU-seconds)
+        print(f"   {stage}: {seconds:.2f} s ({seconds / max(total_frames, 1) * 1000:.2f} ms/frame)")
+    return timing
+
+
+if __name__ == "__main__":
+    import sys
+    # Run as a script: importing the package sets up sys.path (this folder, telemetry/)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import realProj  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Score recorded interview videos with the body-language model.")
+    parser.add_argument("source", help="Directory of videos, or a manifest file with one path per line")
+    parser.add_argument("out_dir", help="Where to write <video>.json timelines")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--scale", type=float, default=1.0, help="Downscale frames before the landmark model")
+    parser.add_argument("--hop", type=int, default=UPDATE_EVERY, help="Frames between windows")
+    args = parser.parse_args()
+    run_batch(args.source, args.out_dir, args.workers, args.scale, args.hop)
@@ -0,0 +1,284 @@
+import cv2
+import time
+import threading
+import numpy as np
+
+# --- CONFIGURATION ---
+INFERENCE_SCALE = 0.5           # Holistic input size relative to the camera frame (landmarks are normalized)
+PROCESS_EVERY_N = 2             # Run the landmark model on every Nth captured frame
+MAX_INTERPOLATION_GAP = 15      # Frames; after a longer gap (e.g. nobody in view) don't invent motion
+
+
+class LatestFrame:
+    """
+    Single-slot mailbox between the capture thread and its readers: put()
+    overwrites, so readers only ever see the newest frame and never a
+    backlog of stale ones. Frames are numbered so readers can tell how many
+    they missed.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.timestamp = 0.0
+        self.closed = False
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            self.frame = frame
+            self.timestamp = timestamp
+            self.seq += 1
+            self._cond.notify_all()
+
+    def get(self, after_seq=0, timeout=None):
+        """
+        Waits for a frame newer than after_seq; returns (frame, seq, timestamp),
+        or (None, seq, timestamp) on timeout / once capture has ended.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq or self.closed, timeout)
+            if self.seq <= after_seq:
+                return None, self.seq, self.timestamp
+            return self.frame, self.seq, self.timestamp
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StageCounter:
+    """
+    Frames/sec and latency samples for one pipeline stage.
+    """
+    def __init__(self):
+        self.count = 0
+        self.latencies = []
+        self.started = time.perf_counter()
+
+    def tick(self, latency=None):
+        self.count += 1
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def fps(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def latency_ms(self, q):
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, q * 100)) * 1000
+
+
+class CaptureThread(threading.Thread):
+    """
+    Reads a webcam index or a video file as fast as it delivers frames and
+    publishes each one to a LatestFrame. Video files are paced at their own
+    FPS (realtime=True) so they behave like a camera.
+    """
+    def __init__(self, source=0, realtime=True):
+        super().__init__(daemon=True)
+        self.cap = cv2.VideoCapture(source)
+        self.latest = LatestFrame()
+        self.stats = StageCounter()
+        self.is_file = isinstance(source, str)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.is_file else 0
+        self.frame_interval = 1.0 / fps if realtime and fps > 0 else 0.0
+        self._stopping = threading.Event()
+
+    def run(self):
+        next_time = time.perf_counter()
+        try:
+            while self.cap.isOpened() and not self._stopping.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                if self.frame_interval:
+                    next_time += self.frame_interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.latest.put(frame, time.perf_counter())
+                self.stats.tick()
+        finally:
+            self.cap.release()
+            self.latest.close()
+
+    def stop(self):
+        self._stopping.set()
+
+
+def _flatten(metrics):
+    return np.array([*metrics["wrist"], *metrics["stability"], metrics["attention"]])
+
+
+def _unflatten(values):
+    return {"wrist": [values[0], values[1]], "stability": [values[2], values[3]], "attention": values[4]}
+
+
+class InferenceWorker(threading.Thread):
+    """
+    Runs process(frame) -> metrics dict (or None) on the newest captured frame,
+    downscaled by `scale`, at most once every `every_n` captured frames.
+
+    Every captured frame still yields one sample for on_sample(): frames in
+    between two processed ones get landmarks linearly interpolated between
+    the two results, so the metric buffers keep their frames-per-second
+    meaning. Samples therefore lag by one processed interval.
+
+    With with_time=True, on_sample(metrics, t) also gets the capture time of
+    the frame (interpolated too), on the time.perf_counter clock.
+    """
+    def __init__(self, latest, process, on_sample, scale=INFERENCE_SCALE, every_n=PROCESS_EVERY_N, with_time=False):
+        super().__init__(daemon=True)
+        self.latest = latest
+        self.process = process
+        self.on_sample = on_sample
+        self.with_time = with_time
+        self.scale = scale
+        self.every_n = max(1, every_n)
+        self.stats = StageCounter()         # Latency: capture -> metrics available
+        self.interpolated = 0
+        self._stopping = threading.Event()
+
+    def _emit(self, metrics, t):
+        if self.with_time:
+            self.on_sample(metrics, t)
+        else:
+            self.on_sample(metrics)
+
+    def run(self):
+        last_seq = 0
+        prev_values, prev_seq, prev_time = None, 0, 0.0
+        while not self._stopping.is_set():
+            frame, seq, captured_at = self.latest.get(last_seq + self.every_n - 1, timeout=0.5)
+            if frame is None:
+                if self.latest.closed:
+                    break
+                continue
+            last_seq = seq
+
+            if self.scale != 1.0:
+                frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            metrics = self.process(frame)
+            if metrics is None:
+                continue
+
+            values = _flatten(metrics)
+            gap = seq - prev_seq
+            if prev_values is not None and 1 < gap <= MAX_INTERPOLATION_GAP:
+                for k in range(1, gap):
+                    self._emit(_unflatten(prev_values + (values - prev_values) * (k / gap)),
+                               prev_time + (captured_at - prev_time) * (k / gap))
+                self.interpolated += gap - 1
+            self._emit(metrics, captured_at)
+            prev_values, prev_seq, prev_time = values, seq, captured_at
+            self.stats.tick(time.perf_counter() - captured_at)
+
+    def stop(self):
+        self._stopping.set()
+
+
+def run_pipeline(source, process, on_sample, render, scale=INFERENCE_SCALE, every_n=PROCESS_EVERY_N,
+                 realtime=True, report_every=5.0):
+    """
+    Capture, inference and render on separate threads. render(frame) runs on
+    the calling thread (OpenCV windows want the main thread), draws whatever
+    metrics are newest and returns False to quit. It never waits on inference.
+    """
+    capture = CaptureThread(source, realtime=realtime)
+    worker = InferenceWorker(capture.latest, process, on_sample, scale, every_n)
+    render_stats = StageCounter()           # Latency: capture -> frame shown
+    capture.start()
+    worker.start()
+
+    seq = 0
+    last_report = time.perf_counter()
+    try:
+        while True:
+            frame, seq, captured_at = capture.latest.get(seq, timeout=0.5)
+            if frame is None:
+                if capture.latest.closed:
+                    break
+                continue
+            if render(frame) is False:
+                break
+            render_stats.tick(time.perf_counter() - captured_at)
+
+            if report_every and time.perf_counter() - last_report >= report_every:
+                last_report = time.perf_counter()
+                print(pipeline_report(capture, worker, render_stats))
+    finally:
+        capture.stop()
+        worker.stop()
+        capture.join()
+        worker.join()
+    return capture, worker, render_stats
+
+
+def pipeline_report(capture, worker, render_stats):
+    return (f"📈 capture {capture.stats.fps():.1f} fps | inference {worker.stats.fps():.1f} fps "
+            f"(+{worker.interpolated} interpolated) | render {render_stats.fps():.1f} fps | "
+            f"latency to metrics p50 {worker.stats.latency_ms(0.5):.0f} ms, "
+            f"to screen p50 {render_stats.latency_ms(0.5):.0f} ms")
+
+
+# --- BENCHMARK ---
+def _synthetic_clip(path, seconds=6, fps=30, size=(1280, 720)):
+    # A moving dot stands in for the candidate so the clip can be generated anywhere
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(seconds * fps):
+        frame = np.full((size[1], size[0], 3), 40, np.uint8)
+        x = int(size[0] / 2 + 200 * np.sin(i / 15))
+        cv2.circle(frame, (x, size[1] // 2), 40, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def benchmark(latency_per_megapixel=0.08):
+    """
+    Serial loop vs. pipeline on a synthetic 720p clip, with a stand-in for
+    Holistic whose cost scales with the input size.
+    """
+    import os
+    import tempfile
+
+    def fake_process(frame):
+        time.sleep(latency_per_megapixel * frame.shape[0] * frame.shape[1] / 1e6)
+        cols = np.flatnonzero(frame[frame.shape[0] // 2, :, 0] > 128)
+        x = cols.mean() / frame.shape[1] if len(cols) else 0.5
+        return {"wrist": [x, 0.5], "stability": [x, 0.4], "attention": 1.0}
+
+    def render(frame):
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (10, 10), (350, 130), (0, 0, 0), -1)
+        cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.mp4")
+        _synthetic_clip(path)
+
+        cap = cv2.VideoCapture(path)
+        frames = 0
+        t = time.perf_counter()
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            fake_process(frame)
+            render(frame)
+            frames += 1
+        serial_fps = frames / (time.perf_counter() - t)
+        print(f"⏱️  Serial loop: {serial_fps:.1f} fps (displayed = processed)")
+
+        for scale, every_n in ((1.0, 1), (0.5, 1), (0.5, 2)):
+            samples = []
+            capture, worker, render_stats = run_pipeline(path, fake_process, samples.append, render,
+                                                         scale=scale, every_n=every_n, report_every=0)
+            print(f"⏱️  Pipeline scale {scale}, every {every_n}: {pipeline_report(capture, worker, render_stats)[2:]}"
+                  f" | {len(samples)} samples for {capture.stats.count} frames")
+
+
+if __name__ == "__main__":
+    benchmark()
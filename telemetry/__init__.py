@@ -0,0 +1,17 @@
+"""
+Telemetry shared by the voice, video and interview components: metrics,
+spans and the sinks they are exported to (see instrument.py), and the
+per-session time series uploaded to the website (see sessionlog.py).
+
+The modules import each other by bare name (so they also run as scripts),
+which is why importing the package puts this folder on sys.path. The
+component packages' __init__s add it too, and a module run as a script
+imports its package first for the same setup. Importing instrument starts no exporter: entry points call
+instrument.configure().
+"""
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+if _here not in sys.path:
+    sys.path.insert(0, _here)
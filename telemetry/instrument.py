@@ -0,0 +1,554 @@
+import os
+import re
+import json
+import time
+import atexit
+import bisect
+import itertools
+import threading
+import contextvars
+from collections import deque
+
+# --- CONFIGURATION ---
+ENABLED = os.getenv("TELEMETRY", "1") != "0"        # TELEMETRY=0: counters, histograms and spans are no-ops
+TERMINAL_OUTPUT = os.getenv("TELEMETRY_TERMINAL", "1") != "0"  # Render events (confidence bar, grades) on stdout
+JSONL_PATH = os.getenv("TELEMETRY_JSONL")           # configure(): append every span and event to this file as JSON lines
+PROMETHEUS_PORT = int(os.getenv("TELEMETRY_PORT", "0"))  # configure(): > 0 serves /metrics on this port from a thread
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SPANS = 1000             # Finished spans kept in memory for snapshot()
+
+
+def _key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def metric_name(name):
+    # "voice.extract_features" -> "voice_extract_features" (Prometheus names allow [a-zA-Z0-9_:])
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+
+
+class Counter:
+    """
+    A value per label set that only goes up (calls, retries, seconds slept).
+    """
+    kind = "counter"
+
+    def __init__(self, registry, name, help=""):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = _key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(_key(labels), 0)
+
+    def _items(self):
+        # Other threads add label sets while a reader (Prometheus, /metrics) iterates
+        with self._lock:
+            return list(self.values.items())
+
+    def snapshot(self):
+        return [{"labels": dict(key), "value": value} for key, value in self._items()]
+
+    def samples(self):
+        for key, value in self._items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    """
+    A value per label set that is set, not accumulated (latest score, queue depth).
+    """
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = _key(labels)
+        with self._lock:
+            self.values[key] = value
+
+
+class Histogram:
+    """
+    Counts per fixed bucket plus sum and count, per label set. Buckets are
+    upper bounds (Prometheus "le"); quantiles are estimated from them.
+    """
+    kind = "histogram"
+
+    def __init__(self, registry, name, help="", buckets=LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.values = {}            # label key -> [count per bucket ..., count above the last, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        self._observe(value, _key(labels))
+
+    def _observe(self, value, key):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[slot] += 1
+            state[-1] += value
+
+    def quantile(self, q, **labels):
+        with self._lock:
+            state = self.values.get(_key(labels))
+            state = list(state) if state else None
+        return self._quantile(state, q) if state else None
+
+    def _items(self):
+        # Copies, taken under the lock: observe() mutates the lists in place
+        with self._lock:
+            return [(key, list(state)) for key, state in self.values.items()]
+
+    def _quantile(self, state, q):
+        # Linear within the bucket the q-th observation falls in
+        counts = state[:-1]
+        rank = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return 0.0
+
+    def snapshot(self):
+        out = []
+        for key, state in self._items():
+            count = sum(state[:-1])
+            out.append({"labels": dict(key), "count": count, "sum": state[-1],
+                        "mean": state[-1] / count if count else 0.0,
+                        "p50": self._quantile(state, 0.5), "p95": self._quantile(state, 0.95),
+                        "p99": self._quantile(state, 0.99)})
+        return out
+
+    def samples(self):
+        for key, state in self._items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                yield self.name + "_bucket", key + (("le", "+Inf" if bound == float("inf") else repr(bound)),), cumulative
+            yield self.name + "_sum", key, state[-1]
+            yield self.name + "_count", key, cumulative
+
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation. Used as a context manager; the span open around it
+    (in this thread or asyncio task) becomes its parent, so nested spans form
+    a trace. Its duration goes to the histogram "<name>_seconds" (with the
+    span's labels), and the finished span to every exporter.
+
+    set(**attributes) adds details that aren't labels (retries, sizes...).
+    """
+    __slots__ = ("registry", "name", "labels", "attributes", "span_id", "parent_id", "trace_id",
+                 "start", "duration", "_t0", "_token")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.attributes = {}
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span_id = next(self.registry._ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self._token = _current_span.set(self)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.registry._finish(self)
+        return False
+
+    def record(self):
+        return {"span": self.name, "trace": self.trace_id, "id": self.span_id, "parent": self.parent_id,
+                "start": self.start, "duration": self.duration, **self.labels, **self.attributes}
+
+
+class _NoSpan:
+    # What span() returns while the registry is disabled: nothing is timed or recorded
+    __slots__ = ()
+
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def current_span():
+    """
+    The span open around the caller (a do-nothing one when there is none),
+    for code that wants to add attributes to its caller's span.
+    """
+    span = _current_span.get()
+    return _NO_SPAN if span is None else span
+
+
+class Registry:
+    """
+    Every metric of the process, by name, and the exporters spans and events
+    go to. Metrics are created on first use with counter() / gauge() /
+    histogram(); span() times a block, timed() a function.
+
+    Reading it: snapshot() (a dict, in process), prometheus() (text
+    exposition format), or an exporter added with add_exporter(). While
+    disabled, metrics and spans cost one attribute check; events still reach
+    the exporters, since the terminal display is one of them.
+    """
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self.metrics = {}
+        self.exporters = []
+        self.recent = deque(maxlen=RECENT_SPANS)
+        self._span_histograms = {}  # Span name -> its "<name>_seconds" histogram
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _metric(self, cls, name, help, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    metric = self.metrics[name] = cls(self, name, help, **kwargs)
+        return metric
+
+    def counter(self, name, help=""):
+        return self._metric(Counter, name, help)
+
+    def gauge(self, name, help=""):
+        return self._metric(Gauge, name, help)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return self._metric(Histogram, name, help, buckets=buckets)
+
+    # --- SPANS ---
+    def span(self, name, **labels):
+        if not self.enabled:
+            return _NO_SPAN
+        return Span(self, name, labels)
+
+    def timed(self, name, **labels):
+        """
+        Decorator: every call of the function is a span.
+        """
+        def decorate(fn):
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, name, labels):
+                    return fn(*args, **kwargs)
+            wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+            return wrapper
+        return decorate
+
+    def _finish(self, span):
+        histogram = self._span_histograms.get(span.name)
+        if histogram is None:
+            histogram = self._span_histograms[span.name] = self.histogram(
+                metric_name(span.name) + "_seconds", f"Duration of {span.name}")
+        histogram._observe(span.duration, _key(span.labels))
+        self.recent.append(span)
+        for exporter in self.exporters:
+            exporter.on_span(span)
+
+    # --- EVENTS ---
+    def emit(self, event, **fields):
+        """
+        Something happened that a person or a log may want to see (a new
+        confidence score, a graded answer). Only exporters act on it.
+        """
+        for exporter in self.exporters:
+            exporter.on_event(event, fields)
+
+    def add_exporter(self, exporter):
+        # Replaced, not mutated, so threads iterating the old list aren't disturbed
+        self.exporters = self.exporters + [exporter]
+        return exporter
+
+    def remove_exporter(self, exporter):
+        self.exporters = [e for e in self.exporters if e is not exporter]
+
+    # --- READING ---
+    def snapshot(self):
+        """
+        {"metrics": {name: {"type", "help", "values": [...]}}, "spans": [recent span records]}
+        """
+        return {"enabled": self.enabled,
+                "metrics": {name: {"type": m.kind, "help": m.help, "values": m.snapshot()}
+                            for name, m in list(self.metrics.items())},
+                "spans": [span.record() for span in list(self.recent)]}
+
+    def prometheus(self):
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample, key, value in list(metric.samples()):
+                labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                lines.append(f"{sample}{{{labels}}} {value}" if labels else f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in list(self.metrics.values()):
+            with metric._lock:
+                metric.values.clear()
+        self.recent.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- EXPORTERS ---
+class JsonLinesExporter:
+    """
+    Every finished span and every event as one JSON line (buffered; flushed
+    on close and at exit). write_snapshot() adds a line with all metrics.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", buffering=1 << 16)
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _write(self, record):
+        line = json.dumps(record, default=float) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def on_span(self, span):
+        self._write(span.record())
+
+    def on_event(self, event, fields):
+        self._write({"event": event, "time": time.time(), **fields})
+
+    def write_snapshot(self, registry):
+        snapshot = registry.snapshot()
+        self._write({"metrics": snapshot["metrics"], "time": time.time()})
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class TerminalExporter:
+    """
+    The terminal display as a sink: each event name maps to a function that
+    prints it (the components register theirs with on_terminal()). Spans
+    aren't shown.
+    """
+    def __init__(self):
+        self.renderers = {}
+
+    def on_span(self, span):
+        pass
+
+    def on_event(self, event, fields):
+        render = self.renderers.get(event)
+        if render is not None:
+            render(**fields)
+
+
+def serve_prometheus(port, host="127.0.0.1", registry=None):
+    """
+    GET /metrics (Prometheus text format) and /metrics.json (snapshot()) from a
+    daemon thread. Returns the server; port 0 picks a free one (server.server_port).
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, kind = registry.prometheus().encode(), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, kind = json.dumps(registry.snapshot(), default=float).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# --- DEFAULT REGISTRY ---
+# Importing this module opens no file and starts no thread: the terminal sink
+# only prints when an event is emitted, the other exporters wait for configure()
+REGISTRY = Registry()
+TERMINAL = TerminalExporter()
+if TERMINAL_OUTPUT:
+    REGISTRY.add_exporter(TERMINAL)
+_configure_lock = threading.Lock()
+_configured = {}
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+span = REGISTRY.span
+timed = REGISTRY.timed
+emit = REGISTRY.emit
+snapshot = REGISTRY.snapshot
+prometheus = REGISTRY.prometheus
+
+
+def on_terminal(event):
+    """
+    Decorator registering how an event is printed by the terminal sink.
+    """
+    def register(fn):
+        TERMINAL.renderers[event] = fn
+        return fn
+    return register
+
+
+def enable(on=True):
+    REGISTRY.enabled = on
+
+
+def configure(jsonl_path=JSONL_PATH, prometheus_port=PROMETHEUS_PORT):
+    """
+    Starts the exporters set up in the environment (TELEMETRY_JSONL,
+    TELEMETRY_PORT) or passed in: called once by entry points (the CLI, the
+    server), never on import. Calling it again doesn't start them twice.
+    Returns {"jsonl": exporter, "prometheus": server} for what is running.
+    """
+    with _configure_lock:
+        if jsonl_path and "jsonl" not in _configured:
+            _configured["jsonl"] = REGISTRY.add_exporter(JsonLinesExporter(jsonl_path))
+        if prometheus_port and "prometheus" not in _configured:
+            _configured["prometheus"] = serve_prometheus(prometheus_port)
+        return dict(_configured)
+
+
+# --- BENCHMARK ---
+def _per_call(fn, n):
+    best = float("inf")
+    for _ in range(5):
+        t = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - t)
+    return best / n
+
+
+def benchmark(calls=200000, windows=20):
+    """
+    Cost per call of a span and a counter: bare call vs. instrumentation
+    disabled vs. enabled vs. enabled with a JSON-lines exporter; then what
+    that adds to a real hot call, extract_features on a 3 s window.
+    """
+    import sys
+    import tempfile
+
+    registry = Registry(enabled=False)
+    calls_total = registry.counter("bench_calls_total")
+
+    def bare():
+        pass
+
+    def spanned():
+        with registry.span("bench.call", stage="x"):
+            pass
+
+    def counted():
+        calls_total.inc(stage="x")
+
+    base = _per_call(bare, calls)
+    rows = []
+    for label, setup in (("disabled", lambda: None), ("enabled", lambda: setattr(registry, "enabled", True)),
+                         ("enabled + JSON lines", None)):
+        if setup is None:
+            path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+            exporter = registry.add_exporter(JsonLinesExporter(path))
+        else:
+            setup()
+        rows.append((label, _per_call(spanned, calls) - base, _per_call(counted, calls) - base))
+    exporter.close()
+    for label, span_cost, counter_cost in rows:
+        print(f"⏱️  {label:<21} span {span_cost * 1e9:7.0f} ns | counter.inc {counter_cost * 1e9:5.0f} ns")
+
+    # What it adds to a real hot path
+    voice_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Voice_Confidence")
+    if voice_dir not in sys.path:
+        sys.path.append(voice_dir)
+    from features import extract_features
+    from streaming import _speech_like
+    audio = _speech_like(3 * windows, 22050, seed=5)
+    clips = [audio[i * 66150:(i + 1) * 66150] for i in range(windows)]
+    extract_features(audio_array=clips[0])
+
+    times = {}
+    for label, on in (("disabled", False), ("enabled", True), ("disabled", False), ("enabled", True)):
+        REGISTRY.enabled = on
+        t = time.process_time()
+        for clip in clips:
+            extract_features(audio_array=clip)
+        times.setdefault(label, []).append((time.process_time() - t) / windows)
+    REGISTRY.enabled = ENABLED
+    off, on = min(times["disabled"]), min(times["enabled"])
+    print(f"📊 extract_features per window: {off * 1000:.1f} ms disabled, {on * 1000:.1f} ms enabled "
+          f"(span + histogram ~{rows[1][1] * 1e6:.1f} µs, {rows[1][1] / off:.4%} of the call)")
+
+
+if __name__ == "__main__":
+    benchmark()
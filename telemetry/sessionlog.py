@@ -0,0 +1,470 @@
+import os
+import gzip
+import json
+import time
+import struct
+import threading
+import numpy as np
+
+# --- CONFIGURATION ---
+METRICS = ("confidence", "attention", "stability", "smoothness")
+AGGREGATE_PERIOD = 5.0          # Seconds per point of the uploaded timeline
+FLUSH_RECORDS = 64              # Records buffered before they're appended to the file (32 s at 2 Hz)
+INITIAL_CAPACITY = 1024         # Records; the arrays double when full
+UPLOAD_BATCH = 20               # Sessions per POST to the save endpoint
+UPLOAD_TIMEOUT = 10.0
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 0.5            # Seconds before the first retry, doubled for each further one
+SAVE_URL = os.getenv("INTERVIEW_SAVE_URL", "http://localhost:5000/api/interviews/save")
+
+# One fixed-size record per reading: seconds since the session started, the four
+# scores (NaN = no value yet) and flags (bit 0: speaking). 21 bytes, packed.
+RECORD = np.dtype([("t", "<f4"), ("confidence", "<f4"), ("attention", "<f4"), ("stability", "<f4"),
+                   ("smoothness", "<f4"), ("flags", "u1")])
+SPEAKING = 1
+
+# Per-question markers from AdaptiveInterviewer. correct: -1 = not graded
+MARKER = np.dtype([("t", "<f4"), ("kind", "u1"), ("question", "<u2"), ("topic", "<u2"), ("difficulty", "u1"),
+                   ("correct", "i1"), ("points", "<i2")])
+QUESTION, ANSWER = 1, 2
+
+# File: MAGIC, then blocks of (tag, count as uint32) + count raw records
+MAGIC = b"BWSLOG1\n"
+BLOCK_HEADER = struct.Struct("<cI")
+TAGS = {b"R": RECORD, b"M": MARKER}
+
+
+class _Column:
+    # Append-only structured array that doubles its capacity when full
+    def __init__(self, dtype, capacity=INITIAL_CAPACITY):
+        self.data = np.empty(capacity, dtype)
+        self.size = 0
+
+    def append(self, row):
+        if self.size == len(self.data):
+            self._grow(self.size + 1)
+        self.data[self.size] = row
+        self.size += 1
+
+    def extend(self, rows):
+        if self.size + len(rows) > len(self.data):
+            self._grow(self.size + len(rows))
+        self.data[self.size:self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    def _grow(self, needed):
+        capacity = len(self.data)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, self.data.dtype)
+        grown[:self.size] = self.data[:self.size]
+        self.data = grown
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class SessionLog:
+    """
+    Time series of one interview: a fixed-size RECORD per reading (all four
+    scores) and a MARKER per question asked / answer graded, kept in NumPy
+    arrays (21 and 13 bytes each) instead of Python objects.
+
+    With a path, records are also appended to a compact binary file in
+    blocks of FLUSH_RECORDS (markers are written at once); load() reads it
+    back, ignoring a block cut short by a crash. aggregate() downsamples to
+    min / max / mean per period and summary() builds the body of
+    /api/interviews/save from it (see upload()).
+
+    Writers may be on different threads (fusion, interviewer, voice worker).
+    Times are seconds since t0 (time.perf_counter(), by default when the log
+    was created); now() gives the current one.
+    """
+    def __init__(self, path=None, t0=None, flush_records=FLUSH_RECORDS):
+        self.path = path
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.flush_records = flush_records
+        self._records = _Column(RECORD)
+        self._markers = _Column(MARKER)
+        self._written = 0               # Records already in the file
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, "ab")
+            if new:
+                self._file.write(MAGIC)
+                self._file.flush()
+
+    def now(self):
+        return time.perf_counter() - self.t0
+
+    def __len__(self):
+        return self._records.size
+
+    @property
+    def records(self):
+        return self._records.view()
+
+    @property
+    def markers(self):
+        return self._markers.view()
+
+    # --- WRITING ---
+    def append(self, t=None, confidence=None, attention=None, stability=None, smoothness=None, speaking=False):
+        """
+        One reading. Scores that are None (unknown at t) are stored as NaN.
+        """
+        nan = float("nan")
+        row = (self.now() if t is None else t,
+               nan if confidence is None else confidence, nan if attention is None else attention,
+               nan if stability is None else stability, nan if smoothness is None else smoothness,
+               SPEAKING if speaking else 0)
+        with self._lock:
+            self._records.append(row)
+            if self._file is not None and self._records.size - self._written >= self.flush_records:
+                self._flush_records()
+
+    def mark_question(self, question, topic, difficulty, t=None):
+        self._mark((self.now() if t is None else t, QUESTION, question, topic, difficulty, -1, 0))
+
+    def mark_answer(self, question, topic, difficulty, correct, points, t=None):
+        self._mark((self.now() if t is None else t, ANSWER, question, topic, difficulty, int(bool(correct)), points))
+
+    def _mark(self, row):
+        with self._lock:
+            self._markers.append(row)
+            if self._file is not None:
+                # Records first, so the file stays in time order
+                self._flush_records()
+                self._write_block(b"M", self._markers.data[self._markers.size - 1:self._markers.size])
+                self._file.flush()
+
+    def _flush_records(self):
+        pending = self._records.data[self._written:self._records.size]
+        if len(pending):
+            self._write_block(b"R", pending)
+            self._written = self._records.size
+            self._file.flush()
+
+    def _write_block(self, tag, rows):
+        self._file.write(BLOCK_HEADER.pack(tag, len(rows)) + rows.tobytes())
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush_records()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush_records()
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def load(cls, path):
+        """
+        A log read back from its file (not reopened for writing).
+        """
+        log = cls()
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a session log")
+        pos = len(MAGIC)
+        while pos + BLOCK_HEADER.size <= len(data):
+            tag, count = BLOCK_HEADER.unpack_from(data, pos)
+            dtype = TAGS.get(tag)
+            end = pos + BLOCK_HEADER.size + count * (dtype.itemsize if dtype else 0)
+            if dtype is None or end > len(data):
+                break           # Unknown or truncated block: everything before it is intact
+            rows = np.frombuffer(data, dtype, count, pos + BLOCK_HEADER.size)
+            (log._records if tag == b"R" else log._markers).extend(rows)
+            pos = end
+        log._written = log._records.size
+        return log
+
+    # --- READING ---
+    def aggregate(self, period=AGGREGATE_PERIOD):
+        """
+        Min / max / mean of each score per `period` seconds (NaNs ignored; a
+        period with no value for a score gives NaN), for the periods that
+        have records. Returns {"t": period starts, "samples": records per
+        period, metric: {"min", "max", "mean"}}.
+        """
+        records = self.records
+        if len(records) and np.any(np.diff(records["t"]) < 0):
+            records = records[np.argsort(records["t"], kind="stable")]
+        bins = np.floor(records["t"] / period).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]]) if len(bins) else np.zeros(0, np.intp)
+        out = {"t": bins[starts] * period, "samples": np.diff(np.r_[starts, len(bins)])}
+        for metric in METRICS:
+            values = records[metric].astype(np.float64)
+            if not len(starts):
+                out[metric] = {"min": values, "max": values, "mean": values}
+                continue
+            valid = ~np.isnan(values)
+            count = np.add.reduceat(valid, starts)
+            total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.where(count > 0, total / count, np.nan)
+            out[metric] = {"min": np.fmin.reduceat(values, starts), "max": np.fmax.reduceat(values, starts),
+                           "mean": mean}
+        return out
+
+    def questions(self):
+        """
+        One entry per question asked: when, topic, difficulty and, once graded, the result.
+        """
+        out = []
+        for marker in self.markers:
+            if marker["kind"] == QUESTION:
+                out.append({"t": _round(marker["t"], 2), "question": int(marker["question"]),
+                            "topic": int(marker["topic"]), "difficulty": int(marker["difficulty"]),
+                            "answered": None, "correct": None, "points": 0})
+            elif marker["kind"] == ANSWER:
+                asked = next((q for q in reversed(out) if q["question"] == marker["question"]), None)
+                if asked is None:
+                    continue
+                asked.update(answered=_round(marker["t"], 2), correct=bool(marker["correct"]),
+                             points=int(marker["points"]))
+        return out
+
+    def summary(self, user_id, period=AGGREGATE_PERIOD):
+        """
+        The save endpoint's body: what the web app already sends (userId,
+        duration, mean scores) plus the downsampled timeline and the questions.
+        """
+        records = self.records
+        scores = {}
+        for metric in METRICS:
+            values = records[metric][~np.isnan(records[metric])]
+            scores[metric] = _round(np.mean(values), 1) if len(values) else None
+        series = self.aggregate(period)
+        timeline = {"period": period, "t": [_round(t, 2) for t in series["t"]],
+                    "samples": series["samples"].tolist()}
+        for metric in METRICS:
+            timeline[metric] = {k: [_round(v, 1) for v in series[metric][k]] for k in ("min", "max", "mean")}
+        return {"userId": user_id, "duration": _round(float(records["t"].max()), 1) if len(records) else 0.0,
+                "scores": scores, "timeline": timeline, "questions": self.questions()}
+
+
+def _round(value, digits):
+    # JSON-ready: NaN -> None
+    value = float(value)
+    return None if value != value else round(value, digits)
+
+
+# --- UPLOAD ---
+def upload(summaries, url=SAVE_URL, batch_size=UPLOAD_BATCH, timeout=UPLOAD_TIMEOUT, retries=UPLOAD_RETRIES):
+    """
+    POSTs session summaries to the save endpoint, gzip-compressed
+    (Content-Encoding: gzip, which express.json() inflates), batch_size
+    sessions per request: one session goes as an object, as the web app
+    sends it, several as a JSON array. Connection errors and 5xx are
+    retried with backoff. Returns {"posts", "sessions", "bytes", "raw_bytes", "failed"}.
+    """
+    import urllib.request
+    import urllib.error
+
+    stats = {"posts": 0, "sessions": 0, "bytes": 0, "raw_bytes": 0, "failed": 0}
+    for start in range(0, len(summaries), batch_size):
+        batch = summaries[start:start + batch_size]
+        raw = json.dumps(batch[0] if len(batch) == 1 else batch, separators=(",", ":")).encode()
+        body = gzip.compress(raw, compresslevel=6)
+        request = urllib.request.Request(url, data=body, method="POST", headers={
+            "Content-Type": "application/json", "Content-Encoding": "gzip"})
+        for attempt in range(retries):
+            stats["posts"] += 1
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                stats["sessions"] += len(batch)
+                stats["bytes"] += len(body)
+                stats["raw_bytes"] += len(raw)
+                break
+            except urllib.error.HTTPError as e:
+                if e.code < 500:
+                    stats["failed"] += len(batch)
+                    break
+            except OSError:
+                pass
+            if attempt == retries - 1:
+                stats["failed"] += len(batch)
+            else:
+                time.sleep(UPLOAD_BACKOFF * 2 ** attempt)
+    return stats
+
+
+class FakeSaveServer:
+    """
+    Local stand-in for the backend's POST /api/interviews/save, behaving like
+    express.json(): gzip / deflate bodies are inflated, and the route stores
+    an object or an array of them. `error_rate` answers 503 instead.
+    """
+    def __init__(self, port=0, error_rate=0.0, seed=0):
+        import random
+        import zlib
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        self.error_rate = error_rate
+        self.saved = []             # Interview documents, in arrival order
+        self.bodies = []            # Each saved POST's JSON as sent: one object or an array
+        self.posts = 0
+        self.bytes = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                encoding = self.headers.get("Content-Encoding", "identity").lower()
+                with server._lock:
+                    server.posts += 1
+                    server.bytes += len(raw)
+                    fail = server._rng.random() < server.error_rate
+                if self.path.split("?")[0] != "/api/interviews/save":
+                    return self._reply(404, {"success": False})
+                if fail:
+                    return self._reply(503, {"success": False})
+                try:
+                    if encoding == "gzip":
+                        raw = gzip.decompress(raw)
+                    elif encoding == "deflate":
+                        raw = zlib.decompress(raw)
+                    body = json.loads(raw)
+                except (OSError, ValueError, zlib.error):
+                    return self._reply(400, {"success": False})
+                docs = body if isinstance(body, list) else [body]
+                with server._lock:
+                    server.bodies.append(body)
+                    server.saved.extend(docs)
+                self._reply(201, {"success": True, "message": "Saved", "count": len(docs)})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/interviews/save"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --- BENCHMARK ---
+def _synthetic(log, minutes, rate=2.0, questions=12, seed=0):
+    # A session like SessionEngine writes it: fused readings at `rate` Hz plus question / answer markers
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * rate)
+    t = np.arange(n) / rate
+    walk = lambda: np.clip(60 + np.cumsum(rng.normal(0, 1.5, n)), 0, 100)
+    confidence, attention, stability, smoothness = walk(), walk(), walk(), walk()
+    speaking = rng.random(n) < 0.6
+    asked = np.linspace(0, t[-1], questions + 1)[:-1]
+    q = 0
+    for i in range(n):
+        while q < questions and asked[q] <= t[i]:
+            log.mark_question(q, q // 5, 2, t=asked[q])
+            log.mark_answer(q, q // 5, 2, q % 3 != 0, 34 if q % 3 else 0, t=asked[q] + 20)
+            q += 1
+        log.append(t[i], confidence[i] if speaking[i] else None, attention[i], stability[i], smoothness[i],
+                   speaking[i])
+    return n
+
+
+def benchmark(minutes=30, sessions=40):
+    """
+    A 30-minute session at 2 readings/s: memory of the log vs. the Python
+    objects it replaces, write cost, file size and read-back, aggregation,
+    summary size raw vs. gzip; then `sessions` summaries uploaded to a
+    local FakeSaveServer one POST each vs. batched, checked for a lossless
+    round trip (also with a flaky server).
+    """
+    import sys
+    import tempfile
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.bwsl")
+        log = SessionLog(path)
+        t = time.perf_counter()
+        n = _synthetic(log, minutes)
+        write = (time.perf_counter() - t) / n
+        log.close()
+
+        tracemalloc.start()
+        objects = [(float(r["t"]), float(r["confidence"]), float(r["attention"]), float(r["stability"]),
+                    float(r["smoothness"]), bool(r["flags"])) for r in log.records]
+        as_objects = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        in_memory = log.records.nbytes + log.markers.nbytes
+        print(f"📏 {minutes} min @ 2 Hz: {n} readings + {len(log.markers)} markers | "
+              f"{in_memory / 1024:.0f} KB in arrays vs {as_objects / 1024:.0f} KB as tuples | "
+              f"file {os.path.getsize(path) / 1024:.0f} KB | {write * 1e6:.1f} µs per append (file included)")
+
+        loaded = SessionLog.load(path)
+        same = loaded.records.tobytes() == log.records.tobytes() and \
+            loaded.markers.tobytes() == log.markers.tobytes()
+        with open(path, "ab") as f:
+            f.write(BLOCK_HEADER.pack(b"R", 100) + b"\0" * 50)     # A block cut short by a crash
+        truncated = len(SessionLog.load(path)) == len(log)
+        print(f"📏 Read back identical: {same} | truncated tail ignored: {truncated}")
+
+        t = time.perf_counter()
+        series = log.aggregate()
+        aggregate = time.perf_counter() - t
+        summary = log.summary("bench-user")
+        raw = json.dumps(summary, separators=(",", ":")).encode()
+        print(f"⏱️  aggregate(): {aggregate * 1000:.2f} ms -> {len(series['t'])} points | "
+              f"summary {len(raw) / 1024:.1f} KB JSON, {len(gzip.compress(raw)) / 1024:.1f} KB gzip")
+
+    summaries = []
+    for i in range(sessions):
+        s = SessionLog()
+        _synthetic(s, 10, questions=8, seed=i)
+        summaries.append(s.summary(f"user-{i}"))
+
+    for label, batch_size, error_rate in (("One POST per session", 1, 0.0), (f"Batches of {UPLOAD_BATCH}", UPLOAD_BATCH, 0.0),
+                                          ("Batched, 50% 503s", UPLOAD_BATCH, 0.5)):
+        with FakeSaveServer(error_rate=error_rate) as server:
+            t = time.perf_counter()
+            stats = upload(summaries, server.url, batch_size=batch_size)
+            elapsed = time.perf_counter() - t
+            lossless = json.loads(json.dumps(summaries)) == server.saved
+        print(f"⏱️  {label:<21} {elapsed * 1000:6.0f} ms, {stats['posts']} POSTs, "
+              f"{stats['bytes'] / 1024:.0f} KB sent for {stats['raw_bytes'] / 1024:.0f} KB of JSON | "
+              f"{len(server.saved)}/{sessions} saved, round trip lossless: {lossless}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    benchmark()
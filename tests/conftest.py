@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The component packages (Brain, Voice_Confidence, ...) live at the repo root
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
@@ -0,0 +1,125 @@
+import importlib
+import concurrent.futures
+
+import pytest
+
+import Brain  # noqa: F401  (puts the module folder on sys.path)
+import llm
+from llm import LLMClient
+from fake_llm import FakeModelServer
+
+KEYS = {"topics": "fake-topics", "asker": "fake-asker", "grader": "fake-grader"}
+MODEL = "gemini-flash-latest"
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF_BASE", 0.01)
+
+
+def test_calls_are_counted_per_role_key():
+    with FakeModelServer(latency=0.01) as server:
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6000)
+        try:
+            for role, n in (("topics", 1), ("asker", 3), ("grader", 2)):
+                for _ in range(n):
+                    assert client.call(role, MODEL, "Ask a question.").text
+        finally:
+            client.close()
+
+    assert server.calls_by_key == {"fake-topics": 1, "fake-asker": 3, "fake-grader": 2}
+    assert server.calls_by_model == {MODEL: 6}
+    assert client.stats["calls"] == 6
+    assert client.stats["retries"] == client.stats["failures"] == 0
+
+
+def test_discard_cancels_a_request_before_it_is_sent():
+    # One token per key: the second request waits in the rate limiter
+    with FakeModelServer(latency=0.01) as server:
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6)
+        try:
+            assert client.call("asker", MODEL, "First question.").text
+            speculative = client.submit("asker", MODEL, "Speculative question.")
+            client.discard(speculative)
+            with pytest.raises(concurrent.futures.CancelledError):
+                speculative.result()
+        finally:
+            client.close()
+
+    assert client.stats["cancelled"] == 1
+    assert server.calls == 1
+
+
+def test_discard_of_a_finished_request_is_not_counted():
+    with FakeModelServer(latency=0.01) as server:
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6000)
+        try:
+            future = client.submit("asker", MODEL, "Ask a question.")
+            assert future.result().text
+            client.discard(future)
+        finally:
+            client.close()
+
+    assert client.stats["cancelled"] == 0
+
+
+def test_429_is_retried_until_it_succeeds(fast_backoff):
+    with FakeModelServer(latency=0.01, error_rate=0.5, seed=1) as server:
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6000, max_retries=20)
+        try:
+            for _ in range(10):
+                assert client.call("grader", MODEL, "Grade this.").text
+        finally:
+            client.close()
+
+    assert server.errors > 0
+    assert client.stats["retries"] == server.errors
+    assert client.stats["calls"] == server.calls == 10 + server.errors
+    assert client.stats["failures"] == 0
+
+
+def test_429_gives_up_after_max_retries(fast_backoff):
+    with FakeModelServer(latency=0.01, error_rate=1.0) as server:
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6000, max_retries=3)
+        try:
+            assert client.call("grader", MODEL, "Grade this.") is None
+        finally:
+            client.close()
+
+    assert server.calls == 3
+    assert client.stats["retries"] == 2
+    assert client.stats["failures"] == 1
+
+
+def test_interview_calls_per_role_and_prefetch_cleanup(monkeypatch):
+    interviewer = importlib.import_module("Brain.Brain")
+    with FakeModelServer(latency=0.01, grade=True) as server:
+        for name, role in (("GEMINI_KEY_TOPICS", "topics"), ("GEMINI_KEY_ASKER", "asker"),
+                           ("GEMINI_KEY_GRADER", "grader")):
+            monkeypatch.setenv(name, KEYS[role])
+        monkeypatch.setenv("GEMINI_BASE_URL", server.url)
+        monkeypatch.setenv("WEBHOOK_URL", "")
+        monkeypatch.setattr(interviewer, "_initialized", False)
+        monkeypatch.setattr(interviewer, "USE_RESPONSE_CACHE", False)
+
+        client = LLMClient(KEYS, base_url=server.url, requests_per_minute=6000)
+        try:
+            bot = interviewer.AdaptiveInterviewer("Python Skills", "File clerk", llm=client)
+            questions = answers = 0
+            while bot.current_topic_index < len(bot.topics):
+                bot.generate_question()
+                questions += 1
+                bot.evaluate_answer("I would use a dictionary.")
+                answers += 1
+                # Only the speculative question for the branch taken is kept
+                assert set(bot._prefetched) <= {bot._state_key()}
+        finally:
+            client.close()
+
+    assert not bot._prefetched
+    assert server.calls_by_key["fake-topics"] == 1
+    assert server.calls_by_key["fake-grader"] == answers
+    # Every question asked, plus the speculative ones that were sent before being discarded
+    asker = server.calls_by_key["fake-asker"]
+    assert questions <= asker <= questions + answers
+    assert client.stats["calls"] == server.calls
@@ -0,0 +1,101 @@
+import time
+import threading
+
+import numpy as np
+
+import Voice_Confidence  # noqa: F401  (puts the module folder on sys.path)
+from pipeline import AudioRing, AnalysisWorker, FakeAudioSource, PipelineStats
+
+SR = 8000
+CHUNK = SR // 4
+
+
+def _audio(seconds):
+    return np.arange(int(SR * seconds), dtype=np.float32) / SR
+
+
+def _run(audio, analyze, window_samples, speed=0):
+    ring = AudioRing(SR * 10)
+    stats = PipelineStats()
+    worker = AnalysisWorker(ring, analyze, window_samples, CHUNK, stats)
+    source = FakeAudioSource(audio, SR, CHUNK, speed=speed)
+    worker.start()
+    source.start(ring)
+    while not source.finished:
+        time.sleep(0.01)
+    source.stop()
+    worker.stop()
+    return stats
+
+
+def test_worker_sees_every_sample_in_order():
+    audio = _audio(3)
+    calls = []
+    stats = _run(audio, lambda new, window, reset: calls.append((new.copy(), window.copy(), reset)), len(audio))
+
+    assert calls
+    assert not any(reset for _, _, reset in calls)
+    np.testing.assert_array_equal(np.concatenate([new for new, _, _ in calls]), audio)
+    # The window is all speech so far, the newest samples last
+    np.testing.assert_array_equal(calls[-1][1], audio)
+    assert stats.windows_analyzed == len(calls)
+    assert stats.windows_skipped == 0
+
+
+def test_slow_worker_keeps_only_the_newest_window():
+    audio = _audio(4)
+    window = SR // 2
+    calls = []
+
+    def analyze(new, rolling, reset):
+        calls.append((rolling.copy(), reset))
+        time.sleep(0.3)
+
+    stats = _run(audio, analyze, window, speed=4.0)
+
+    assert stats.windows_skipped > 0
+    assert any(reset for _, reset in calls)
+    np.testing.assert_array_equal(calls[-1][0], audio[-window:])
+
+
+def test_latency_counts_from_capture_not_from_the_speech_ring():
+    # Capture ring -> relay (like listen()'s loop, delayed) -> speech ring -> worker
+    delay = 0.2
+    audio = _audio(1)
+    capture = AudioRing(SR * 10)
+    speech = AudioRing(SR * 10)
+    stats = PipelineStats()
+    worker = AnalysisWorker(speech, lambda new, window, reset: None, len(audio), CHUNK, stats)
+    source = FakeAudioSource(audio, SR, CHUNK, speed=0)
+
+    def relay():
+        read_pos = 0
+        while read_pos < len(audio):
+            if capture.write_pos == read_pos:
+                time.sleep(0.001)
+                continue
+            samples, _ = capture.read(read_pos, capture.write_pos)
+            read_pos += len(samples)
+            time.sleep(delay)
+            speech.write(samples, capture.capture_time(read_pos))
+
+    worker.start()
+    source.start(capture)
+    thread = threading.Thread(target=relay)
+    thread.start()
+    thread.join()
+    source.stop()
+    worker.stop()
+
+    assert stats.latencies
+    assert min(stats.latencies) >= delay
+
+
+def test_capture_time_is_the_stamp_of_the_write_holding_the_sample():
+    ring = AudioRing(100)
+    assert ring.capture_time(1) is None
+    ring.write(np.zeros(10), capture_time=1.0)
+    ring.write(np.zeros(10), capture_time=2.0)
+    assert ring.capture_time(10) == 1.0
+    assert ring.capture_time(11) == 2.0
+    assert ring.capture_time(20) == 2.0
@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+import pytest
+
+import telemetry  # noqa: F401  (puts the module folder on sys.path)
+from sessionlog import SessionLog, FakeSaveServer, upload, BLOCK_HEADER, RECORD
+
+
+def _session(n=40, path=None, user_id="user", rate=2.0):
+    log = SessionLog(path, flush_records=8)
+    for i in range(n):
+        log.append(i / rate, confidence=50 + i % 7, attention=60.0, stability=None, smoothness=70 - i % 3,
+                   speaking=i % 2 == 0)
+    log.mark_question(0, 0, 2, t=1.0)
+    log.mark_answer(0, 0, 2, True, 34, t=6.0)
+    log.mark_question(1, 0, 3, t=7.0)
+    return log
+
+
+def _summaries(n):
+    return [_session(20 + i).summary(f"user-{i}") for i in range(n)]
+
+
+def test_file_round_trip(tmp_path):
+    path = str(tmp_path / "session.bwsl")
+    log = _session(path=path)
+    log.close()
+
+    loaded = SessionLog.load(path)
+    assert loaded.records.tobytes() == log.records.tobytes()
+    assert loaded.markers.tobytes() == log.markers.tobytes()
+
+
+def test_load_ignores_a_truncated_tail_block(tmp_path):
+    path = str(tmp_path / "session.bwsl")
+    log = _session(path=path)
+    log.close()
+    with open(path, "ab") as f:
+        # A crash while a block of 10 records was being written: header plus half a record
+        f.write(BLOCK_HEADER.pack(b"R", 10) + b"\0" * (RECORD.itemsize // 2))
+
+    loaded = SessionLog.load(path)
+    assert loaded.records.tobytes() == log.records.tobytes()
+    assert loaded.markers.tobytes() == log.markers.tobytes()
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a session log")
+    with pytest.raises(ValueError):
+        SessionLog.load(str(path))
+
+
+def test_aggregate_per_period():
+    log = SessionLog()
+    for t, confidence in ((0.0, 10.0), (1.0, 30.0), (5.5, 50.0), (12.0, 70.0)):
+        log.append(t, confidence=confidence)
+
+    series = log.aggregate(period=5.0)
+    np.testing.assert_array_equal(series["t"], [0.0, 5.0, 10.0])
+    np.testing.assert_array_equal(series["samples"], [2, 1, 1])
+    np.testing.assert_array_equal(series["confidence"]["min"], [10.0, 50.0, 70.0])
+    np.testing.assert_array_equal(series["confidence"]["max"], [30.0, 50.0, 70.0])
+    np.testing.assert_array_equal(series["confidence"]["mean"], [20.0, 50.0, 70.0])
+
+
+def test_aggregate_nan_only_periods():
+    log = SessionLog()
+    log.append(0.0, attention=40.0)                         # Only attention in the first period
+    log.append(1.0, attention=60.0)
+    log.append(6.0, confidence=80.0, attention=None)        # Only confidence in the second
+
+    series = log.aggregate(period=5.0)
+    for stat in ("min", "max", "mean"):
+        assert np.isnan(series["confidence"][stat][0])
+        assert np.isnan(series["attention"][stat][1])
+        assert np.isnan(series["stability"][stat]).all()
+    assert series["confidence"]["mean"][1] == 80.0
+    assert series["attention"]["mean"][0] == 50.0
+
+    # ... and the summary turns them into nulls, valid JSON
+    summary = log.summary("user", period=5.0)
+    assert summary["timeline"]["confidence"]["mean"] == [None, 80.0]
+    assert summary["scores"]["stability"] is None
+    json.dumps(summary, allow_nan=False)
+
+
+def test_summary_questions():
+    questions = _session().summary("user")["questions"]
+    assert [q["question"] for q in questions] == [0, 1]
+    assert questions[0]["correct"] is True and questions[0]["points"] == 34 and questions[0]["answered"] == 6.0
+    assert questions[1]["answered"] is None and questions[1]["correct"] is None
+
+
+def test_upload_one_session_as_an_object():
+    summaries = _summaries(1)
+    with FakeSaveServer() as server:
+        stats = upload(summaries, server.url)
+
+    assert stats["posts"] == 1 and stats["sessions"] == 1 and stats["failed"] == 0
+    assert isinstance(server.bodies[0], dict)
+    assert server.saved == json.loads(json.dumps(summaries))
+
+
+def test_upload_batches_as_arrays():
+    summaries = _summaries(7)
+    with FakeSaveServer() as server:
+        stats = upload(summaries, server.url, batch_size=3)
+
+    assert stats["posts"] == 3 and stats["sessions"] == 7
+    assert [len(body) for body in server.bodies[:2]] == [3, 3]
+    assert all(isinstance(body, list) for body in server.bodies[:2])
+    assert isinstance(server.bodies[2], dict)                   # The last session alone goes as an object
+    assert stats["bytes"] < stats["raw_bytes"]                  # gzip
+    assert server.saved == json.loads(json.dumps(summaries))
+
+
+def test_upload_retries_503(monkeypatch):
+    monkeypatch.setattr("sessionlog.UPLOAD_BACKOFF", 0.001)
+    summaries = _summaries(10)
+    with FakeSaveServer(error_rate=0.5) as server:
+        stats = upload(summaries, server.url, batch_size=2, retries=20)
+
+    assert stats["failed"] == 0
+    assert stats["posts"] > 5
+    assert server.posts == stats["posts"]
+    assert server.saved == json.loads(json.dumps(summaries))
+
+
+def test_upload_does_not_retry_4xx():
+    summaries = _summaries(4)
+    with FakeSaveServer() as server:
+        stats = upload(summaries, server.url.replace("/save", "/missing"), batch_size=2)
+
+    assert stats == {"posts": 2, "sessions": 0, "bytes": 0, "raw_bytes": 0, "failed": 4}
+    assert server.posts == 2
+    assert server.saved == []
@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+
+import Voice_Confidence  # noqa: F401  (puts the module folder on sys.path)
+from stt import FakeBackend, STTError, StreamingTranscriber, make_backend, to_pcm16
+
+SR = 1000
+CHUNK = SR // 10
+
+
+def _feed(transcriber, pattern):
+    # pattern: "s" = a chunk of speech, "." = a chunk of silence
+    silence = 0.0
+    for c in pattern:
+        speech = c == "s"
+        silence = 0.0 if speech else silence + CHUNK / SR
+        transcriber.add(np.full(CHUNK, 0.1 if speech else 0.0, dtype=np.float32), speech, silence)
+
+
+class FailingBackend:
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def transcribe(self, pcm, sample_rate):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise STTError("503 Service Unavailable")
+        return f"part{self.calls}"
+
+
+def test_fake_backend_reports_the_audio_length_and_waits():
+    backend = FakeBackend(latency=0.05, per_second=0.1, speed=1.0)
+    t = time.perf_counter()
+    text = backend.transcribe(to_pcm16(np.zeros(2 * SR, dtype=np.float32)), SR)
+    elapsed = time.perf_counter() - t
+
+    assert text == "<2.0s>"
+    assert backend.calls == 1
+    assert elapsed >= 0.25
+
+
+def test_make_backend_fake_needs_no_network():
+    assert isinstance(make_backend("fake"), FakeBackend)
+
+
+def test_segments_are_cut_at_pauses_and_joined_in_order():
+    # The first segment takes longer to transcribe than the second
+    backend = FakeBackend(latency=0.0, per_second=0.1)
+    transcriber = StreamingTranscriber(backend, SR, pause=0.4, min_duration=2.0)
+    _feed(transcriber, "s" * 25 + "...." + "s" * 10)
+    assert transcriber.segments == 1
+
+    assert transcriber.finish() == "<2.9s> <1.0s>"
+    assert backend.calls == 2
+
+
+def test_short_pauses_do_not_cut_a_segment():
+    backend = FakeBackend(latency=0.0, per_second=0.0)
+    transcriber = StreamingTranscriber(backend, SR, pause=0.4, min_duration=2.0)
+    # Pause after 1 s is too early, the 0.2 s pauses are too short
+    _feed(transcriber, "s" * 10 + "....." + "s" * 10 + ".." + "s" * 10)
+
+    assert transcriber.segments == 0
+    assert transcriber.finish() == "<3.7s>"
+
+
+def test_long_speech_is_cut_at_max_duration():
+    backend = FakeBackend(latency=0.0, per_second=0.0)
+    transcriber = StreamingTranscriber(backend, SR, min_duration=2.0, max_duration=3.0)
+    _feed(transcriber, "s" * 70)
+
+    assert transcriber.finish() == "<3.0s> <3.0s> <1.0s>"
+
+
+def test_silence_only_is_never_sent():
+    backend = FakeBackend(latency=0.0, per_second=0.0)
+    transcriber = StreamingTranscriber(backend, SR, max_duration=1.0)
+    _feed(transcriber, "." * 30)
+
+    assert transcriber.finish() == ""
+    assert backend.calls == 0
+
+
+def test_failed_segments_are_counted_and_skipped():
+    backend = FailingBackend(fail_on={2})
+    transcriber = StreamingTranscriber(backend, SR, workers=1, pause=0.4, min_duration=1.0)
+    _feed(transcriber, "s" * 10 + "...." + "s" * 10 + "...." + "s" * 10)
+
+    assert transcriber.finish() == "part1 part3"
+    assert transcriber.failed == 1
+
+
+def test_only_the_last_segment_is_in_flight_after_the_last_word():
+    latency = 0.3
+    backend = FakeBackend(latency=latency, per_second=0.0)
+    transcriber = StreamingTranscriber(backend, SR, pause=0.4, min_duration=1.0)
+    for _ in range(3):
+        _feed(transcriber, "s" * 10 + "....")
+        time.sleep(latency)     # Speaking the next segment takes at least as long as transcribing this one
+    _feed(transcriber, "s" * 10)
+
+    t = time.perf_counter()
+    assert transcriber.finish() == "<1.4s> <1.4s> <1.4s> <1.0s>"
+    assert time.perf_counter() - t < 2 * latency
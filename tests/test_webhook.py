@@ -0,0 +1,90 @@
+import os
+
+import Brain  # noqa: F401  (puts the module folder on sys.path)
+from webhook import WebhookDispatcher, FakeWebhookServer
+
+
+def _texts(events):
+    return sorted(e["text"] for e in events)
+
+
+def _questions(n):
+    return [{"text": f"Question {i:03d}"} for i in range(n)]
+
+
+def test_every_event_is_delivered(tmp_path):
+    with FakeWebhookServer(latency=0.0) as hook:
+        dispatcher = WebhookDispatcher(hook.url, spool_path=str(tmp_path / "spool.jsonl"))
+        for event in _questions(30):
+            dispatcher.emit(event)
+        dispatcher.flush()
+        dispatcher.close()
+
+    assert _texts(hook.received) == _texts(_questions(30))
+    assert dispatcher.stats["delivered"] == 30
+    assert hook.posts == 30
+    assert not os.path.exists(tmp_path / "spool.jsonl")
+
+
+def test_batches_share_a_post(tmp_path):
+    with FakeWebhookServer(latency=0.0) as hook:
+        dispatcher = WebhookDispatcher(hook.url, batch_size=16, batch_window=0.2, senders=1,
+                                       spool_path=str(tmp_path / "spool.jsonl"))
+        for event in _questions(32):
+            dispatcher.emit(event)
+        dispatcher.flush()
+        dispatcher.close()
+
+    assert _texts(hook.received) == _texts(_questions(32))
+    assert hook.posts < 32
+
+
+def test_503s_are_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr("webhook.BACKOFF_BASE", 0.001)
+    with FakeWebhookServer(latency=0.0, error_rate=0.3) as hook:
+        dispatcher = WebhookDispatcher(hook.url, max_retries=20, spool_path=str(tmp_path / "spool.jsonl"))
+        for event in _questions(20):
+            dispatcher.emit(event)
+        dispatcher.flush()
+        dispatcher.close()
+
+    assert _texts(hook.received) == _texts(_questions(20))
+    assert dispatcher.stats["retries"] > 0
+    assert dispatcher.stats["spooled"] == 0
+
+
+def test_permanent_4xx_is_dropped_not_spooled(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    with FakeWebhookServer(latency=0.0, status=404) as hook:
+        dispatcher = WebhookDispatcher(hook.url, spool_path=str(spool))
+        for event in _questions(5):
+            dispatcher.emit(event)
+        dispatcher.flush()
+        dispatcher.close()
+
+    assert hook.posts == 5                      # No retries either
+    assert dispatcher.stats["rejected"] == 5
+    assert dispatcher.stats["spooled"] == 0
+    assert not spool.exists()
+
+
+def test_spool_longer_than_the_queue_is_delivered_after_a_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr("webhook.BACKOFF_BASE", 0.001)
+    spool = str(tmp_path / "spool.jsonl")
+
+    # Webhook down: every event ends up in the spool
+    down = WebhookDispatcher("http://127.0.0.1:9/webhook", max_retries=1, timeout=0.2, spool_path=spool)
+    for event in _questions(50):
+        down.emit(event)
+    down.flush()
+    down.close()
+    assert down.stats["spooled"] == 50
+
+    with FakeWebhookServer(latency=0.0) as hook:
+        restarted = WebhookDispatcher(hook.url, queue_size=10, spool_path=spool).start()
+        restarted.flush()
+        restarted.close()
+
+    assert restarted.stats["replayed"] == 50
+    assert _texts(hook.received) == _texts(_questions(50))
+    assert not os.path.exists(spool)
@@ -15,7 +15,27 @@ const interviewSchema = new mongoose.Schema({
     attention: Number,
     stability: Number,
     smoothness: Number
-  }
+  },
+  // Optional, from the Python session log (telemetry/sessionlog.py): min / max / mean per `period` seconds
+  timeline: {
+    period: Number,
+    t: [Number],
+    samples: [Number],
+    confidence: { min: [Number], max: [Number], mean: [Number] },
+    attention: { min: [Number], max: [Number], mean: [Number] },
+    stability: { min: [Number], max: [Number], mean: [Number] },
+    smoothness: { min: [Number], max: [Number], mean: [Number] }
+  },
+  questions: [{
+    _id: false,
+    t: Number,
+    question: Number,
+    topic: Number,
+    difficulty: Number,
+    answered: Number,
+    correct: Boolean,
+    points: Number
+  }]
 });
 
 module.exports = mongoose.model('Interview', interviewSchema);
\ No newline at end of file
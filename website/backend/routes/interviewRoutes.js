@@ -3,22 +3,28 @@ const router = express.Router();
 const Interview = require('../models/Interview'); // Import the model we just created
 
 // POST /api/interviews/save
+// Body: one interview (as the web app sends it) or an array of them (batched uploads from the Python side)
 router.post('/save', async (req, res) => {
   try {
-    // 1. Add 'duration' to destructuring
-    const { userId, scores, duration } = req.body; 
+    const batch = Array.isArray(req.body) ? req.body : [req.body];
 
-    console.log(`📥 Saving Interview: ${duration}s for user ${userId}`);
-
-    const newInterview = new Interview({
+    const interviews = batch.map(({ userId, scores, duration, timeline, questions }) => ({
       userId: userId,
       scores: scores,
-      duration: duration // <--- SAVE IT HERE
-    });
+      duration: duration,
+      timeline: timeline,
+      questions: questions
+    }));
 
-    const savedInterview = await newInterview.save();
+    if (interviews.length === 1) {
+      console.log(`📥 Saving Interview: ${interviews[0].duration}s for user ${interviews[0].userId}`);
+      await new Interview(interviews[0]).save();
+    } else {
+      console.log(`📥 Saving ${interviews.length} Interviews`);
+      await Interview.insertMany(interviews);
+    }
     
-    res.status(201).json({ success: true, message: "Saved" });
+    res.status(201).json({ success: true, message: "Saved", count: interviews.length });
 
   } catch (error) {
     console.error("❌ Save Error:", error);
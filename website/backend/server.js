@@ -13,7 +13,7 @@ connectDB();
 const app = express();
 
 // Middleware
-app.use(express.json()); // Allows us to parse JSON bodies
+app.use(express.json({ limit: '5mb' })); // Parses JSON bodies (gzip-encoded ones are inflated; batched session uploads need more than the 100kb default)
 app.use(cors());
 
 // Basic Route for testing